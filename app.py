@@ -1,20 +1,54 @@
 from datetime import datetime
 from sqlite3 import IntegrityError
-from flask import Flask, json, request, jsonify, session
+from flask import Flask, json, request, jsonify, session, stream_with_context
 from flask_cors import CORS
 from config import Config
-from models import AudioStory, db, User, Story, Poem, Admin, HelpSupport
+from models import AudioStory, db, User, Story, Poem, Admin, HelpSupport, ContentCounter
+from counters import GLOBAL_SCOPE, move_counter, counts_as_author, track_author, get_counts
+from search import SEARCH_TYPES, sync_search, remove_from_search, search_documents
+from conditional import conditional, catalogue_validator
+from response_cache import response_cache, cached
+from storage import store_upload, media_url, release_media_url, swap_media_url, send_media
+from tags import TAG_TYPES, sync_tags, remove_tags, parse_tags, tag_facets, tagged_query
+from jobs import enqueue, job_stats
+from db_routing import configure_database, read_replica
+from profiler import query_profiler
+from json_provider import FastJSONProvider
+from serializers import (USER, CONTENT_SUMMARY, STORY, STORY_DETAIL, STORY_DRAFT, POEM, POEM_DRAFT,
+                         AUDIO_SUMMARY, HELP_SUPPORT_ROW, FEED_ITEM, audio_row_serializer)
+from metrics import metrics
+from passwords import password_hasher, PasswordHasherBusy
+from principals import principal_cache
+from moderation import moderate_content, moderate_users, ModerationError
+from datatables import datatables_params, datatables_filter, datatables_order
+from exports import EXPORT_FORMATS, ExportError, stream_export, gzip_chunks
+import audio_meta  # registers the audio.probe_meta job
 from werkzeug.exceptions import BadRequest
-from werkzeug.utils import secure_filename
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, or_, and_, select
+from sqlalchemy.orm import load_only, defer, contains_eager
+import base64
+import binascii
+import heapq
+import hmac
+import itertools
 import os
 
 
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 app.config['UPLOAD_FOLDER'] = 'static'
 app.config.from_object(Config)
+if app.config.get('MAX_CONTENT_LENGTH') is None:
+    # Reject oversized bodies before they're parsed; leave room for the form fields
+    app.config['MAX_CONTENT_LENGTH'] = app.config['MAX_UPLOAD_BYTES'] + 1024 * 1024
+configure_database(app)
 db.init_app(app)
+response_cache.init_app(app)
+query_profiler.init_app(app)
+metrics.init_app(app)
+password_hasher.init_app(app)
+principal_cache.init_app(app)
 # CORS(app, supports_credentials=True)
 CORS(
     app,
@@ -50,6 +84,118 @@ def get_current_role():
     role = request.headers.get("X-Role")
     return role if role else None
 
+
+def get_active_admin():
+    """Return (AdminPrincipal, None) for the requesting admin, or (None, error response).
+
+    The admin id comes from the session or the X-Admin-Id header, and the
+    admin must still be 'Active': deactivated admins keep their id.
+    """
+    requester_id = session.get('admin_id')
+    header_admin = request.headers.get('X-Admin-Id')
+    if header_admin and header_admin.isdigit():
+        requester_id = int(header_admin)
+
+    if not requester_id:
+        return None, (jsonify({'message': 'Authentication required'}), 401)
+    requester = principal_cache.admin(requester_id)
+    if not requester or requester.status != 'Active':
+        return None, (jsonify({'message': 'Unauthorized - Admin access required'}), 403)
+    return requester, None
+
+
+# ========== Pagination ==========
+
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 100
+
+
+def wants_unpaginated():
+    """Old clients opt back into the full, unpaginated list with ?all=true."""
+    return request.args.get('all', '').lower() in ('1', 'true', 'yes')
+
+
+def get_page_limit():
+    """Read ?limit= and clamp it to 1..MAX_PAGE_LIMIT."""
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_LIMIT))
+    except (ValueError, TypeError):
+        raise BadRequest("'limit' must be an integer.")
+    return max(1, min(limit, MAX_PAGE_LIMIT))
+
+
+def encode_cursor(updated_on, row_id):
+    """Pack a (UPDATED_ON, id) keyset position into an opaque URL-safe token."""
+    payload = json.dumps([updated_on.isoformat() if updated_on else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor(); raises BadRequest on anything malformed."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        updated_on, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(updated_on) if updated_on else None), int(row_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise BadRequest("Invalid 'cursor'.")
+
+
+def seek_past(query, updated_col, id_col, updated_on, row_id):
+    """Filter to the rows after (updated_on, row_id) in (updated_col, id_col) DESC order, NULLs last."""
+    if updated_on is None:
+        return query.filter(updated_col.is_(None), id_col < row_id)
+    return query.filter(or_(
+        updated_col < updated_on,
+        and_(updated_col == updated_on, id_col < row_id),
+        updated_col.is_(None),
+    ))
+
+
+def keyset_page(query, updated_col, id_col, cursor=None, limit=DEFAULT_PAGE_LIMIT):
+    """Return (rows, next_cursor) for one page ordered by (updated_col, id_col) DESC.
+
+    Seeks past the cursor instead of using OFFSET, so every page costs the
+    same no matter how deep the reader has scrolled.
+    """
+    if cursor:
+        query = seek_past(query, updated_col, id_col, *decode_cursor(cursor))
+
+    rows = query.order_by(updated_col.desc(), id_col.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, updated_col.key), getattr(last, id_col.key))
+    return rows, next_cursor
+
+
+# ========== Projections ==========
+
+def wants_summary():
+    """List endpoints return the compact card shape with ?view=summary or ?fields=summary."""
+    return 'summary' in (request.args.get('view'), request.args.get('fields'))
+
+
+def summary_columns(model):
+    """load_only() option for the summary shape; the STORY Text column is never selected."""
+    return load_only(model.STORY_ID, model.WRITTEN_BY, model.NAME, model.LANGUAGE,
+                     model.TAGS, model.STATUS, model.PRICE, model.PDF_URL, model.UPDATED_ON)
+
+
+# ========== Content indexes ==========
+
+def sync_content_indexes(content_type, item):
+    """Bring the search and tag indexes in line with the item's current status."""
+    sync_search(content_type, item)
+    sync_tags(content_type, item)
+
+
+def drop_content_indexes(content_type, content_id):
+    """Remove an unpublished or deleted item from the search and tag indexes."""
+    remove_from_search(content_type, content_id)
+    remove_tags(content_type, content_id)
+
+
 # ========== Routes ==========
 
 # Authentication check route
@@ -59,7 +205,7 @@ def auth_check():
     if not user_id:
         return jsonify({'authenticated': False}), 401
 
-    user = User.query.get(user_id)
+    user = principal_cache.user(user_id)
     if not user or not user.is_active or (user.role=='Writer' and not user.is_approved):
         return jsonify({'authenticated': False}), 403
 
@@ -119,6 +265,32 @@ def register():
 
 
 
+@app.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(e):
+    return jsonify({'message': 'Too many logins in progress, please retry'}), 503, {'Retry-After': '1'}
+
+
+def authenticate(account, password):
+    """Check a login against the throttle and the password hash.
+
+    Returns None on success, otherwise the error response. Locked accounts
+    are refused before any hashing; the failure count and a hash upgrade
+    are committed here.
+    """
+    if account is not None:
+        locked_for = account.login_locked_for()
+        if locked_for:
+            return jsonify({'message': 'Too many failed attempts, try again later'}), 429, \
+                {'Retry-After': str(locked_for)}
+        if account.check_password(password):
+            account.record_login_success(password)
+            db.session.commit()
+            return None
+        account.record_login_failure()
+        db.session.commit()
+    return jsonify({'message': 'Invalid credentials'}), 401
+
+
 # Login route to authenticate users
 @app.route('/login', methods=['POST'])
 def login():
@@ -127,11 +299,11 @@ def login():
         raise BadRequest("Missing 'email', 'roles', or 'password' in the request body.")
 
     user = User.query.filter_by(email=data['email'], role=data['roles']).first()
-    if user and user.check_password(data['password']):
-        session['user_id'] = user.id
-        return jsonify({'message': 'Login successful','user_id': user.id}), 200
-
-    return jsonify({'message': 'Invalid credentials'}), 401
+    error = authenticate(user, data['password'])
+    if error:
+        return error
+    session['user_id'] = user.id
+    return jsonify({'message': 'Login successful','user_id': user.id}), 200
 
 
 # Login route to authenticate admins
@@ -142,15 +314,15 @@ def admin_login():
         raise BadRequest("Missing 'email' or 'password' in the request body.")
 
     admin = Admin.query.filter_by(email=data['email']).first()
-    if admin and admin.check_password(data['password']):
-        session['admin_id'] = admin.id
-        return jsonify({
-            'message': 'Login successful',
-            'admin_id': admin.id,
-            'role': admin.role  # 👈 Add role
-        }), 200
-
-    return jsonify({'message': 'Invalid credentials'}), 401
+    error = authenticate(admin, data['password'])
+    if error:
+        return error
+    session['admin_id'] = admin.id
+    return jsonify({
+        'message': 'Login successful',
+        'admin_id': admin.id,
+        'role': admin.role  # 👈 Add role
+    }), 200
 
 # Get current admin profile (convenience endpoint - uses session or header)
 @app.route('/api/admin/profile', methods=['GET'])
@@ -191,7 +363,7 @@ def update_admin(admin_id):
     if header_admin and header_admin.isdigit():
         requester_id = int(header_admin)
 
-    requester = Admin.query.get(requester_id) if requester_id else None
+    requester = principal_cache.admin(requester_id)
     if requester_id != admin_id and (not requester or requester.role != 'super_admin'):
         return jsonify({'message': 'Access denied'}), 403
 
@@ -245,7 +417,13 @@ def admin_change_password(admin_id):
     if not admin:
         return jsonify({'message': 'Admin not found'}), 404
 
+    # Same throttle as admin-login, so this can't be used to guess the password instead
+    if admin.login_locked_for():
+        return jsonify({'message': 'Too many failed attempts, try again later'}), 429, \
+            {'Retry-After': str(admin.login_locked_for())}
     if not admin.check_password(data['current_password']):
+        admin.record_login_failure()
+        db.session.commit()
         return jsonify({'message': 'Current password incorrect'}), 401
 
     admin.set_password(data['new_password'])
@@ -276,7 +454,7 @@ def create_subadmin():
     if not requester_id:
         return jsonify({'message': 'Authentication required'}), 401
 
-    requester = Admin.query.get(requester_id)
+    requester = principal_cache.admin(requester_id)
     if not requester or requester.role != 'super_admin':
         return jsonify({'message': 'Unauthorized - super_admin required'}), 403
 
@@ -327,7 +505,7 @@ def get_subadmin(subadmin_id):
     if not requester_id:
         return jsonify({'message': 'Authentication required'}), 401
 
-    requester = Admin.query.get(requester_id)
+    requester = principal_cache.admin(requester_id)
     if not requester or requester.role != 'super_admin':
         return jsonify({'message': 'Unauthorized - super_admin required'}), 403
 
@@ -363,7 +541,7 @@ def update_subadmin(subadmin_id):
     if not requester_id:
         return jsonify({'message': 'Authentication required'}), 401
 
-    requester = Admin.query.get(requester_id)
+    requester = principal_cache.admin(requester_id)
     if not requester or requester.role != 'super_admin':
         return jsonify({'message': 'Unauthorized - super_admin required'}), 403
 
@@ -414,7 +592,7 @@ def get_all_subadmins():
     if not admin_id:
         return jsonify({'message': 'Authentication required'}), 401
 
-    requester = Admin.query.get(admin_id)
+    requester = principal_cache.admin(admin_id)
     if not requester:
         return jsonify({'message': 'Requester admin not found'}), 404
 
@@ -457,7 +635,7 @@ def update_admin_status(admin_id):
     if not requester_id:
         return jsonify({'message': 'Authentication required'}), 401
 
-    requester = Admin.query.get(requester_id)
+    requester = principal_cache.admin(requester_id)
     if not requester or requester.role != 'super_admin':
         return jsonify({'message': 'Unauthorized - super_admin required'}), 403
 
@@ -494,6 +672,7 @@ def create_story():
 
         if story_input_method == 'pdf':
             pdf_url = data.get('pdf_url', '')
+            swap_media_url(None, pdf_url)
         else:
             story_text = data.get('story', '')
 
@@ -506,10 +685,8 @@ def create_story():
         if story_input_method == 'pdf' and 'pdf' in request.files:
             pdf_file = request.files['pdf']
             if pdf_file.filename != '':
-                filename = secure_filename(pdf_file.filename)
-                pdf_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                pdf_file.save(pdf_path)
-                pdf_url = f'/uploads/{filename}'
+                # Stored once per content hash; re-uploads share the same file
+                pdf_url = media_url(store_upload(pdf_file))
         else:
             story_text = data.get('story', '')
 
@@ -530,78 +707,81 @@ def create_story():
         TAGS=tags
     )
     db.session.add(story)
+    move_counter('story', user_id, None, status)
+    sync_content_indexes('story', story)
     db.session.commit()
 
     return jsonify({'message': 'Story created successfully'})
 
 
 
-# Get all published stories (publicly accessible)
+# Get published stories (publicly accessible)
+# Paginated with ?limit=&cursor=; pass ?all=true for the legacy full list.
 @app.route('/api/public/stories', methods=['GET'])
+@read_replica
+@conditional(lambda: catalogue_validator(Story, 'story'))
+@cached('story')
 def get_all_published_stories():
-    # Fetch only published stories, ordered by latest update
-    stories = Story.query.filter_by(STATUS='published').order_by(Story.UPDATED_ON.desc()).all()
-
-    response = []
-    for story in stories:
-        response.append({
-            'id': story.STORY_ID,
-            'authorId': story.WRITTEN_BY,
-            'name': story.NAME,
-            'language': story.LANGUAGE,
-            'font': story.FONT,
-            'pdf_url': story.PDF_URL,
-            'story': story.STORY,
-            'status': story.STATUS,
-            'price': float(story.PRICE) if story.PRICE else 0.00,
-            'tags': story.TAGS,
-            'created_on': story.CREATED_ON.strftime('%Y-%m-%d %H:%M:%S') if story.CREATED_ON else None,
-            'updated_on': story.UPDATED_ON.strftime('%Y-%m-%d %H:%M:%S') if story.UPDATED_ON else None
-        })
-
-    return jsonify(response)
+    query = Story.query.filter_by(STATUS='published')
+    serializer = STORY
+    if wants_summary():
+        query = query.options(summary_columns(Story))
+        serializer = CONTENT_SUMMARY
+
+    if wants_unpaginated():
+        # Legacy: every published story, ordered by latest update
+        stories = query.order_by(Story.UPDATED_ON.desc()).all()
+        return jsonify(serializer.many(stories))
+
+    limit = get_page_limit()
+    stories, next_cursor = keyset_page(query, Story.UPDATED_ON, Story.STORY_ID,
+                                       request.args.get('cursor'), limit)
+    return jsonify({
+        'items': serializer.many(stories),
+        'next_cursor': next_cursor,
+        'limit': limit
+    })
 
 
-# Get all published poems (publicly accessible)
+# Get published poems (publicly accessible)
+# Paginated with ?limit=&cursor=; pass ?all=true for the legacy full list.
 @app.route('/api/public/poems', methods=['GET'])
+@read_replica
+@conditional(lambda: catalogue_validator(Poem, 'poem'))
+@cached('poem')
 def get_all_published_poems():
-    # Fetch only published poems, ordered by latest update
-    poems = Poem.query.filter_by(STATUS='published').order_by(Poem.UPDATED_ON.desc()).all()
-
-    response = []
-    for poem in poems:
-        response.append({
-            'id': poem.STORY_ID,
-            'authorId': poem.WRITTEN_BY,
-            'name': poem.NAME,
-            'tags': poem.TAGS,
-            'language': poem.LANGUAGE,
-            'font': poem.FONT,
-            'status': poem.STATUS,
-            'updated_on': poem.UPDATED_ON.strftime('%Y-%m-%d %H:%M:%S') if poem.UPDATED_ON else None
-        })
-    return jsonify(response)
+    # The poem card never shows the text, so don't select it
+    query = Poem.query.filter_by(STATUS='published').options(defer(Poem.STORY))
+
+    if wants_unpaginated():
+        # Legacy: every published poem, ordered by latest update
+        poems = query.order_by(Poem.UPDATED_ON.desc()).all()
+        return jsonify(POEM.many(poems))
+
+    limit = get_page_limit()
+    poems, next_cursor = keyset_page(query, Poem.UPDATED_ON, Poem.STORY_ID,
+                                     request.args.get('cursor'), limit)
+    return jsonify({
+        'items': POEM.many(poems),
+        'next_cursor': next_cursor,
+        'limit': limit
+    })
+
+
+def story_validator(id):
+    # Primary-key lookup of UPDATED_ON only; the STORY text isn't read
+    updated_on = db.session.query(Story.UPDATED_ON).filter(Story.STORY_ID == id).scalar()
+    return ((id, updated_on), updated_on) if updated_on else None
 
 
 # Get a specific story by ID
 @app.route('/api/story/<int:id>', methods=['GET'])
+@conditional(story_validator)
 def get_story(id):
     story = Story.query.get(id)
     if not story:
         return jsonify({'message': 'Story not found'}), 404
-    return jsonify({
-        'id': story.STORY_ID,
-        'name': story.NAME,
-        'language': story.LANGUAGE,
-        'font': story.FONT,
-        'pdf_url': story.PDF_URL,
-        'story': story.STORY,
-        'status': story.STATUS,
-        'price': float(story.PRICE),
-        'tags': story.TAGS,  # 🆕 Include tags
-        'created_on': story.CREATED_ON.isoformat() if story.CREATED_ON else None,
-        'updated_on': story.UPDATED_ON.isoformat() if story.UPDATED_ON else None
-    })
+    return jsonify(STORY_DETAIL.one(story))
 
 
 # Get all stories (for the logged-in writer)
@@ -612,27 +792,12 @@ def get_all_stories():
         return jsonify({'message': 'Authentication required'}), 401
 
     # Get only stories written by this user, ordered by latest update
-    stories = Story.query.filter_by(WRITTEN_BY=user_id).order_by(Story.UPDATED_ON.desc()).all()
-
-    response = []
-    for idx, story in enumerate(stories, start=1):
-        response.append({
-            'serial': idx,  # For table display
-            'id': story.STORY_ID,
-            'authorId': story.WRITTEN_BY,
-            'name': story.NAME,
-            'language': story.LANGUAGE,
-            'font': story.FONT,
-            'pdf_url': story.PDF_URL,
-            'story': story.STORY,
-            'status': story.STATUS,
-            'price': float(story.PRICE) if story.PRICE else 0.00,
-            'tags': story.TAGS,
-            'created_on': story.CREATED_ON.strftime('%Y-%m-%d %H:%M:%S') if story.CREATED_ON else None,
-            'updated_on': story.UPDATED_ON.strftime('%Y-%m-%d %H:%M:%S') if story.UPDATED_ON else None
-        })
-
-    return jsonify(response)
+    query = Story.query.filter_by(WRITTEN_BY=user_id).order_by(Story.UPDATED_ON.desc())
+    if wants_summary():
+        stories = query.options(summary_columns(Story)).all()
+        return jsonify(CONTENT_SUMMARY.many(stories, serial=True))
+    # 'serial' is the table display position
+    return jsonify(STORY.many(query.all(), serial=True))
 
 
 
@@ -655,6 +820,7 @@ def create_poem():
 
         if poem_input_method == 'pdf':
             pdf_url = data.get('pdf_url', '')
+            swap_media_url(None, pdf_url)
         else:
             poem_text = data.get('story', '')
 
@@ -673,10 +839,8 @@ def create_poem():
         if poem_input_method == 'pdf' and 'pdf' in request.files:
             pdf_file = request.files['pdf']
             if pdf_file.filename != '':
-                filename = secure_filename(pdf_file.filename)
-                pdf_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                pdf_file.save(pdf_path)
-                pdf_url = f'/uploads/{filename}'
+                # Stored once per content hash; re-uploads share the same file
+                pdf_url = media_url(store_upload(pdf_file))
         else:
             poem_text = data.get('story', '')
 
@@ -699,6 +863,8 @@ def create_poem():
         TAGS=tags
     )
     db.session.add(poem)
+    move_counter('poem', user_id, None, status)
+    sync_content_indexes('poem', poem)
     db.session.commit()
 
     return jsonify({'message': 'Poem created successfully'})
@@ -711,19 +877,7 @@ def get_poem(id):
     poem = Poem.query.get(id)
     if not poem:
         return jsonify({'message': 'Poem not found'}), 404
-    return jsonify({
-        'id': poem.STORY_ID,
-        'name': poem.NAME,
-        'language': poem.LANGUAGE,
-        'font': poem.FONT,
-        'pdf_url': poem.PDF_URL,
-        'story': poem.STORY,
-        'status': poem.STATUS,
-        'price': float(poem.PRICE),
-        'tags': poem.TAGS,  # 🆕 Include tags
-        'created_on': poem.CREATED_ON.isoformat() if poem.CREATED_ON else None,
-        'updated_on': poem.UPDATED_ON.isoformat() if poem.UPDATED_ON else None
-    })
+    return jsonify(STORY_DETAIL.one(poem))
 
 
 # Get all poems (for the logged-in writer)
@@ -733,24 +887,11 @@ def get_all_poems():
     if not user_id:
         return jsonify({'message': 'Authentication required'}), 401
 
-    # Fetch only this user's poems, latest first
-    poems = Poem.query.filter_by(WRITTEN_BY=user_id).order_by(Poem.UPDATED_ON.desc()).all()
-
-    response = []
-    for idx, poem in enumerate(poems, start=1):
-        response.append({
-            'serial': idx,  # Table "Serial" column
-            'id': poem.STORY_ID,
-            'authorId': poem.WRITTEN_BY,
-            'name': poem.NAME,
-            'tags': poem.TAGS,
-            'language': poem.LANGUAGE,
-            'font': poem.FONT,
-            'status': poem.STATUS,
-            'updated_on': poem.UPDATED_ON.strftime('%Y-%m-%d %H:%M:%S') if poem.UPDATED_ON else None
-        })
-
-    return jsonify(response)
+    # Fetch only this user's poems, latest first (the text isn't listed)
+    poems = Poem.query.filter_by(WRITTEN_BY=user_id).options(defer(Poem.STORY)) \
+                      .order_by(Poem.UPDATED_ON.desc()).all()
+    # 'serial' fills the table "Serial" column
+    return jsonify(POEM.many(poems, serial=True))
 
 
 # Forgot Password
@@ -768,7 +909,9 @@ def toggle_user_status(user_id):
     if not user:
         return jsonify({'message': 'User not found'}), 404
 
+    was_author = counts_as_author(user)
     user.is_active = data.get('is_active', user.is_active)
+    track_author(user, was_author)
     db.session.commit()
     return jsonify({'message': f"User {'activated' if user.is_active else 'deactivated'} successfully"})
 
@@ -781,7 +924,9 @@ def set_user_approval(user_id):
     if not user:
         return jsonify({'message': 'User not found'}), 404
 
+    was_author = counts_as_author(user)
     user.is_approved = data.get('is_approved', user.is_approved)
+    track_author(user, was_author)
     db.session.commit()
     return jsonify({'message': f"User {'approved' if user.is_approved else 'rejected'} successfully"})
 
@@ -798,18 +943,7 @@ def view_users():
     if approved is not None:
         query = query.filter_by(is_approved=(approved.lower() == 'true'))
 
-    users = query.all()
-    return jsonify([{
-        'id': user.id,
-        'full_name': user.full_name,
-        'email': user.email,
-        'mobile': user.mobile,
-        'role': user.role,
-        'is_active': user.is_active,
-        'is_approved': user.is_approved,
-        'created_on': user.created_on,
-        'updated_on': user.updated_on,
-    } for user in users])
+    return jsonify(USER.many(query.all()))
 
 
 # Edit user information
@@ -820,12 +954,14 @@ def edit_user(user_id):
     if not user:
         return jsonify({'message': 'User not found'}), 404
 
+    was_author = counts_as_author(user)
     user.full_name = data.get('full_name', user.full_name)
     user.email = data.get('email', user.email)
     user.mobile = data.get('mobile', user.mobile)
     user.role = data.get('role', user.role)
     if 'password' in data:
         user.set_password(data['password'])
+    track_author(user, was_author)
 
     db.session.commit()
     return jsonify({'message': 'User updated successfully'})
@@ -839,22 +975,13 @@ def view_draft_stories():
     # role = request.args.get('role')
 
     if user_id:
-        drafts = Story.query.filter_by(WRITTEN_BY=user_id, STATUS='draft').all()
+        query = Story.query.filter_by(WRITTEN_BY=user_id, STATUS='draft')
     else:
         return jsonify({'message': 'Authentication required'}), 401
 
-    return jsonify([{
-        'id': story.STORY_ID,
-        'name': story.NAME,
-        'tags': story.TAGS,  # 🆕 Include tags
-        'language': story.LANGUAGE,
-        'font': story.FONT,
-        'pdf_url': story.PDF_URL,
-        'story': story.STORY,
-        'price': float(story.PRICE),
-        'created_on': story.CREATED_ON.isoformat() if story.CREATED_ON else None,
-        'updated_on': story.UPDATED_ON.isoformat() if story.UPDATED_ON else None
-    } for story in drafts])
+    if wants_summary():
+        return jsonify(CONTENT_SUMMARY.many(query.options(summary_columns(Story)).all()))
+    return jsonify(STORY_DRAFT.many(query.all()))
 
 # Edit a draft story
 @app.route('/api/story/<int:id>', methods=['PUT'])
@@ -880,9 +1007,11 @@ def edit_draft_story(id):
     story.NAME = data.get('name', story.NAME)
     story.LANGUAGE = data.get('language', story.LANGUAGE)
     story.FONT = data.get('font', story.FONT)
+    swap_media_url(story.PDF_URL, data.get('pdf_url', story.PDF_URL))
     story.PDF_URL = data.get('pdf_url', story.PDF_URL)
     story.STORY = data.get('story', story.STORY)
     story.PRICE = data.get('price', story.PRICE)
+    sync_content_indexes('story', story)
     
     db.session.commit()
     return jsonify({'message': 'Draft story updated successfully'})
@@ -908,6 +1037,8 @@ def delete_draft_story(id):
     if role != 'Admin' and story.WRITTEN_BY != user_id:
         return jsonify({'message': 'Access denied'}), 403
 
+    move_counter('story', story.WRITTEN_BY, story.STATUS, None)
+    release_media_url(story.PDF_URL)
     db.session.delete(story)
     db.session.commit()
     return jsonify({'message': 'Draft story deleted successfully'})
@@ -932,6 +1063,9 @@ def delete_published_story(id):
     if role != 'Admin':
         return jsonify({'message': 'Access denied - Only Admins can delete published stories'}), 403
 
+    move_counter('story', story.WRITTEN_BY, story.STATUS, None)
+    drop_content_indexes('story', story.STORY_ID)
+    release_media_url(story.PDF_URL)
     db.session.delete(story)
     db.session.commit()
     return jsonify({'message': 'Published story deleted successfully'})
@@ -955,9 +1089,11 @@ def approve_story(id):
         return jsonify({'message': 'Only pending stories can be approved'}), 400
 
     data = request.json
+    move_counter('story', story.WRITTEN_BY, story.STATUS, 'published')
     story.STATUS = 'published'
     story.PRICE = data.get('price', story.PRICE)
-    story.UPDATED_ON = db.func.now()
+    story.UPDATED_ON = datetime.utcnow()
+    sync_content_indexes('story', story)
     db.session.commit()
     return jsonify({'message': 'Story published successfully'})
 
@@ -969,25 +1105,15 @@ def view_draft_poems():
     
     # Allow access without auth ONLY if Admin (user_id=5)
     if user_id == 5:
-        drafts = Poem.query.filter_by(STATUS='draft').all()  # Admin sees ALL drafts
+        query = Poem.query.filter_by(STATUS='draft')  # Admin sees ALL drafts
     else:
         if not user_id:
             return jsonify({'message': 'Authentication required'}), 401
-        drafts = Poem.query.filter_by(WRITTEN_BY=user_id, STATUS='draft').all()  # Users see only their drafts
-
-    return jsonify([{
-        'id': poem.STORY_ID,
-        'author_id': poem.WRITTEN_BY,
-        'name': poem.NAME,
-        'tags': poem.TAGS,  # 🆕 Include tags
-        'language': poem.LANGUAGE,
-        'font': poem.FONT,
-        'pdf_url': poem.PDF_URL,
-        'story': poem.STORY,
-        'price': float(poem.PRICE),
-        'created_on': poem.CREATED_ON.isoformat() if poem.CREATED_ON else None,
-        'updated_on': poem.UPDATED_ON.isoformat() if poem.UPDATED_ON else None
-    } for poem in drafts])
+        query = Poem.query.filter_by(WRITTEN_BY=user_id, STATUS='draft')  # Users see only their drafts
+
+    if wants_summary():
+        return jsonify(CONTENT_SUMMARY.many(query.options(summary_columns(Poem)).all()))
+    return jsonify(POEM_DRAFT.many(query.all()))
 
 
 # Edit a draft poem
@@ -1005,9 +1131,11 @@ def edit_draft_poem(id):
     poem.NAME = data.get('name', poem.NAME)
     poem.LANGUAGE = data.get('language', poem.LANGUAGE)
     poem.FONT = data.get('font', poem.FONT)
+    swap_media_url(poem.PDF_URL, data.get('pdf_url', poem.PDF_URL))
     poem.PDF_URL = data.get('pdf_url', poem.PDF_URL)
     poem.STORY = data.get('story', poem.STORY)
     poem.PRICE = data.get('price', poem.PRICE)
+    sync_content_indexes('poem', poem)
     db.session.commit()
     return jsonify({'message': 'Draft poem updated successfully'})
 
@@ -1028,6 +1156,8 @@ def delete_draft_poem(id):
     if current_user.role != 'Admin' and poem.WRITTEN_BY != user:
         return jsonify({'message': 'Access denied'}), 403
 
+    move_counter('poem', poem.WRITTEN_BY, poem.STATUS, None)
+    release_media_url(poem.PDF_URL)
     db.session.delete(poem)
     db.session.commit()
     return jsonify({'message': 'Draft poem deleted successfully'})
@@ -1052,6 +1182,9 @@ def delete_published_poem(id):
     if role != 'Admin':
         return jsonify({'message': 'Access denied - Only Admins can delete published poems'}), 403
 
+    move_counter('poem', poem.WRITTEN_BY, poem.STATUS, None)
+    drop_content_indexes('poem', poem.STORY_ID)
+    release_media_url(poem.PDF_URL)
     db.session.delete(poem)
     db.session.commit()
     return jsonify({'message': 'Published poem deleted successfully'})
@@ -1077,7 +1210,10 @@ def approve_poem(id):
 
     data = request.json
     poem.PRICE = data.get('price', poem.PRICE)
+    move_counter('poem', poem.WRITTEN_BY, poem.STATUS, 'published')
     poem.STATUS = 'published'
+    poem.UPDATED_ON = datetime.utcnow()
+    sync_content_indexes('poem', poem)
     db.session.commit()
     return jsonify({'message': 'Poem published successfully'})
 
@@ -1090,7 +1226,7 @@ def admin_create_user():
     if not user_id:
         return jsonify({'message': 'Authentication required'}), 401
     
-    current_user = User.query.get(user_id)
+    current_user = principal_cache.user(user_id)
     if not current_user or current_user.role != 'Admin':
         return jsonify({'message': 'Unauthorized - Admin access required'}), 403
 
@@ -1121,6 +1257,7 @@ def admin_create_user():
     )
     user.set_password(data['password'])
     db.session.add(user)
+    track_author(user, False)
     db.session.commit()
     
     return jsonify({
@@ -1132,38 +1269,12 @@ def admin_create_user():
 # Get all stories by user ID
 @app.route('/api/stories/user/<int:user_id>', methods=['GET'])
 def get_stories_by_user(user_id):
-    stories = Story.query.filter_by(WRITTEN_BY=user_id).all()
-    return jsonify([{
-        'id': story.STORY_ID,
-        'name': story.NAME,
-        'tags': story.TAGS,  # 🆕 Include tags
-        'language': story.LANGUAGE,
-        'font': story.FONT,
-        'pdf_url': story.PDF_URL,
-        'story': story.STORY,
-        'status': story.STATUS,
-        'price': float(story.PRICE),
-        'created_on': story.CREATED_ON.isoformat() if story.CREATED_ON else None,
-        'updated_on': story.UPDATED_ON.isoformat() if story.UPDATED_ON else None
-    } for story in stories])
+    return jsonify(STORY_DETAIL.many(Story.query.filter_by(WRITTEN_BY=user_id).all()))
 
 # Get all poems by user ID
 @app.route('/api/poems/user/<int:user_id>', methods=['GET'])
 def get_poems_by_user(user_id):
-    poems = Poem.query.filter_by(WRITTEN_BY=user_id).all()
-    return jsonify([{
-        'id': poem.STORY_ID,
-        'name': poem.NAME,
-        'tags': poem.TAGS,  # 🆕 Include tags
-        'language': poem.LANGUAGE,
-        'font': poem.FONT,
-        'pdf_url': poem.PDF_URL,
-        'story': poem.STORY,
-        'status': poem.STATUS,
-        'price': float(poem.PRICE),
-        'created_on': poem.CREATED_ON.isoformat() if poem.CREATED_ON else None,
-        'updated_on': poem.UPDATED_ON.isoformat() if poem.UPDATED_ON else None
-    } for poem in poems])
+    return jsonify(STORY_DETAIL.many(Poem.query.filter_by(WRITTEN_BY=user_id).all()))
 
 # Reject (unpublish) a published poem - set status back to 'pending'
 @app.route('/api/poem/<int:id>/reject', methods=['POST'])
@@ -1184,8 +1295,10 @@ def reject_poem(id):
     if poem.STATUS != 'published':
         return jsonify({'message': 'Only published poems can be rejected'}), 400
 
+    move_counter('poem', poem.WRITTEN_BY, poem.STATUS, 'pending')
     poem.STATUS = 'pending'
-    poem.UPDATED_ON = db.func.now()
+    poem.UPDATED_ON = datetime.utcnow()
+    drop_content_indexes('poem', poem.STORY_ID)
     db.session.commit()
 
     return jsonify({'message': 'Poem status set to pending (rejected)'})
@@ -1209,29 +1322,112 @@ def reject_story(id):
     if story.STATUS != 'published':
         return jsonify({'message': 'Only published stories can be rejected'}), 400
 
+    move_counter('story', story.WRITTEN_BY, story.STATUS, 'pending')
     story.STATUS = 'pending'
-    story.UPDATED_ON = db.func.now()
+    story.UPDATED_ON = datetime.utcnow()
+    drop_content_indexes('story', story.STORY_ID)
     db.session.commit()
 
     return jsonify({'message': 'Story status set to pending (rejected)'})
 
 
+# Bulk moderation: {"ids": [...], "action": "approve"|"reject", "price": optional}
+# <content_type> is story, poem or audio; users also take "activate"/"deactivate".
+# Every eligible id changes in one UPDATE and one transaction; the response reports each id.
+@app.route('/api/admin/moderation/<content_type>', methods=['POST'])
+def bulk_moderate(content_type):
+    _, error = get_active_admin()
+    if error:
+        return error
+
+    data = request.get_json(silent=True) or {}
+    try:
+        if content_type == 'user':
+            results = moderate_users(data.get('action'), data.get('ids'))
+        else:
+            results = moderate_content(content_type, data.get('action'), data.get('ids'), data.get('price'))
+        db.session.commit()
+    except ModerationError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify({
+        'action': data.get('action'),
+        'type': content_type,
+        'updated': sum(1 for r in results if r['result'] == 'updated'),
+        'results': results
+    })
+
+
+# Streaming export for reporting jobs: users, stories, poems or audio as NDJSON or CSV.
+#   ?format=ndjson|csv  ?columns=id,name,...  filters: status, language, author_id (content),
+#   role, approved, active (users), updated_since/updated_before (ISO dates)
+# Rows are streamed in batches, gzipped on the fly when the client accepts it.
+# export_data.py does the same from the command line.
+@app.route('/api/admin/export/<export_type>', methods=['GET'])
+@read_replica
+def export_rows(export_type):
+    # Checked before the query runs, so nothing is streamed to an inactive admin
+    _, error = get_active_admin()
+    if error:
+        return error
+
+    fmt = request.args.get('format', 'ndjson')
+    columns = [c.strip() for c in request.args.get('columns', '').split(',') if c.strip()]
+    try:
+        chunks = stream_export(export_type, fmt, columns, request.args)
+    except ExportError as e:
+        return jsonify({'message': str(e)}), 400
+
+    headers = {'Content-Disposition': f'attachment; filename="{export_type}.{fmt}"',
+               'Vary': 'Accept-Encoding', 'Cache-Control': 'no-store'}
+    if request.accept_encodings['gzip']:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    return app.response_class(stream_with_context(chunks), mimetype=EXPORT_FORMATS[fmt], headers=headers)
+
+
+# Help & Support table columns in DataTables order: (SQL column, search mode)
+HELP_SUPPORT_COLUMNS = [
+    (HelpSupport.id, 'int'),
+    (HelpSupport.support_type, 'like'),
+    (User.full_name, 'like'),
+    (User.role, 'exact'),
+    (HelpSupport.created_on, None),
+    (HelpSupport.status, 'exact'),
+    (HelpSupport.updated_on, None),
+]
+
+
 # 📌 1. Get all Help & Support requests (for DataTable)
+# With DataTables' server-side parameters (draw, start, length, search[value],
+# columns[i][search][value], order[k][column|dir]) only the requested page is
+# read; without `draw` the whole table is returned as before.
 @app.route('/api/help-support', methods=['GET'])
 def get_all_help_support():
-    requests = HelpSupport.query.all()
-    table_data = []
-    for r in requests:
-        table_data.append([
-            r.id,
-            r.support_type or "",
-            r.user.full_name if r.user else "",
-            r.user.role if r.user else "",
-            r.created_on.strftime("%Y-%m-%d") if r.created_on else "",
-            r.status or "",
-            r.updated_on.strftime("%Y-%m-%d") if r.updated_on else "",
-        ])
-    return jsonify({"data": table_data})
+    # The ticket's user comes from the same query instead of one lazy load per row
+    query = HelpSupport.query.join(User, HelpSupport.user).options(contains_eager(HelpSupport.user))
+    params = datatables_params(request.args)
+    if params is None:
+        return jsonify({"data": HELP_SUPPORT_ROW.many_lists(query.all())})
+
+    # Counted through the same join as the rows, so recordsTotal matches what can be listed
+    count_query = db.session.query(func.count(HelpSupport.id)).join(User, HelpSupport.user)
+    total = count_query.scalar()
+    filtered = total
+    if params['search'] or params['column_search']:
+        filtered = datatables_filter(count_query, HELP_SUPPORT_COLUMNS, params).scalar()
+        query = datatables_filter(query, HELP_SUPPORT_COLUMNS, params)
+
+    query = datatables_order(query, HELP_SUPPORT_COLUMNS, params,
+                             default=[HelpSupport.created_on.desc(), HelpSupport.id.desc()])
+    rows = query.offset(params['start']).limit(params['length']).all()
+    return jsonify({
+        "draw": params['draw'],
+        "recordsTotal": total,
+        "recordsFiltered": filtered,
+        "data": HELP_SUPPORT_ROW.many_lists(rows)
+    })
 
 
 # 📌 2. View a single Help & Support request
@@ -1296,8 +1492,7 @@ def create_help_support():
     if not user_id:
         return jsonify({"error": "User ID is required"}), 400
 
-    user = User.query.get(user_id)
-    if not user:
+    if not principal_cache.user(user_id):
         return jsonify({"error": "Invalid user ID"}), 404
 
     new_request = HelpSupport(
@@ -1313,6 +1508,19 @@ def create_help_support():
 
     return jsonify({"message": "Help & Support request created successfully"}), 201
 
+# Content-addressed uploads (see storage.py); seekable, cached for a year
+@app.route('/media/<path:filename>', methods=['GET'])
+def serve_media(filename):
+    return send_media(app.config['MEDIA_FOLDER'], filename, immutable=True,
+                      accel_prefix=app.config.get('MEDIA_ACCEL_REDIRECT_PREFIX'))
+
+
+# PDFs uploaded before content-addressed storage were linked as /uploads/<file>
+@app.route('/uploads/<path:filename>', methods=['GET'])
+def serve_upload(filename):
+    return send_media(app.config['UPLOAD_FOLDER'], filename, immutable=False)
+
+
 UPLOAD_AUDIO_FOLDER = "static/audio"
 ALLOWED_AUDIO_EXTENSIONS = {"mp3", "wav", "m4a"}
 
@@ -1340,13 +1548,8 @@ def create_audio_story():
     # Handle audio file upload
     audio_file = request.files.get("audio")
     if audio_file and allowed_audio_file(audio_file.filename):
-        filename = secure_filename(audio_file.filename)
-        os.makedirs(app.config["UPLOAD_AUDIO_FOLDER"], exist_ok=True)
-        audio_path = os.path.join(app.config["UPLOAD_AUDIO_FOLDER"], filename)
-        audio_file.save(audio_path)
-
-        # Serve from static/audio
-        audio_url = f"/static/audio/{filename}"
+        # Streamed to disk and stored once per content hash
+        audio_url = media_url(store_upload(audio_file))
 
     # Process Tagify tags
     if "tags" in data:
@@ -1379,6 +1582,13 @@ def create_audio_story():
     )
 
     db.session.add(audio_story)
+    move_counter('audio', admin_id, None, status)
+    sync_content_indexes('audio', audio_story)
+    if audio_url:
+        db.session.flush()
+        # Duration, bitrate etc. are filled in by the job worker (run_worker.py)
+        enqueue('audio.probe_meta', {'audio_id': audio_story.AUDIO_ID},
+                key=f'audio-meta:{audio_story.AUDIO_ID}')
     db.session.commit()
 
     return jsonify({"message": "Audio story created successfully"})
@@ -1398,7 +1608,13 @@ def approve_audio_story(audio_id):
     if not audio_story:
         return jsonify({"message": "Audio story not found"}), 404
 
+    move_counter('audio', audio_story.CREATED_BY, audio_story.STATUS, 'published')
     audio_story.STATUS = "published"
+    audio_story.UPDATED_ON = datetime.utcnow()
+    sync_content_indexes('audio', audio_story)
+    if audio_story.AUDIO_URL and audio_story.BYTE_SIZE is None:
+        # Uploaded before metadata was stored, or the upload's job hasn't run yet
+        enqueue('audio.probe_meta', {'audio_id': audio_id}, key=f'audio-meta:{audio_id}')
     db.session.commit()
 
     return jsonify({"message": "Audio story approved and published successfully"})
@@ -1418,139 +1634,276 @@ def reject_audio_story(audio_id):
     if not audio_story:
         return jsonify({"message": "Audio story not found"}), 404
 
+    move_counter('audio', audio_story.CREATED_BY, audio_story.STATUS, 'rejected')
     audio_story.STATUS = "rejected"
+    audio_story.UPDATED_ON = datetime.utcnow()
+    drop_content_indexes('audio', audio_story.AUDIO_ID)
     db.session.commit()
 
     return jsonify({"message": "Audio story has been rejected"})
 
 
+def query_audio_with_linked_names(query):
+    """Attach the linked story/poem NAME to an AudioStory query via outer joins.
+
+    Yields (audio, story_name, poem_name) tuples from a single SELECT instead
+    of one Story/Poem lookup per audio row.
+    """
+    return query.outerjoin(Story, and_(AudioStory.LINK_TYPE == 'storyAvailable',
+                                       Story.STORY_ID == AudioStory.LINKED_STORY_ID)) \
+                .outerjoin(Poem, and_(AudioStory.LINK_TYPE == 'poemAvailable',
+                                      Poem.STORY_ID == AudioStory.LINKED_POEM_ID)) \
+                .add_columns(Story.NAME, Poem.NAME)
+
+
+def serialize_audio_list(rows, fields):
+    """Build the audio table rows shared by the admin and public audio listings.
+
+    `rows` come from query_audio_with_linked_names(); `fields` picks the
+    optional AUDIO_ROW_FIELDS groups each endpoint exposes on top of the
+    common keys. 'actions' are handled on the frontend with 'id'.
+    """
+    return audio_row_serializer(fields).many(rows, serial=True)
+
+
 @app.route('/api/admin/drafted_audio', methods=['GET'])
 def get_admin_drafted_audio():
     # Query only drafted audio stories sorted by creation date descending
-    audios = AudioStory.query.filter_by(STATUS='draft').order_by(AudioStory.CREATED_ON.desc()).all()
-    audio_list = []
-    serial = 1
-
-    for audio in audios:
-        # Convert tags comma string to a list
-        tags_list = []
-        if audio.TAGS:
-            tags_list = [t.strip() for t in audio.TAGS.split(',') if t.strip()]
-
-        # Resolve linked story or poem name if needed (assuming relationships or querying)
-        linked_name = ""
-        if audio.LINK_TYPE == "storyAvailable" and audio.LINKED_STORY_ID:
-            story = Story.query.get(audio.LINKED_STORY_ID)
-            linked_name = story.NAME if story else ""
-        elif audio.LINK_TYPE == "poemAvailable" and audio.LINKED_POEM_ID:
-            # Assuming a Poem model exists similarly to Story
-            poem = Poem.query.get(audio.LINKED_POEM_ID)
-            linked_name = poem.NAME if poem else ""
-
-        created_on_display = audio.CREATED_ON.strftime('%d-%m-%Y %H:%M') if audio.CREATED_ON else ""
-        updated_on_display = audio.UPDATED_ON.strftime('%d-%m-%Y %H:%M') if audio.UPDATED_ON else ""
-
-        audio_list.append({
-            'serial': serial,
-            'id': audio.AUDIO_ID,
-            'name': audio.NAME,
-            'tags': tags_list,
-            'language': audio.LANGUAGE,
-            'linked_name': linked_name,
-            'created_on': created_on_display,
-            'updated_on': updated_on_display,
-            # 'actions' field can be handled client-side based on ID
-        })
-
-        serial += 1
-
-    return jsonify(audio_list)
+    query = AudioStory.query.filter_by(STATUS='draft').order_by(AudioStory.CREATED_ON.desc())
+    return jsonify(serialize_audio_list(query_audio_with_linked_names(query).all(), ('created_on',)))
 
 @app.route('/api/admin/all_audio', methods=['GET'])
 def get_admin_all_audio():
-    audios = AudioStory.query.order_by(AudioStory.UPDATED_ON.desc()).all()
-    audio_list = []
-    serial = 1
-
-    for audio in audios:
-        # Convert tags string to list
-        tags_list = []
-        if audio.TAGS:
-            tags_list = [t.strip() for t in audio.TAGS.split(',') if t.strip()]
-
-        # Resolve linked story or poem name if applicable
-        linked_name = ""
-        if audio.LINK_TYPE == "storyAvailable" and audio.LINKED_STORY_ID:
-            story = Story.query.get(audio.LINKED_STORY_ID)
-            linked_name = story.NAME if story else ""
-        elif audio.LINK_TYPE == "poemAvailable" and audio.LINKED_POEM_ID:
-            poem = Poem.query.get(audio.LINKED_POEM_ID)
-            linked_name = poem.NAME if poem else ""
-
-        updated_on_display = audio.UPDATED_ON.strftime('%d-%m-%Y %H:%M') if audio.UPDATED_ON else ""
-
-        audio_list.append({
-            'serial': serial,
-            'id': audio.AUDIO_ID,
-            'name': audio.NAME,
-            'tags': tags_list,
-            'language': audio.LANGUAGE,
-            'linked_name': linked_name,
-            'status': audio.STATUS,
-            'updated_on': updated_on_display
-            # 'audio_url': audio.AUDIO_URL
-            # 'actions' handled on frontend with 'id'
-        })
-        serial += 1
+    query = AudioStory.query.order_by(AudioStory.UPDATED_ON.desc())
+    return jsonify(serialize_audio_list(query_audio_with_linked_names(query).all(), ('status',)))
+
+def public_audio_validator():
+    # Linked names come from published stories/poems, so their latest change counts too
+    linked_changed = [select(func.max(model.UPDATED_ON)).where(model.STATUS == 'published').scalar_subquery()
+                      for model in (Story, Poem)]
+    # File metadata filled in by the audio.probe_meta job shows up as a counter VERSION bump
+    return catalogue_validator(AudioStory, 'audio', published_only=False, extra=linked_changed)
 
-    return jsonify(audio_list)
 
 @app.route('/api/public/audio', methods=['GET'])
+@read_replica
+@conditional(public_audio_validator)
+@cached('audio')
 def get_all_published_audio():
-    audios = AudioStory.query.order_by(AudioStory.UPDATED_ON.desc()).all()
-    audio_list = []
-    serial = 1
-
-    for audio in audios:
-        # Convert tags string to list
-        tags_list = []
-        if audio.TAGS:
-            tags_list = [t.strip() for t in audio.TAGS.split(',') if t.strip()]
-
-        # Resolve linked story or poem name if applicable
-        linked_name = ""
-        if audio.LINK_TYPE == "storyAvailable" and audio.LINKED_STORY_ID:
-            story = Story.query.get(audio.LINKED_STORY_ID)
-            linked_name = story.NAME if story else ""
-        elif audio.LINK_TYPE == "poemAvailable" and audio.LINKED_POEM_ID:
-            poem = Poem.query.get(audio.LINKED_POEM_ID)
-            linked_name = poem.NAME if poem else ""
-
-        updated_on_display = audio.UPDATED_ON.strftime('%d-%m-%Y %H:%M') if audio.UPDATED_ON else ""
-
-        audio_list.append({
-            'serial': serial,
-            'id': audio.AUDIO_ID,
-            'name': audio.NAME,
-            'tags': tags_list,
-            'language': audio.LANGUAGE,
-            'linked_name': linked_name,
-            'status': audio.STATUS,
-            'updated_on': updated_on_display,
-            'audio_url': audio.AUDIO_URL
-            # 'actions' handled on frontend with 'id'
-        })
-        serial += 1
+    query = AudioStory.query.order_by(AudioStory.UPDATED_ON.desc())
+    return jsonify(serialize_audio_list(query_audio_with_linked_names(query).all(),
+                                        ('status', 'audio_url', 'media')))
+
+# ========== Merged feed ==========
+
+# content type -> (model, id column); the order also breaks UPDATED_ON ties between types
+FEED_TYPES = {
+    'story': (Story, Story.STORY_ID),
+    'poem': (Poem, Poem.STORY_ID),
+    'audio': (AudioStory, AudioStory.AUDIO_ID),
+}
+
+
+def encode_feed_cursor(positions):
+    """Pack {type: position} into a token; a position is [updated_on, id], [] for
+    "from the top", or None once that type has nothing left."""
+    payload = json.dumps({t: [p[0].isoformat() if p[0] else None, p[1]] if p else p
+                          for t, p in positions.items()})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_feed_cursor(token):
+    """Inverse of encode_feed_cursor(); raises BadRequest on anything malformed."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        positions = {}
+        for content_type, position in raw.items():
+            if content_type not in FEED_TYPES:
+                raise ValueError(content_type)
+            if position:
+                updated_on, row_id = position
+                position = ((datetime.fromisoformat(updated_on) if updated_on else None), int(row_id))
+            positions[content_type] = position
+        return positions
+    except (ValueError, TypeError, AttributeError, binascii.Error):
+        raise BadRequest("Invalid 'cursor'.")
+
+
+def feed_rows(content_type, position, language, limit):
+    """Up to `limit` published rows of one type after `position`, newest first."""
+    model, id_col = FEED_TYPES[content_type]
+    query = model.query.filter(model.STATUS == 'published')
+    if content_type == 'audio':
+        query = query.options(load_only(AudioStory.AUDIO_ID, AudioStory.NAME, AudioStory.LANGUAGE,
+                                        AudioStory.TAGS, AudioStory.AUDIO_URL, AudioStory.UPDATED_ON))
+    else:
+        query = query.options(summary_columns(model))
+    if language:
+        query = query.filter(model.LANGUAGE == language)
+    if position:
+        query = seek_past(query, model.UPDATED_ON, id_col, *position)
+    return query.order_by(model.UPDATED_ON.desc(), id_col.desc()).limit(limit).all()
+
+
+def feed_types():
+    types = [t.strip() for t in request.args.get('type', '').split(',') if t.strip()] or list(FEED_TYPES)
+    invalid = [t for t in types if t not in FEED_TYPES]
+    if invalid:
+        raise BadRequest(f"Invalid type: {', '.join(invalid)}")
+    return [t for t in FEED_TYPES if t in types]
+
+
+def feed_validator():
+    parts, stamps = [], []
+    for content_type in feed_types():
+        model, _ = FEED_TYPES[content_type]
+        type_parts, last_modified = catalogue_validator(model, content_type)
+        parts.append(type_parts)
+        if last_modified:
+            stamps.append(last_modified)
+    return tuple(parts), (max(stamps) if stamps else None)
+
+
+# Published stories, poems and audio merged newest first
+# ?type=story,poem,audio (default all)&language=&limit=&cursor=
+@app.route('/api/public/feed', methods=['GET'])
+@read_replica
+@conditional(feed_validator)
+@cached('story', 'poem', 'audio')
+def get_public_feed():
+    types = feed_types()
+    limit = get_page_limit()
+    cursor = request.args.get('cursor')
+    positions = decode_feed_cursor(cursor) if cursor else {t: [] for t in types}
+    language = request.args.get('language')
+
+    # One indexed seek per type; each can contribute at most `limit` rows to this page
+    sources = {t: feed_rows(t, positions[t], language, limit)
+               for t in types if positions.get(t) is not None}
+
+    # k-way merge on the same (UPDATED_ON, id) DESC order the queries use, NULLs last
+    streams = []
+    for rank, content_type in enumerate(FEED_TYPES):
+        if content_type in sources:
+            id_key = FEED_TYPES[content_type][1].key
+            streams.append([((row.UPDATED_ON or datetime.min, -rank, getattr(row, id_key)), content_type, row)
+                            for row in sources[content_type]])
+    merged = list(itertools.islice(heapq.merge(*streams, key=lambda item: item[0], reverse=True), limit))
+
+    taken = {t: [] for t in sources}
+    for _, content_type, row in merged:
+        taken[content_type].append(row)
+    next_positions = {}
+    for content_type, rows in sources.items():
+        used = taken[content_type]
+        if len(used) == len(rows) and len(rows) < limit:
+            next_positions[content_type] = None      # nothing left of this type
+        elif used:
+            id_col = FEED_TYPES[content_type][1]
+            next_positions[content_type] = [used[-1].UPDATED_ON, getattr(used[-1], id_col.key)]
+        else:
+            next_positions[content_type] = positions[content_type]
+    more = any(p is not None for p in next_positions.values())
+
+    return jsonify({
+        'items': [FEED_ITEM[content_type].one(row) for _, content_type, row in merged],
+        'next_cursor': encode_feed_cursor(next_positions) if more else None,
+        'limit': limit
+    })
+
+
+# Full-text search over published stories, poems and audio
+# ?q=<text>&type=story,poem,audio&language=<lang>&limit=<n>
+@app.route('/api/search', methods=['GET'])
+@read_replica
+def search_content():
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'message': "Missing 'q' search text"}), 400
+
+    types = [t.strip() for t in request.args.get('type', '').split(',') if t.strip()] or list(SEARCH_TYPES)
+    invalid = [t for t in types if t not in SEARCH_TYPES]
+    if invalid:
+        return jsonify({'message': f"Invalid type: {', '.join(invalid)}"}), 400
+
+    results = search_documents(q, types, request.args.get('language'), get_page_limit())
+    for r in results:
+        r['updated_on'] = r['updated_on'].strftime('%Y-%m-%d %H:%M:%S') if r['updated_on'] else None
+    return jsonify({'query': q, 'results': results})
+
+
+# Tag facets: most used tags across published content, optionally for one ?type=
+@app.route('/api/tags', methods=['GET'])
+@read_replica
+def get_tag_facets():
+    content_type = request.args.get('type')
+    if content_type and content_type not in TAG_TYPES:
+        return jsonify({'message': f"Invalid type: {content_type}"}), 400
+
+    facets = tag_facets(content_type, get_page_limit())
+    return jsonify({'tags': [{'tag': name, 'count': n} for name, n in facets]})
+
+
+# Published items carrying a tag, newest first
+# ?type=story|poem|audio (default story)&limit=&cursor=
+@app.route('/api/tags/<tag>/items', methods=['GET'])
+@read_replica
+def get_tagged_items(tag):
+    content_type = request.args.get('type', 'story')
+    if content_type not in TAG_TYPES:
+        return jsonify({'message': f"Invalid type: {content_type}"}), 400
+
+    names = parse_tags(tag)
+    query, model, id_col = tagged_query(content_type, names[0]) if names else (None, None, None)
+    limit = get_page_limit()
+    if query is None:
+        return jsonify({'tag': tag, 'type': content_type, 'items': [], 'next_cursor': None, 'limit': limit})
+
+    if content_type == 'audio':
+        rows, next_cursor = keyset_page(query, AudioStory.UPDATED_ON, AudioStory.AUDIO_ID,
+                                        request.args.get('cursor'), limit)
+        items = AUDIO_SUMMARY.many(rows)
+    else:
+        rows, next_cursor = keyset_page(query.options(summary_columns(model)), model.UPDATED_ON, id_col,
+                                        request.args.get('cursor'), limit)
+        items = CONTENT_SUMMARY.many(rows)
+
+    return jsonify({'tag': names[0], 'type': content_type, 'items': items,
+                    'next_cursor': next_cursor, 'limit': limit})
+
+
+def author_count_subqueries():
+    """Per-writer story/poem/audio totals, read from the maintained counter rows."""
+    def per_writer(content_type):
+        return db.session.query(ContentCounter.USER_ID.label('user_id'),
+                                func.sum(ContentCounter.COUNT).label('n')) \
+                         .filter(ContentCounter.CONTENT_TYPE == content_type,
+                                 ContentCounter.USER_ID != GLOBAL_SCOPE) \
+                         .group_by(ContentCounter.USER_ID).subquery()
+    return per_writer('story'), per_writer('poem'), per_writer('audio')
 
-    return jsonify(audio_list)
 
 @app.route("/api/authors", methods=["GET"])
+@read_replica
+@cached('author')
 def get_authors():
     try:
         search = request.args.get("search", "").strip()
         filter_by = request.args.get("filter", "all")
 
-        query = User.query.filter_by(role="Writer", is_active=True, is_approved=True)
+        stories, poems, audios = author_count_subqueries()
+        story_count = func.coalesce(stories.c.n, 0)
+        poem_count = func.coalesce(poems.c.n, 0)
+        audio_count = func.coalesce(audios.c.n, 0)
+
+        # One row per writer with all three counts already joined in
+        query = db.session.query(User, story_count.label("stories"), poem_count.label("poems"),
+                                 audio_count.label("audios")) \
+                          .filter(User.role == "Writer", User.is_active.is_(True), User.is_approved.is_(True)) \
+                          .outerjoin(stories, stories.c.user_id == User.id) \
+                          .outerjoin(poems, poems.c.user_id == User.id) \
+                          .outerjoin(audios, audios.c.user_id == User.id)
 
         #  Search filter
         if search:
@@ -1561,53 +1914,65 @@ def get_authors():
 
         #  Filter options
         if filter_by == "recent":
-            query = query.order_by(User.created_on.desc())
+            query = query.order_by(User.created_on.desc(), User.id.desc())
         elif filter_by == "popular":
-            # Example: popularity = number of stories + poems
-            query = query.outerjoin(Story, Story.WRITTEN_BY == User.id) \
-                         .outerjoin(Poem, Poem.WRITTEN_BY == User.id) \
-                         .group_by(User.id) \
-                         .order_by(desc(func.count(Story.STORY_ID) + func.count(Poem.STORY_ID)))
+            # Popularity = number of stories + poems
+            query = query.order_by(desc(story_count + poem_count), User.id)
         elif filter_by in ["english", "bengali", "hindi"]:
-            # Assuming language stored in stories/poems
-            query = query.join(Story, Story.WRITTEN_BY == User.id) \
-                         .filter(Story.LANGUAGE.ilike(filter_by))
+            # Writers with at least one story in that language
+            query = query.filter(Story.query.filter(Story.WRITTEN_BY == User.id,
+                                                    Story.LANGUAGE.ilike(filter_by)).exists())
         elif filter_by == "story":
-            query = query.join(Story, Story.WRITTEN_BY == User.id)
+            query = query.filter(story_count > 0)
         elif filter_by == "poem":
-            query = query.join(Poem, Poem.WRITTEN_BY == User.id)
+            query = query.filter(poem_count > 0)
 
-        authors = query.all()
+        if filter_by not in ("recent", "popular"):
+            query = query.order_by(User.id)
 
-        result = []
-        for author in authors:
-            story_count = Story.query.filter_by(WRITTEN_BY=author.id).count()
-            poem_count = Poem.query.filter_by(WRITTEN_BY=author.id).count()
-            audio_count = AudioStory.query.filter_by(CREATED_BY=author.id).count()
+        total = query.order_by(None).count()
+        if wants_unpaginated():
+            page, limit = 1, None
+            rows = query.all()
+        else:
+            limit = get_page_limit()
+            try:
+                page = max(1, int(request.args.get("page", 1)))
+            except ValueError:
+                raise BadRequest("'page' must be an integer.")
+            rows = query.limit(limit).offset((page - 1) * limit).all()
 
+        result = []
+        for author, n_stories, n_poems, n_audios in rows:
             result.append({
                 "id": author.id,
                 "full_name": author.full_name,
                 "email": author.email,
-                "stories": story_count,
-                "poems": poem_count,
-                "audios": audio_count,
+                "stories": n_stories,
+                "poems": n_poems,
+                "audios": n_audios,
                 "created_on": author.created_on.strftime("%Y-%m-%d"),
                 # "profile_image": author.profile_image if author.profile_image else "default.jpg",  # Add this line
             })
 
-        return jsonify({"authors": result, "total": len(result)}), 200
+        return jsonify({"authors": result, "total": total, "page": page, "limit": limit}), 200
 
+    except BadRequest:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/author-stats", methods=["GET"])
+@read_replica
+@cached('author')
 def author_stats():
     try:
-        total_authors = User.query.filter_by(role="Writer", is_active=True, is_approved=True).count()
-        total_stories = Story.query.count()
-        total_poems = Poem.query.count()
-        total_audio = AudioStory.query.count()
+        # Site-wide counters, kept current by the write paths and reconcile_counters.py
+        counts = get_counts(GLOBAL_SCOPE)
+        total_authors = counts.get('author', {}).get('active', 0)
+        total_stories = sum(counts.get('story', {}).values())
+        total_poems = sum(counts.get('poem', {}).values())
+        total_audio = sum(counts.get('audio', {}).values())
 
         return jsonify({
             "total_authors": total_authors,
@@ -1619,6 +1984,43 @@ def author_stats():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Response cache hit/miss/eviction counters, for sizing RESPONSE_CACHE_* (active admins only)
+@app.route('/api/admin/cache-stats', methods=['GET'])
+def get_cache_stats():
+    _, error = get_active_admin()
+    if error:
+        return error
+    return jsonify(response_cache.snapshot())
+
+
+def metrics_scraper_allowed():
+    # Scrapers can't log in: let them in by bearer token (METRICS_TOKEN) or address (METRICS_ALLOWED_IPS)
+    token = app.config.get('METRICS_TOKEN')
+    auth = request.headers.get('Authorization', '')
+    if token and auth.startswith('Bearer ') and hmac.compare_digest(auth[len('Bearer '):].encode(), token.encode()):
+        return True
+    return request.remote_addr in app.config.get('METRICS_ALLOWED_IPS', [])
+
+
+# Prometheus scrape target: per-route request metrics, DB pool and cache stats
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    if not metrics_scraper_allowed():
+        _, error = get_active_admin()
+        if error:
+            return error
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+# Background job queue depth by status (active admins only)
+@app.route('/api/admin/job-stats', methods=['GET'])
+def get_job_stats():
+    _, error = get_active_admin()
+    if error:
+        return error
+    return jsonify(job_stats())
+
+
 #  API to fetch Writer details by id
 
 @app.route('/api/writer/<int:user_id>', methods=['GET'])
@@ -0,0 +1,282 @@
+"""Pure-Python audio header parsing for WAV, MP3 and M4A/MP4.
+
+Only headers are read (a few KB, plus seeks past large chunks), never the
+audio frames themselves, so probing is cheap enough to run at upload time.
+"""
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from models import db, AudioStory
+from storage import resolve_media_path
+from counters import touch_counters
+from passwords import pool_context
+from jobs import task
+
+# MPEG audio bitrates in kbps, indexed by [version is MPEG-1][layer][bitrate index]
+_MP3_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# Sample rates by MPEG version bits: 0 = 2.5, 2 = MPEG-2, 3 = MPEG-1
+_MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+MP3_SCAN_BYTES = 64 * 1024       # how far past the ID3 tag to look for the first frame
+MP4_MAX_MOOV_BYTES = 16 * 1024 * 1024
+
+# probe_audio() key -> AudioStory column
+AUDIO_META_COLUMNS = {
+    'duration': 'DURATION_SEC',
+    'bitrate': 'BITRATE',
+    'sample_rate': 'SAMPLE_RATE',
+    'channels': 'CHANNELS',
+    'byte_size': 'BYTE_SIZE',
+}
+
+
+def probe_audio(path):
+    """Return {duration, bitrate, sample_rate, channels, byte_size} for an audio file.
+
+    Values that can't be determined are None. Unknown formats or unreadable
+    files return just the byte size (or None for it too).
+    """
+    meta = {'duration': None, 'bitrate': None, 'sample_rate': None, 'channels': None, 'byte_size': None}
+    try:
+        meta['byte_size'] = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            head = f.read(12)
+            f.seek(0)
+            if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+                meta.update(_probe_wav(f))
+            elif head[4:8] == b'ftyp':
+                meta.update(_probe_mp4(f, meta['byte_size']))
+            else:
+                meta.update(_probe_mp3(f, meta['byte_size']))
+    except (OSError, struct.error, ValueError):
+        pass
+    if meta['bitrate'] is None and meta['duration'] and meta['byte_size']:
+        meta['bitrate'] = int(meta['byte_size'] * 8 / meta['duration'])
+    return meta
+
+
+def store_audio_meta(audio_id, meta):
+    """Write a probe_audio() result to one AudioStory row without bumping UPDATED_ON,
+    so filling in metadata doesn't reorder the listings. Returns the rows updated."""
+    values = {getattr(AudioStory, column): meta.get(key) for key, column in AUDIO_META_COLUMNS.items()}
+    values[AudioStory.UPDATED_ON] = AudioStory.UPDATED_ON
+    return AudioStory.query.filter_by(AUDIO_ID=audio_id).update(values, synchronize_session=False)
+
+
+@task('audio.probe_meta')
+def probe_audio_job(audio_id):
+    """Job handler: probe the file behind an AudioStory and store its metadata."""
+    url = db.session.query(AudioStory.AUDIO_URL).filter_by(AUDIO_ID=audio_id).scalar()
+    path = resolve_media_path(url)
+    if path is None:
+        return  # row deleted, or no local file to probe
+    if not os.path.isfile(path):
+        raise FileNotFoundError(path)  # retried with backoff
+    store_audio_meta(audio_id, probe_audio(path))
+    touch_counters('audio')
+
+
+def _probe_wav(f):
+    f.seek(12)
+    meta = {}
+    byte_rate = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        chunk_id, size = struct.unpack('<4sI', header)
+        if chunk_id == b'fmt ':
+            fmt = f.read(size)
+            _, channels, sample_rate, byte_rate = struct.unpack('<HHII', fmt[:12])
+            meta.update(channels=channels, sample_rate=sample_rate, bitrate=byte_rate * 8)
+            size -= len(fmt)
+        elif chunk_id == b'data':
+            if byte_rate:
+                meta['duration'] = size / byte_rate
+            break
+        f.seek(size + (size & 1), os.SEEK_CUR)  # chunks are word-aligned
+    return meta
+
+
+def _skip_id3v2(f):
+    header = f.read(10)
+    if header[:3] != b'ID3':
+        f.seek(0)
+        return 0
+    size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+    offset = 10 + size + (10 if header[5] & 0x10 else 0)  # footer flag
+    f.seek(offset)
+    return offset
+
+
+def _probe_mp3(f, file_size):
+    start = _skip_id3v2(f)
+    buf = f.read(MP3_SCAN_BYTES)
+    for i in range(len(buf) - 4):
+        if buf[i] != 0xFF or (buf[i + 1] & 0xE0) != 0xE0:
+            continue
+        b1, b2, b3 = buf[i + 1], buf[i + 2], buf[i + 3]
+        version_bits = (b1 >> 3) & 3
+        layer = 4 - ((b1 >> 1) & 3)
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 3
+        if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+            continue  # reserved/free-format values: not a usable frame header
+        mpeg1 = version_bits == 3
+        sample_rate = _MP3_SAMPLE_RATES[version_bits][rate_index]
+        channels = 1 if (b3 >> 6) == 3 else 2
+        samples_per_frame = 384 if layer == 1 else (1152 if mpeg1 or layer == 2 else 576)
+        frame_bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+
+        # Guard against a stray 0xFFE sync pattern: the next frame must start where this one ends
+        padding = (b2 >> 1) & 1
+        if layer == 1:
+            frame_length = (12 * frame_bitrate // sample_rate + padding) * 4
+        else:
+            frame_length = samples_per_frame // 8 * frame_bitrate // sample_rate + padding
+        following = buf[i + frame_length:i + frame_length + 2]
+        if len(following) == 2 and (following[0] != 0xFF or (following[1] & 0xE0) != 0xE0):
+            continue
+
+        meta = {'sample_rate': sample_rate, 'channels': channels}
+
+        # A Xing/Info (or VBRI) header in the first frame gives the exact frame count
+        frames = None
+        side_info = (32 if channels == 2 else 17) if mpeg1 else (17 if channels == 2 else 9)
+        xing = buf[i + 4 + side_info:i + 4 + side_info + 12]
+        if xing[:4] in (b'Xing', b'Info'):
+            flags = struct.unpack('>I', xing[4:8])[0]
+            if flags & 1:
+                frames = struct.unpack('>I', xing[8:12])[0]
+        elif buf[i + 36:i + 40] == b'VBRI':
+            frames = struct.unpack('>I', buf[i + 50:i + 54])[0]
+
+        audio_bytes = file_size - start - i
+        if file_size >= 128:
+            f.seek(-128, os.SEEK_END)
+            if f.read(3) == b'TAG':
+                audio_bytes -= 128  # ID3v1 trailer
+        if frames:
+            meta['duration'] = frames * samples_per_frame / sample_rate
+            meta['bitrate'] = int(audio_bytes * 8 / meta['duration']) if meta['duration'] else None
+        else:
+            meta['bitrate'] = frame_bitrate
+            meta['duration'] = audio_bytes * 8 / frame_bitrate
+        return meta
+    return {}
+
+
+def _iter_boxes(data, offset=0, end=None):
+    end = len(data) if end is None else end
+    while offset + 8 <= end:
+        size, box_type = struct.unpack('>I4s', data[offset:offset + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', data[offset + 8:offset + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            return
+        yield box_type, offset + header, offset + size
+        offset += size
+
+
+def _find_box(data, path, offset=0, end=None):
+    for box_type, body, box_end in _iter_boxes(data, offset, end):
+        if box_type == path[0]:
+            return (body, box_end) if len(path) == 1 else _find_box(data, path[1:], body, box_end)
+    return None
+
+
+def _probe_mp4(f, file_size):
+    # Walk the top-level boxes by seeking; only moov is read into memory
+    moov = None
+    mdat_size = None
+    offset = 0
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        size, box_type = struct.unpack('>I4s', f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = file_size - offset
+        if size < header:
+            break
+        if box_type == b'moov' and size <= MP4_MAX_MOOV_BYTES:
+            moov = f.read(size - header)
+        elif box_type == b'mdat':
+            mdat_size = size - header
+        offset += size
+    if moov is None:
+        return {}
+
+    meta = {}
+    mvhd = _find_box(moov, [b'mvhd'])
+    if mvhd:
+        body = mvhd[0]
+        if moov[body] == 1:
+            timescale, duration = struct.unpack('>IQ', moov[body + 20:body + 32])
+        else:
+            timescale, duration = struct.unpack('>II', moov[body + 12:body + 20])
+        if timescale:
+            meta['duration'] = duration / timescale
+
+    # First audio track's sample description: moov/trak/mdia/minf/stbl/stsd
+    for box_type, body, box_end in _iter_boxes(moov):
+        if box_type != b'trak':
+            continue
+        stsd = _find_box(moov, [b'mdia', b'minf', b'stbl', b'stsd'], body, box_end)
+        if not stsd:
+            continue
+        entry = stsd[0] + 8  # version/flags + entry count
+        entry_type = moov[entry + 4:entry + 8]
+        if entry_type in (b'mp4a', b'alac', b'ac-3', b'ec-3', b'Opus', b'fLaC'):
+            sample = entry + 8 + 8 + 8  # box header, reserved + data ref index, version/revision/vendor
+            channels, _, _, _, rate_fixed = struct.unpack('>HHHHI', moov[sample:sample + 12])
+            meta.update(channels=channels, sample_rate=rate_fixed >> 16)
+            break
+
+    if mdat_size and meta.get('duration'):
+        meta['bitrate'] = int(mdat_size * 8 / meta['duration'])
+    return meta
+
+
+def backfill_audio_meta(workers=None, batch_size=200, refresh=False):
+    """Probe the files behind existing AudioStory rows in a process pool and store the results.
+
+    Rows that already have metadata are skipped unless `refresh` is set.
+    UPDATED_ON is left alone so the listing order doesn't change. Returns the
+    number of rows updated; each batch is committed as it completes.
+    """
+    query = db.session.query(AudioStory.AUDIO_ID, AudioStory.AUDIO_URL) \
+                      .filter(AudioStory.AUDIO_URL.isnot(None), AudioStory.AUDIO_URL != '')
+    if not refresh:
+        query = query.filter(AudioStory.BYTE_SIZE.is_(None))
+    jobs = []
+    for audio_id, url in query.order_by(AudioStory.AUDIO_ID).all():
+        path = resolve_media_path(url)
+        if path and os.path.isfile(path):
+            jobs.append((audio_id, path))
+
+    workers = workers or os.cpu_count() or 1
+    updated = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as pool:
+        for start in range(0, len(jobs), batch_size):
+            batch = jobs[start:start + batch_size]
+            results = pool.map(probe_audio, [path for _, path in batch],
+                               chunksize=max(1, len(batch) // (workers * 4)))
+            for (audio_id, _), meta in zip(batch, results):
+                updated += store_audio_meta(audio_id, meta)
+            touch_counters('audio')
+            db.session.commit()
+    return updated
@@ -0,0 +1,13 @@
+import sys
+from app import app
+from audio_meta import backfill_audio_meta
+
+# Read duration, bitrate, sample rate, channels and size for audio uploaded before
+# they were stored, probing files in parallel.
+#   python backfill_audio_meta.py [workers] [--refresh]
+if __name__ == '__main__':
+    with app.app_context():
+        args = [a for a in sys.argv[1:] if a != '--refresh']
+        workers = int(args[0]) if args else None
+        updated = backfill_audio_meta(workers=workers, refresh='--refresh' in sys.argv)
+        print("Audio rows updated with file metadata:", updated)
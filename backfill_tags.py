@@ -0,0 +1,8 @@
+from app import app
+from tags import backfill_tags
+
+# Populate tbl_tag / tbl_content_tag from the comma-separated TAGS of published content.
+if __name__ == '__main__':
+    with app.app_context():
+        total = backfill_tags()
+        print("Tag links rebuilt:", total)
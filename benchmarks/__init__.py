@@ -0,0 +1,7 @@
+"""Endpoint latency benchmarks.
+
+    python -m benchmarks.run --db sqlite:///bench.db --scale 10000 --out before.json
+    python -m benchmarks.compare before.json after.json
+
+See benchmarks/run.py for the options.
+"""
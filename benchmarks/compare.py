@@ -0,0 +1,56 @@
+"""Compare two benchmark reports from benchmarks.run.
+
+Usage: python -m benchmarks.compare BASE.json NEW.json [--threshold PCT]
+
+Prints per-endpoint p50/p95/p99 and query-count changes and exits 1 if any
+endpoint's p95 got slower by more than the threshold (default 20%).
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        report = json.load(f)
+    return report, {e['name']: e for e in report['endpoints']}
+
+
+def change(old, new):
+    if not old:
+        return None
+    return (new - old) / old * 100
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare two benchmark reports.')
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=20.0, help='allowed p95 slowdown in percent')
+    args = parser.parse_args(argv)
+
+    base_report, base = load(args.base)
+    new_report, new = load(args.new)
+    print(f"base {base_report.get('commit')}  ->  new {new_report.get('commit')}")
+
+    regressions = []
+    for name, result in new.items():
+        old = base.get(name)
+        if old is None:
+            print(f'{name:28} (new endpoint)')
+            continue
+        deltas = {key: change(old[key], result[key]) for key in ('p50_ms', 'p95_ms', 'p99_ms')}
+        print(f"{name:28} " + '  '.join(
+            f"{key[:3]} {old[key]:8.2f} -> {result[key]:8.2f}ms ({deltas[key]:+6.1f}%)"
+            if deltas[key] is not None else f"{key[:3]} n/a" for key in deltas)
+            + f"  queries {old['queries_per_request']} -> {result['queries_per_request']}")
+        if deltas['p95_ms'] is not None and deltas['p95_ms'] > args.threshold:
+            regressions.append(name)
+
+    if regressions:
+        print(f"p95 regressions over {args.threshold:g}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+from models import db, User, Admin, Story, Poem, AudioStory, HelpSupport
+from counters import reconcile_counters
+from search import reindex_search
+from tags import backfill_tags
+
+BATCH = 5000
+LANGUAGES = ['English', 'Hindi', 'Bengali']
+STATUSES = ['published'] * 7 + ['draft'] * 2 + ['rejected']
+TAG_POOL = ['love', 'nature', 'family', 'history', 'mystery', 'humour', 'children', 'travel', 'war',
+            'friendship', 'village', 'city', 'rain', 'festival', 'ghost', 'school', 'monsoon', 'river']
+WORDS = ('the a of and to in was he she it that on with as for his her they at by from this had not '
+         'river village night rain mother father child old house road tree moon sun wind letter train '
+         'school market song dream memory lamp door window field boat sky stone river morning evening').split()
+SUPPORT_TYPES = ['Technical Support', 'Billing Inquiry', 'Account', 'Content Report', 'Other']
+EPOCH = datetime(2023, 1, 1)
+SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+# Hashing is deliberately slow; every generated account shares one hash of this password
+PASSWORD = 'bench-password'
+
+
+def sizes(scale):
+    """Row counts for one run: `scale` stories and poems, the rest proportional."""
+    return {
+        'stories': scale,
+        'poems': scale,
+        'audio': max(1, scale // 2),
+        'writers': max(1, scale // 50),
+        'tickets': max(1, scale // 10),
+    }
+
+
+def _text(rng, low, high):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def _stamp(rng):
+    return EPOCH + timedelta(seconds=rng.randrange(SPAN_SECONDS))
+
+
+def _tags(rng):
+    return ','.join(rng.sample(TAG_POOL, rng.randint(1, 4)))
+
+
+def _bulk_insert(model, rows):
+    for start in range(0, len(rows), BATCH):
+        db.session.execute(insert(model), rows[start:start + BATCH])
+    db.session.commit()
+
+
+def _generate_rows(count, make_row):
+    # Built and inserted in slices so a 1M-row run doesn't hold every dict at once
+    for start in range(0, count, BATCH * 10):
+        yield [make_row(n) for n in range(start, min(count, start + BATCH * 10))]
+
+
+def generate(scale, seed=1):
+    """Fill an empty database with a synthetic catalogue and return the row counts.
+
+    Derived tables (counters, search documents, tag links) are rebuilt from
+    the generated rows the same way the maintenance scripts do.
+    """
+    rng = random.Random(seed)
+    counts = sizes(scale)
+    password = generate_password_hash(PASSWORD)
+
+    admins = [dict(full_name='Bench Super Admin', email='super@bench.local', mobile='9000000000',
+                   password=password, role='super_admin', status='Active')]
+    admins += [dict(full_name=f'Bench Sub Admin {n}', email=f'sub{n}@bench.local', mobile=f'90000000{n:02d}',
+                    password=password, role='sub_admin', status='Active') for n in range(1, 6)]
+    _bulk_insert(Admin, admins)
+
+    writers = [dict(full_name=f'Writer {n}', email=f'writer{n}@bench.local', mobile=f'8{n:09d}',
+                    password=password, role='Writer', is_active=rng.random() > 0.05,
+                    is_approved=rng.random() > 0.1, created_on=_stamp(rng), updated_on=_stamp(rng))
+               for n in range(counts['writers'])]
+    readers = [dict(full_name=f'Reader {n}', email=f'reader{n}@bench.local', mobile=f'7{n:09d}',
+                    password=password, role='Reader', is_active=True, is_approved=True,
+                    created_on=_stamp(rng), updated_on=_stamp(rng))
+               for n in range(max(1, counts['writers'] // 2))]
+    _bulk_insert(User, writers + readers)
+    user_count = len(writers) + len(readers)
+
+    def content_row(n):
+        created = _stamp(rng)
+        return dict(WRITTEN_BY=rng.randint(1, counts['writers']), NAME=f'{_text(rng, 2, 5).title()} {n}',
+                    LANGUAGE=rng.choice(LANGUAGES), FONT='default', STORY=_text(rng, 80, 600),
+                    STATUS=rng.choice(STATUSES), PRICE=rng.choice([0, 0, 49, 99, 149]), TAGS=_tags(rng),
+                    CREATED_ON=created, UPDATED_ON=created + timedelta(seconds=rng.randrange(90 * 24 * 3600)))
+
+    for model, key in ((Story, 'stories'), (Poem, 'poems')):
+        for rows in _generate_rows(counts[key], content_row):
+            _bulk_insert(model, rows)
+
+    def audio_row(n):
+        created = _stamp(rng)
+        link_type = rng.choice(['storyAvailable', 'poemAvailable', 'storyPoemNA'])
+        duration = rng.uniform(60, 3600)
+        bitrate = rng.choice([64000, 128000, 192000])
+        return dict(CREATED_BY=1, NAME=f'{_text(rng, 2, 4).title()} {n}', LANGUAGE=rng.choice(LANGUAGES),
+                    LINK_TYPE=link_type,
+                    LINKED_STORY_ID=rng.randint(1, counts['stories']) if link_type == 'storyAvailable' else None,
+                    LINKED_POEM_ID=rng.randint(1, counts['poems']) if link_type == 'poemAvailable' else None,
+                    AUDIO_URL='', TAGS=_tags(rng), STATUS=rng.choice(STATUSES), CREATED_ON=created,
+                    UPDATED_ON=created + timedelta(seconds=rng.randrange(30 * 24 * 3600)),
+                    DURATION_SEC=duration, BITRATE=bitrate, SAMPLE_RATE=44100, CHANNELS=2,
+                    BYTE_SIZE=int(duration * bitrate / 8))
+
+    for rows in _generate_rows(counts['audio'], audio_row):
+        _bulk_insert(AudioStory, rows)
+
+    def ticket_row(n):
+        created = _stamp(rng)
+        return dict(support_type=rng.choice(SUPPORT_TYPES), user_id=rng.randint(1, user_count),
+                    status=rng.choice(['Pending', 'Pending', 'Resolved', 'Rejected', 'Completed']),
+                    created_on=created, updated_on=created, admin_note=None)
+
+    for rows in _generate_rows(counts['tickets'], ticket_row):
+        _bulk_insert(HelpSupport, rows)
+
+    reconcile_counters()
+    reindex_search()
+    backfill_tags()
+    return dict(counts, readers=len(readers), admins=len(admins))
@@ -0,0 +1,262 @@
+"""Drive the app's GET endpoints with concurrent clients and report latency per endpoint.
+
+Usage:
+    python -m benchmarks.run [--db URL] [--scale N] [--requests N] [--concurrency N]
+                             [--only SUBSTRING] [--no-cache] [--skip-generate] [--out FILE]
+
+--db defaults to a throwaway SQLite file; point it at a MySQL-compatible
+server to measure the production dialect. Data is generated only into an
+empty database (or never, with --skip-generate), so a large dataset can be
+built once and reused. Requests go through Flask's test client in this
+process, so results measure the app and database, not a WSGI server.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import zlib
+
+# (name, group, path template); {story}, {poem}, {writer}, ... are filled with random existing ids
+ENDPOINTS = [
+    ('public stories', 'public', '/api/public/stories'),
+    ('public stories (summary)', 'public', '/api/public/stories?fields=summary'),
+    ('public poems', 'public', '/api/public/poems'),
+    ('public audio', 'public', '/api/public/audio'),
+    ('public feed', 'public', '/api/public/feed'),
+    ('story detail', 'public', '/api/story/{story}'),
+    ('poem detail', 'public', '/api/poem/{poem}'),
+    ('search', 'public', '/api/search?q={word}'),
+    ('tag facets', 'public', '/api/tags'),
+    ('tagged stories', 'public', '/api/tags/{tag}/items'),
+    ('authors', 'public', '/api/authors'),
+    ('author stats', 'public', '/api/author-stats'),
+    ('writer profile', 'public', '/api/writer/{writer}'),
+    ('auth check', 'writer', '/api/auth-check'),
+    ('my stories', 'writer', '/api/stories'),
+    ('my poems', 'writer', '/api/poems'),
+    ('story drafts', 'writer', '/api/story/drafts'),
+    ('poem drafts', 'writer', '/api/poem/drafts'),
+    ('stories by user', 'writer', '/api/stories/user/{writer}'),
+    ('poems by user', 'writer', '/api/poems/user/{writer}'),
+    ('admin profile', 'admin', '/api/admin/profile'),
+    ('sub-admins', 'admin', '/api/admin/subadmins'),
+    ('sub-admin detail', 'admin', '/api/admin/subadmin/{subadmin}'),
+    ('users', 'admin', '/api/users'),
+    ('help tickets', 'admin', '/api/help-support'),
+    ('help ticket detail', 'admin', '/api/help-support/{ticket}'),
+    ('drafted audio', 'admin', '/api/admin/drafted_audio'),
+    ('all audio', 'admin', '/api/admin/all_audio'),
+    ('cache stats', 'admin', '/api/admin/cache-stats'),
+    ('job stats', 'admin', '/api/admin/job-stats'),
+]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--db', default='sqlite:///' + os.path.abspath('bench.db'))
+    parser.add_argument('--scale', type=int, default=10000, help='stories (and poems) to generate')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--warmup', type=int, default=5, help='unmeasured requests per endpoint')
+    parser.add_argument('--only', help='run endpoints whose name or path contains this')
+    parser.add_argument('--no-cache', action='store_true', help='disable the response cache')
+    parser.add_argument('--skip-generate', action='store_true')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', help='write the JSON report here as well as to stdout')
+    return parser.parse_args(argv)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        import resource  # peak so far; the best available without /proc
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+class RssSampler:
+    """Track the peak resident set size while a block runs."""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak = 0.0
+        self.stop = threading.Event()
+
+    def _run(self):
+        while not self.stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss_mb())
+
+    def __enter__(self):
+        self.peak = current_rss_mb()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+        self.peak = max(self.peak, current_rss_mb())
+
+
+class QueryCounter:
+    """Count SQL statements sent on every engine the app uses."""
+
+    def __init__(self, engines):
+        from sqlalchemy import event
+        self.lock = threading.Lock()
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        with self.lock:
+            self.count += 1
+
+    def take(self):
+        with self.lock:
+            count, self.count = self.count, 0
+        return count
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_ids():
+    """Existing ids to substitute into endpoint paths."""
+    from sqlalchemy import select
+    from models import db, User, Admin, Story, Poem, HelpSupport, Tag
+    ids = lambda stmt: [row[0] for row in db.session.execute(stmt.limit(1000))]
+    return {
+        'story': ids(select(Story.STORY_ID).where(Story.STATUS == 'published')),
+        'poem': ids(select(Poem.STORY_ID).where(Poem.STATUS == 'published')),
+        'writer': ids(select(User.id).where(User.role == 'Writer', User.is_active.is_(True),
+                                            User.is_approved.is_(True))),
+        'subadmin': ids(select(Admin.id).where(Admin.role == 'sub_admin')),
+        'ticket': ids(select(HelpSupport.id)),
+        'tag': ids(select(Tag.NAME)),
+        'word': ['river', 'village', 'moon', 'mother', 'rain', 'letter'],
+        'super_admin': ids(select(Admin.id).where(Admin.role == 'super_admin')),
+    }
+
+
+def bench_endpoint(app, counter, ids, name, group, template, args):
+    rng = random.Random(zlib.crc32(name.encode()) ^ args.seed)
+
+    def one_request(_):
+        path = template.format(**{key: rng.choice(values) for key, values in ids.items() if values})
+        headers = {}
+        if group == 'writer':
+            headers['X-User-Id'] = str(rng.choice(ids['writer']))
+        elif group == 'admin':
+            headers['X-Admin-Id'] = str(ids['super_admin'][0])
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        elapsed = time.perf_counter() - started
+        response.close()
+        return elapsed, response.status_code
+
+    for n in range(args.warmup):
+        one_request(n)
+    counter.take()
+
+    with RssSampler() as rss, ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(one_request, range(args.requests)))
+        wall = time.perf_counter() - started
+    queries = counter.take()
+
+    latencies = sorted(elapsed * 1000 for elapsed, _ in results)
+    statuses = {}
+    for _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'name': name,
+        'group': group,
+        'path': template,
+        'requests': len(results),
+        'statuses': statuses,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(latencies[-1], 3),
+        'throughput_rps': round(len(results) / wall, 2) if wall else None,
+        'queries_per_request': round(queries / len(results), 2),
+        'peak_rss_mb': round(rss.peak, 1),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # config.py reads DATABASE_URL at import time, so set it before the app loads
+    os.environ['DATABASE_URL'] = args.db
+    from app import app
+    from models import db, Story
+    from benchmarks.datagen import generate
+
+    if args.no_cache:
+        app.config['RESPONSE_CACHE_DISABLED'] = True
+
+    with app.app_context():
+        db.create_all()
+        generated = None
+        if not args.skip_generate and db.session.query(Story.STORY_ID).first() is None:
+            started = time.perf_counter()
+            generated = generate(args.scale, seed=args.seed)
+            print(f'Generated {generated} in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+        ids = load_ids()
+        counter = QueryCounter(db.engines.values())
+        db.session.remove()
+
+    endpoints = [e for e in ENDPOINTS if not args.only or args.only in e[0] or args.only in e[2]]
+    results = []
+    for name, group, template in endpoints:
+        result = bench_endpoint(app, counter, ids, name, group, template, args)
+        results.append(result)
+        print(f"{name:28} p50 {result['p50_ms']:9.2f}ms  p95 {result['p95_ms']:9.2f}ms  "
+              f"p99 {result['p99_ms']:9.2f}ms  {result['throughput_rps']:8.1f} req/s  "
+              f"{result['queries_per_request']:6.1f} q/req  {result['peak_rss_mb']:7.1f} MB", file=sys.stderr)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'python': platform.python_version(),
+        'database': args.db.split(':', 1)[0],  # dialect only; the URL may hold credentials
+        'scale': args.scale,
+        'generated': generated,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'response_cache': not args.no_cache,
+        'endpoints': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import hashlib
+from datetime import timezone
+from functools import wraps
+from flask import g, request, make_response
+from sqlalchemy import func, select
+from models import db, ContentCounter
+from counters import GLOBAL_SCOPE
+
+
+def catalogue_validator(model, content_type, published_only=True, extra=()):
+    """Validator for a listing: (parts, last_modified) from one cheap query.
+
+    The parts are max(UPDATED_ON), an index seek on the (STATUS, UPDATED_ON)
+    or UPDATED_ON indexes, plus the summed VERSION and latest UPDATED_ON of
+    the type's global counter rows, which every create, status change and
+    delete bumps in the same transaction; that catches deletes and
+    unpublishes that max(UPDATED_ON) alone would miss, without counting the
+    table. `extra` takes further scalar subqueries whose values should feed
+    the ETag.
+    """
+    # A primary-key range read of the type's global counter rows
+    rows = [ContentCounter.USER_ID == GLOBAL_SCOPE, ContentCounter.CONTENT_TYPE == content_type]
+    if published_only:
+        rows.append(ContentCounter.STATUS == 'published')
+    version = select(func.sum(ContentCounter.VERSION)).where(*rows).scalar_subquery()
+    counter_moved = select(func.max(ContentCounter.UPDATED_ON)).where(*rows).scalar_subquery()
+    query = db.session.query(func.max(model.UPDATED_ON), version, counter_moved, *extra)
+    if published_only:
+        query = query.filter(model.STATUS == 'published')
+    parts = tuple(query.one())
+    stamps = [p for p in (parts[0], parts[2]) if p is not None]
+    return parts, (max(stamps) if stamps else None)
+
+
+def _http_datetime(value):
+    # DB timestamps are naive UTC; HTTP dates have whole-second precision
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def conditional(validator):
+    """Answer If-None-Match / If-Modified-Since with 304 before the view runs.
+
+    `validator(**view_args)` returns (parts, last_modified), or None to skip
+    (e.g. the row doesn't exist and the view should produce its 404). The
+    ETag is strong and also covers the query string, so each page or
+    projection of a listing gets its own tag. It is left in g.validator_etag
+    for @cached to key on.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            validated = validator(**kwargs)
+            if validated is None:
+                return view(*args, **kwargs)
+
+            parts, last_modified = validated
+            etag = hashlib.sha1(repr((request.full_path, parts)).encode()).hexdigest()
+            last_modified = _http_datetime(last_modified)
+            g.validator_etag = etag
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = bool(since and last_modified and last_modified <= since)
+
+            response = make_response('', 304) if not_modified else make_response(view(*args, **kwargs))
+            if response.status_code in (200, 304):
+                response.set_etag(etag)
+                if last_modified:
+                    response.last_modified = last_modified
+                response.cache_control.no_cache = True  # always revalidate, cheaply
+            return response
+        return wrapped
+    return decorator
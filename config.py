@@ -1,8 +1,59 @@
 import os
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your_secret_key'
-    SQLALCHEMY_DATABASE_URI = (
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or (
         'mysql+pymysql://avnadmin:AVNS_VCDCbC8zZJ25QBXJ9Z8@'
         'mysql-2f02e226-a96696713-98d4.f.aivencloud.com:12200/goddo_poddo_db'
     )
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool (see db_routing.engine_options); ignored for SQLite
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))       # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 280))      # under typical 300s proxy idle cutoffs
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+    DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', 10))
+    DB_READ_TIMEOUT = int(os.environ.get('DB_READ_TIMEOUT', 30))
+    DB_WRITE_TIMEOUT = int(os.environ.get('DB_WRITE_TIMEOUT', 30))
+    # Per-request query profiling (Server-Timing header, 'profiler' log); strict mode fails N+1 requests.
+    # Off by default: the header exposes DB timings and query counts to every client.
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED') == '1'
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 10))  # repeats of one statement
+    PROFILER_STRICT = os.environ.get('PROFILER_STRICT') == '1'
+    # /metrics: with gunicorn, point this at a directory shared by the workers and empty it on deploy
+    METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+    METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 1.0))  # seconds
+    # Who may scrape /metrics besides active admins: a bearer token and/or client addresses (comma-separated)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_ALLOWED_IPS = [ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '').split(',') if ip.strip()]
+    # Password hashing: any werkzeug method string; hashes made with other settings upgrade on login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))   # processes; 0 hashes inline
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 8))       # hashes running or waiting
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))  # seconds, then 503
+    # Failed-login throttle, per account
+    LOGIN_MAX_FAILURES = int(os.environ.get('LOGIN_MAX_FAILURES', 5))
+    LOGIN_LOCKOUT_SECONDS = int(os.environ.get('LOGIN_LOCKOUT_SECONDS', 300))
+    # Optional read replica for the public read-only endpoints (@read_replica)
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+
+    # In-process response cache for the public catalogue endpoints
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 30))  # seconds
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 512))
+
+    # Id/role/status lookups for authorization; changes made here invalidate immediately
+    PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', 30))  # seconds; 0 disables
+    PRINCIPAL_CACHE_MAX_ENTRIES = int(os.environ.get('PRINCIPAL_CACHE_MAX_ENTRIES', 10000))
+
+    # Uploaded PDFs/audio are stored once per content hash under MEDIA_FOLDER
+    # Relative paths are taken from the app directory (app.root_path), not the CWD: send_from_directory
+    # resolves against root_path, so a CWD-relative folder breaks serving when started elsewhere
+    MEDIA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.environ.get('MEDIA_FOLDER', os.path.join('static', 'media')))
+    MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', 200 * 1024 * 1024))
+
+    # Media serving: set one of these when a proxy should stream the bytes instead of Python
+    MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX')  # nginx internal location
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE') == '1'                     # Apache/lighttpd
+    MEDIA_MAX_AGE = int(os.environ.get('MEDIA_MAX_AGE', 365 * 24 * 3600))       # content-addressed files
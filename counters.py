@@ -0,0 +1,138 @@
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from models import db, ContentCounter, User, Story, Poem, AudioStory
+from jobs import task
+
+GLOBAL_SCOPE = 0
+
+
+def bump_counter(content_type, status, user_id, delta):
+    """Add `delta` to the global and per-writer counter rows.
+
+    Runs inside the caller's session, so the change commits (or rolls back)
+    together with the write it describes.
+    """
+    scopes = {GLOBAL_SCOPE}
+    if user_id:
+        scopes.add(int(user_id))
+
+    for scope in scopes:
+        _bump_scope(scope, content_type, status, delta)
+
+
+def _bumped(delta):
+    return {ContentCounter.COUNT: ContentCounter.COUNT + delta,
+            ContentCounter.VERSION: func.coalesce(ContentCounter.VERSION, 0) + 1}
+
+
+def _bump_scope(scope, content_type, status, delta):
+    key = dict(USER_ID=scope, CONTENT_TYPE=content_type, STATUS=status or '')
+    updated = ContentCounter.query.filter_by(**key).update(_bumped(delta), synchronize_session=False)
+    if updated:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(ContentCounter(COUNT=max(delta, 0), VERSION=1, **key))
+    except IntegrityError:
+        # Another request created the row first; fall back to the update
+        ContentCounter.query.filter_by(**key).update(_bumped(delta), synchronize_session=False)
+
+
+def touch_counters(content_type):
+    """Bump the global VERSION of a content type whose listings changed without a status move
+    (e.g. audio metadata filled in by a job), so its catalogue ETags change."""
+    ContentCounter.query.filter_by(USER_ID=GLOBAL_SCOPE, CONTENT_TYPE=content_type) \
+                  .update({ContentCounter.VERSION: func.coalesce(ContentCounter.VERSION, 0) + 1},
+                          synchronize_session=False)
+
+
+def move_counter(content_type, user_id, old_status, new_status):
+    """Record a status transition (old_status=None for creates, new_status=None for deletes)."""
+    if old_status == new_status:
+        return
+    if old_status is not None:
+        bump_counter(content_type, old_status, user_id, -1)
+    if new_status is not None:
+        bump_counter(content_type, new_status, user_id, 1)
+
+
+def move_counters(content_type, transitions):
+    """move_counter() for many rows at once; `transitions` is [(user_id, old_status, new_status)].
+
+    Deltas are summed first, so each touched (scope, status) row gets one UPDATE
+    however many items moved.
+    """
+    deltas = {}
+    for user_id, old_status, new_status in transitions:
+        if old_status == new_status:
+            continue
+        scopes = {GLOBAL_SCOPE, int(user_id)} if user_id else {GLOBAL_SCOPE}
+        for scope in scopes:
+            for status, delta in ((old_status, -1), (new_status, 1)):
+                if status is not None:
+                    deltas[(scope, status)] = deltas.get((scope, status), 0) + delta
+    for (scope, status), delta in sorted(deltas.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+        if delta:
+            _bump_scope(scope, content_type, status, delta)
+
+
+def counts_as_author(user):
+    """Matches the writer filter used by /api/authors and /api/author-stats."""
+    return bool(user and (user.role or '').lower() == 'writer' and user.is_active and user.is_approved)
+
+
+def track_author(user, was_author):
+    """Keep the 'author' counter in step after a user's role or flags changed."""
+    is_author = counts_as_author(user)
+    if is_author != was_author:
+        bump_counter('author', 'active', None, 1 if is_author else -1)
+
+
+def get_counts(user_id=GLOBAL_SCOPE):
+    """Return {content_type: {status: count}} for one scope with a single PK range read."""
+    result = {}
+    for row in ContentCounter.query.filter_by(USER_ID=user_id).all():
+        result.setdefault(row.CONTENT_TYPE, {})[row.STATUS] = row.COUNT
+    return result
+
+
+@task('counters.reconcile')
+def reconcile_counters():
+    """Rebuild every counter row from the content tables to correct any drift.
+
+    Returns the number of counter rows written. Every existing row is kept
+    (at zero if nothing has that status any more) with its VERSION bumped,
+    so the validators see a change rather than a reset.
+    """
+    versions = {(row.USER_ID, row.CONTENT_TYPE, row.STATUS): row.VERSION or 0
+                for row in ContentCounter.query.all()}
+    totals = dict.fromkeys(versions, 0)
+
+    def add(user_id, content_type, status, n):
+        for scope in {GLOBAL_SCOPE, user_id or GLOBAL_SCOPE}:
+            key = (scope, content_type, status or '')
+            totals[key] = totals.get(key, 0) + n
+
+    sources = (
+        ('story', Story.WRITTEN_BY, Story.STATUS, Story.STORY_ID),
+        ('poem', Poem.WRITTEN_BY, Poem.STATUS, Poem.STORY_ID),
+        ('audio', AudioStory.CREATED_BY, AudioStory.STATUS, AudioStory.AUDIO_ID),
+    )
+    for content_type, owner_col, status_col, id_col in sources:
+        rows = db.session.query(owner_col, status_col, func.count(id_col)) \
+                         .group_by(owner_col, status_col).all()
+        for user_id, status, n in rows:
+            add(user_id, content_type, status, n)
+
+    authors = User.query.filter(func.lower(User.role) == 'writer',
+                                User.is_active.is_(True), User.is_approved.is_(True)).count()
+    totals[(GLOBAL_SCOPE, 'author', 'active')] = authors
+
+    ContentCounter.query.delete(synchronize_session=False)
+    db.session.add_all([
+        ContentCounter(USER_ID=user_id, CONTENT_TYPE=content_type, STATUS=status, COUNT=n,
+                       VERSION=versions.get((user_id, content_type, status), 0) + 1)
+        for (user_id, content_type, status), n in totals.items()
+    ])
+    db.session.commit()
+    return len(totals)
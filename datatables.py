@@ -0,0 +1,76 @@
+from sqlalchemy import or_, false
+from werkzeug.exceptions import BadRequest
+
+MAX_LENGTH = 1000  # rows per draw, also used for length=-1 ("All")
+
+
+def datatables_params(args):
+    """Parse DataTables server-side request parameters, or None when `draw` is absent.
+
+    Returns draw, start, length, the global search value, per-column search
+    values {index: value} and the order as [(column index, 'asc'|'desc')].
+    """
+    if 'draw' not in args:
+        return None
+    try:
+        draw = int(args['draw'])  # echoed back; cast so nothing user-supplied is reflected
+        start = max(int(args.get('start', 0)), 0)
+        length = int(args.get('length', 10))
+    except (ValueError, TypeError):
+        raise BadRequest("'draw', 'start' and 'length' must be integers.")
+    if length < 0 or length > MAX_LENGTH:
+        length = MAX_LENGTH
+
+    column_search = {}
+    order = []
+    i = 0
+    while f'columns[{i}][data]' in args:
+        value = args.get(f'columns[{i}][search][value]', '').strip()
+        if value and args.get(f'columns[{i}][searchable]', 'true') == 'true':
+            column_search[i] = value
+        i += 1
+    k = 0
+    while f'order[{k}][column]' in args:
+        try:
+            column = int(args[f'order[{k}][column]'])
+        except ValueError:
+            raise BadRequest("Invalid 'order' column.")
+        direction = 'asc' if args.get(f'order[{k}][dir]', 'asc').lower() == 'asc' else 'desc'
+        order.append((column, direction))
+        k += 1
+
+    return {'draw': draw, 'start': start, 'length': length,
+            'search': args.get('search[value]', '').strip(), 'column_search': column_search, 'order': order}
+
+
+def _match(column, mode, value):
+    if mode == 'like':
+        return column.contains(value, autoescape=True)
+    if mode == 'int':
+        return column == int(value) if value.isdigit() else None
+    return column == value  # 'exact'
+
+
+def datatables_filter(query, columns, params):
+    """Apply the global and per-column searches.
+
+    `columns` lists (SQL column, search mode) in table column order; mode is
+    'like' (substring), 'exact', 'int' (exact, digits only) or None (not
+    searchable).
+    """
+    if params['search']:
+        matches = [_match(col, mode, params['search']) for col, mode in columns if mode]
+        matches = [m for m in matches if m is not None]
+        query = query.filter(or_(*matches) if matches else false())
+    for index, value in params['column_search'].items():
+        if index < len(columns) and columns[index][1]:
+            match = _match(columns[index][0], columns[index][1], value)
+            query = query.filter(match if match is not None else false())
+    return query
+
+
+def datatables_order(query, columns, params, default):
+    """Order by the requested columns, then `default` (a unique key, so pages are stable)."""
+    clauses = [columns[i][0].asc() if direction == 'asc' else columns[i][0].desc()
+               for i, direction in params['order'] if 0 <= i < len(columns)]
+    return query.order_by(*clauses, *default)
@@ -0,0 +1,101 @@
+from functools import wraps
+from flask import g, has_request_context
+from flask_sqlalchemy.session import Session
+import time
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.expression import UpdateBase
+
+REPLICA_BIND = 'replica'
+
+
+def engine_options(url, config):
+    """Pool/connect settings for one database URL, from the DB_* config values.
+
+    SQLite keeps Flask-SQLAlchemy's own pool choices (an in-memory database
+    must stay on a single connection), so only server databases get these.
+    """
+    if make_url(url).get_backend_name() == 'sqlite':
+        return {}
+    options = {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'poolclass': InstrumentedQueuePool,
+    }
+    if make_url(url).get_backend_name() == 'mysql':
+        options['connect_args'] = {
+            'connect_timeout': config['DB_CONNECT_TIMEOUT'],
+            'read_timeout': config['DB_READ_TIMEOUT'],
+            'write_timeout': config['DB_WRITE_TIMEOUT'],
+        }
+    return options
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that counts checkouts which had to wait for a connection to be returned.
+
+    Read by metrics.py as db_pool_checkout_waits_total / _wait_seconds_total.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.waits, pool.wait_seconds = self.waits, self.wait_seconds
+        return pool
+
+    def _do_get(self):
+        exhausted = self.checkedin() == 0 and 0 <= self._max_overflow <= self.overflow()
+        if not exhausted:
+            return super()._do_get()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.waits += 1
+            self.wait_seconds += time.perf_counter() - started
+
+
+def configure_database(app):
+    """Fill SQLALCHEMY_ENGINE_OPTIONS and the replica bind from config; call before db.init_app."""
+    config = app.config
+    config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(config['SQLALCHEMY_DATABASE_URI'], config))
+    replica_url = config.get('DATABASE_REPLICA_URL')
+    if replica_url:
+        binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+        binds[REPLICA_BIND] = dict(engine_options(replica_url, config), url=replica_url)
+        config['SQLALCHEMY_BINDS'] = binds
+
+
+def read_replica(view):
+    """Run a read-only view's queries on the replica bind, when one is configured.
+
+    Stack it above @conditional/@cached so their validator queries go to the
+    replica too. Anything that flushes or writes still goes to the primary.
+    """
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        g.use_replica = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.use_replica = False
+    return wrapped
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends reads from @read_replica views to the replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and not isinstance(clause, UpdateBase)
+                and has_request_context() and g.get('use_replica')):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
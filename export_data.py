@@ -0,0 +1,34 @@
+import sys
+from app import app
+from exports import ExportError, stream_export, gzip_chunks
+
+# Stream a table export to a file (or stdout) without loading it into memory.
+#   python export_data.py <users|stories|poems|audio> [--format=ndjson|csv] [--columns=id,name,...]
+#                         [--<filter>=<value> ...] [--output=path]
+# Filters are the API's (status, language, author_id, role, approved, active,
+# updated_since, updated_before); an output path ending in .gz is gzipped.
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    options = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    if len(args) != 1:
+        sys.exit("Usage: python export_data.py <users|stories|poems|audio> [--format=csv] [--output=path]")
+
+    export_type = args[0]
+    fmt = options.pop('format', 'ndjson')
+    columns = [c for c in options.pop('columns', '').split(',') if c]
+    output = options.pop('output', None)
+
+    with app.app_context():
+        try:
+            chunks = stream_export(export_type, fmt, columns, options)
+        except ExportError as e:
+            sys.exit(str(e))
+        if output and output.endswith('.gz'):
+            chunks = gzip_chunks(chunks)
+        out = open(output, 'wb') if output else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        finally:
+            if output:
+                out.close()
@@ -0,0 +1,208 @@
+import csv
+import io
+import zlib
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select
+from models import db, User, Story, Poem, AudioStory
+from serializers import Serializer, isoformat
+
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+EXPORT_BATCH_SIZE = 1000  # rows fetched from the server-side cursor at a time
+
+
+def _price(value):
+    return float(value) if value is not None else None
+
+
+def _content_columns(model):
+    return {
+        'id': (model.STORY_ID,),
+        'author_id': (model.WRITTEN_BY,),
+        'name': (model.NAME,),
+        'language': (model.LANGUAGE,),
+        'font': (model.FONT,),
+        'pdf_url': (model.PDF_URL,),
+        'status': (model.STATUS,),
+        'price': (model.PRICE, _price),
+        'tags': (model.TAGS,),
+        'created_on': (model.CREATED_ON, isoformat),
+        'updated_on': (model.UPDATED_ON, isoformat),
+        'text': (model.STORY,),
+    }
+
+
+def _content_filters(model, owner):
+    return {
+        'status': (model.STATUS, str),
+        'language': (model.LANGUAGE, str),
+        'author_id': (owner, int),
+        'updated_since': (model.UPDATED_ON, datetime.fromisoformat, '>='),
+        'updated_before': (model.UPDATED_ON, datetime.fromisoformat, '<'),
+    }
+
+
+def _flag(value):
+    return value.lower() == 'true'
+
+
+# export type -> (primary key, {column name: (SQL column, converter)}, default column names,
+#                 {filter name: (SQL column, parser[, '>=' | '<'])})
+# The password hash is deliberately not exportable.
+EXPORT_TYPES = {
+    'users': (
+        User.id,
+        {
+            'id': (User.id,),
+            'full_name': (User.full_name,),
+            'email': (User.email,),
+            'mobile': (User.mobile,),
+            'role': (User.role,),
+            'is_active': (User.is_active,),
+            'is_approved': (User.is_approved,),
+            'created_on': (User.created_on, isoformat),
+            'updated_on': (User.updated_on, isoformat),
+        },
+        ('id', 'full_name', 'email', 'mobile', 'role', 'is_active', 'is_approved', 'created_on', 'updated_on'),
+        {
+            'role': (User.role, str),
+            'approved': (User.is_approved, _flag),
+            'active': (User.is_active, _flag),
+            'updated_since': (User.updated_on, datetime.fromisoformat, '>='),
+            'updated_before': (User.updated_on, datetime.fromisoformat, '<'),
+        },
+    ),
+    'stories': (
+        Story.STORY_ID,
+        _content_columns(Story),
+        ('id', 'author_id', 'name', 'language', 'status', 'price', 'tags', 'created_on', 'updated_on'),
+        _content_filters(Story, Story.WRITTEN_BY),
+    ),
+    'poems': (
+        Poem.STORY_ID,
+        _content_columns(Poem),
+        ('id', 'author_id', 'name', 'language', 'status', 'price', 'tags', 'created_on', 'updated_on'),
+        _content_filters(Poem, Poem.WRITTEN_BY),
+    ),
+    'audio': (
+        AudioStory.AUDIO_ID,
+        {
+            'id': (AudioStory.AUDIO_ID,),
+            'author_id': (AudioStory.CREATED_BY,),
+            'name': (AudioStory.NAME,),
+            'language': (AudioStory.LANGUAGE,),
+            'link_type': (AudioStory.LINK_TYPE,),
+            'linked_story_id': (AudioStory.LINKED_STORY_ID,),
+            'linked_poem_id': (AudioStory.LINKED_POEM_ID,),
+            'audio_url': (AudioStory.AUDIO_URL,),
+            'tags': (AudioStory.TAGS,),
+            'status': (AudioStory.STATUS,),
+            'created_on': (AudioStory.CREATED_ON, isoformat),
+            'updated_on': (AudioStory.UPDATED_ON, isoformat),
+            'duration': (AudioStory.DURATION_SEC,),
+            'bitrate': (AudioStory.BITRATE,),
+            'sample_rate': (AudioStory.SAMPLE_RATE,),
+            'channels': (AudioStory.CHANNELS,),
+            'byte_size': (AudioStory.BYTE_SIZE,),
+        },
+        ('id', 'author_id', 'name', 'language', 'audio_url', 'tags', 'status', 'created_on', 'updated_on'),
+        _content_filters(AudioStory, AudioStory.CREATED_BY),
+    ),
+}
+
+
+class ExportError(ValueError):
+    """The export request is invalid (unknown type, format, column or filter value)."""
+
+
+def export_query(export_type, columns=None, filters=None):
+    """Validate an export and build it: returns (select statement, Serializer of the row tuples).
+
+    `columns` is a list of column names (the type's defaults when empty) and
+    `filters` maps filter names to their string values; unknown filter names
+    are ignored, so request args can be passed as they are.
+    """
+    if export_type not in EXPORT_TYPES:
+        raise ExportError(f"Invalid export type: {export_type}")
+    key, available, default_columns, available_filters = EXPORT_TYPES[export_type]
+    columns = list(dict.fromkeys(columns or default_columns))
+    unknown = [name for name in columns if name not in available]
+    if unknown:
+        raise ExportError(f"Unknown column(s) for {export_type}: {', '.join(unknown)}")
+
+    stmt = select(*[available[name][0] for name in columns])
+    for name, value in (filters or {}).items():
+        if name not in available_filters or value in (None, ''):
+            continue
+        column, parse, *op = available_filters[name]
+        try:
+            value = parse(value)
+        except ValueError:
+            raise ExportError(f"Invalid value for '{name}': {value}")
+        if op == ['>=']:
+            stmt = stmt.where(column >= value)
+        elif op == ['<']:
+            stmt = stmt.where(column < value)
+        else:
+            stmt = stmt.where(column == value)
+
+    serializer = Serializer(*[(name, n, available[name][1] if len(available[name]) > 1 else None)
+                              for n, name in enumerate(columns)])
+    return stmt.order_by(key), serializer
+
+
+def _ndjson_chunks(result, serializer):
+    dumps = current_app.json.dumps_bytes
+    one = serializer.one
+    for rows in result.partitions():
+        yield b''.join([dumps(one(row)) + b'\n' for row in rows])
+
+
+def _csv_chunks(result, serializer):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(serializer.keys)
+    for rows in result.partitions():
+        writer.writerows(serializer.many_lists(rows))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # header only: no rows matched
+        yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip a stream of byte chunks as it goes (a single gzip member)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(export_type, fmt='ndjson', columns=None, filters=None, batch_size=EXPORT_BATCH_SIZE):
+    """Generate the export as byte chunks, one per batch of rows.
+
+    Rows come from a server-side cursor (yield_per; an unbuffered cursor on
+    MySQL), so memory stays at one batch however many rows match. Keep the
+    app context (stream_with_context) around the generator until it is
+    exhausted or closed: the cursor lives on the session's connection.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Invalid format: {fmt}")
+    stmt, serializer = export_query(export_type, columns, filters)
+    # Executed here rather than in the generator, so errors surface before any
+    # output and the query runs inside the view (on the replica under @read_replica)
+    result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+    return _stream(result, serializer, fmt)
+
+
+def _stream(result, serializer, fmt):
+    try:
+        if fmt == 'csv':
+            yield from _csv_chunks(result, serializer)
+        else:
+            yield from _ndjson_chunks(result, serializer)
+    finally:
+        result.close()
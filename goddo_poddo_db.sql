@@ -1,61 +1,217 @@
-CREATE DATABASE IF NOT EXISTS `goddo_poddo_db` /*!40100 DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci */ /*!80016 DEFAULT ENCRYPTION='N' */;
-USE `goddo_poddo_db`;
-
-DROP TABLE IF EXISTS `tbl_poem`;
-CREATE TABLE `tbl_poem` (
-  `STORY_ID` int NOT NULL AUTO_INCREMENT,
-  `WRITTEN_BY` int DEFAULT NULL,
-  `NAME` varchar(255) DEFAULT NULL,
-  `LANGUAGE` varchar(50) DEFAULT NULL,
-  `FONT` varchar(50) DEFAULT NULL,
-  `PDF_URL` varchar(255) DEFAULT NULL,
-  `STORY` text,
-  `STATUS` varchar(20) DEFAULT NULL,
-  `CREATED_ON` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
-  `UPDATED_ON` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-  `PRICE` decimal(10,2) DEFAULT NULL,
-  PRIMARY KEY (`STORY_ID`),
-  KEY `tbl_poem_ibfk_1` (`WRITTEN_BY`),
-  CONSTRAINT `tbl_poem_ibfk_1` FOREIGN KEY (`WRITTEN_BY`) REFERENCES `tbl_users` (`id`)
-) ENGINE=InnoDB AUTO_INCREMENT=2 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
-
-LOCK TABLES `tbl_poem` WRITE;
-INSERT INTO `tbl_poem` VALUES (1,1,'Sunset Melodies','English','Times New Roman','http://example.com/poem.pdf','Golden hues dance in the sky...','published','2025-05-13 15:14:09','2025-05-13 15:14:09',4.99,NULL,NULL,NULL);
-UNLOCK TABLES;
-
-DROP TABLE IF EXISTS `tbl_story`;
-CREATE TABLE `tbl_story` (
-  `STORY_ID` int NOT NULL AUTO_INCREMENT,
-  `WRITTEN_BY` int DEFAULT NULL,
-  `NAME` varchar(255) DEFAULT NULL,
-  `LANGUAGE` varchar(50) DEFAULT NULL,
-  `FONT` varchar(50) DEFAULT NULL,
-  `PDF_URL` varchar(255) DEFAULT NULL,
-  `STORY` text,
-  `STATUS` varchar(20) DEFAULT NULL,
-  `CREATED_ON` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
-  `UPDATED_ON` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-  `PRICE` decimal(10,2) DEFAULT NULL,
-  PRIMARY KEY (`STORY_ID`),
-  KEY `tbl_story_ibfk_1` (`WRITTEN_BY`),
-  CONSTRAINT `tbl_story_ibfk_1` FOREIGN KEY (`WRITTEN_BY`) REFERENCES `tbl_users` (`id`)
-) ENGINE=InnoDB AUTO_INCREMENT=2 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
-
-LOCK TABLES `tbl_story` WRITE;
-INSERT INTO `tbl_story` VALUES (1,1,'The Brave Fox','English','Arial','http://example.com/story.pdf','Once upon a time...','published','2025-05-13 15:12:05','2025-05-13 15:12:05',9.99);
-UNLOCK TABLES;
-
-DROP TABLE IF EXISTS `tbl_users`;
-CREATE TABLE `tbl_users` (
-  `id` int NOT NULL AUTO_INCREMENT,
-  `full_name` varchar(100) DEFAULT NULL,
-  `email` varchar(100) DEFAULT NULL,
-  `mobile` varchar(15) DEFAULT NULL,
-  `password` varchar(255) DEFAULT NULL,
-  `role` varchar(20) DEFAULT NULL,
-  PRIMARY KEY (`id`)
-) ENGINE=InnoDB AUTO_INCREMENT=2 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
-
-LOCK TABLES `tbl_users` WRITE;
-INSERT INTO `tbl_users` VALUES (1,'John Doe','john@example.com','1234567890','scrypt:32768:8:1$NUI155ELanqxL424$a728ffa9696925814f6705df70038c32cd53410fc000501be839f66cd82ff13d81670c04152ec0224d566f1d92447d5e29cf44e6d8647910d3f5d5a59925837a','Writer');
-UNLOCK TABLES;
+CREATE DATABASE IF NOT EXISTS `goddo_poddo_db` /*!40100 DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci */ /*!80016 DEFAULT ENCRYPTION='N' */;
+USE `goddo_poddo_db`;
+
+-- Tables are dropped children first and created parents first, for the foreign keys.
+-- Keep in step with models.py; migrate_schema.py brings an existing database up to date.
+-- The counter, search and tag tables are derived from the content tables: run reconcile_counters.py,
+-- reindex_search.py and backfill_tags.py after loading data.
+
+DROP TABLE IF EXISTS `tbl_story`;
+DROP TABLE IF EXISTS `tbl_poem`;
+DROP TABLE IF EXISTS `tbl_help_support`;
+DROP TABLE IF EXISTS `tbl_content_tag`;
+DROP TABLE IF EXISTS `tbl_audio_story`;
+DROP TABLE IF EXISTS `tbl_users`;
+DROP TABLE IF EXISTS `tbl_tag`;
+DROP TABLE IF EXISTS `tbl_stored_file`;
+DROP TABLE IF EXISTS `tbl_search_document`;
+DROP TABLE IF EXISTS `tbl_job`;
+DROP TABLE IF EXISTS `tbl_content_counter`;
+DROP TABLE IF EXISTS `tbl_admin`;
+
+CREATE TABLE `tbl_admin` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `full_name` varchar(100) NOT NULL,
+  `email` varchar(120) NOT NULL,
+  `mobile` varchar(15) NOT NULL,
+  `password` varchar(255) NOT NULL,
+  `role` varchar(50) NOT NULL,
+  `language` varchar(50) DEFAULT NULL,
+  `status` varchar(20) NOT NULL,
+  `created_on` datetime NOT NULL,
+  `updated_on` datetime NOT NULL,
+  `failed_logins` int DEFAULT NULL,
+  `locked_until` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `email` (`email`),
+  UNIQUE KEY `mobile` (`mobile`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE `tbl_content_counter` (
+  `USER_ID` int NOT NULL,
+  `CONTENT_TYPE` varchar(20) NOT NULL,
+  `STATUS` varchar(20) NOT NULL,
+  `COUNT` int NOT NULL,
+  `UPDATED_ON` datetime DEFAULT NULL,
+  `VERSION` int DEFAULT NULL,
+  PRIMARY KEY (`USER_ID`,`CONTENT_TYPE`,`STATUS`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE `tbl_job` (
+  `JOB_ID` int NOT NULL AUTO_INCREMENT,
+  `TASK` varchar(64) NOT NULL,
+  `PAYLOAD` text,
+  `IDEMPOTENCY_KEY` varchar(191) DEFAULT NULL,
+  `STATUS` varchar(20) NOT NULL,
+  `ATTEMPTS` int NOT NULL,
+  `MAX_ATTEMPTS` int NOT NULL,
+  `RUN_AT` datetime NOT NULL,
+  `LOCKED_BY` varchar(64) DEFAULT NULL,
+  `LOCKED_AT` datetime DEFAULT NULL,
+  `LAST_ERROR` text,
+  `CREATED_ON` datetime DEFAULT NULL,
+  `UPDATED_ON` datetime DEFAULT NULL,
+  PRIMARY KEY (`JOB_ID`),
+  UNIQUE KEY `IDEMPOTENCY_KEY` (`IDEMPOTENCY_KEY`),
+  KEY `ix_job_status_run_at` (`STATUS`,`RUN_AT`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE `tbl_search_document` (
+  `DOC_TYPE` varchar(10) NOT NULL,
+  `DOC_ID` int NOT NULL,
+  `LANGUAGE` varchar(50) DEFAULT NULL,
+  `NAME` varchar(255) DEFAULT NULL,
+  `TAGS` text,
+  `BODY` text,
+  `UPDATED_ON` datetime DEFAULT NULL,
+  PRIMARY KEY (`DOC_TYPE`,`DOC_ID`),
+  FULLTEXT KEY `ix_search_fulltext` (`NAME`,`TAGS`,`BODY`),
+  KEY `ix_search_language` (`LANGUAGE`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE `tbl_stored_file` (
+  `SHA256` varchar(64) NOT NULL,
+  `EXT` varchar(10) NOT NULL,
+  `SIZE` bigint NOT NULL,
+  `REF_COUNT` int NOT NULL,
+  `CREATED_ON` datetime DEFAULT NULL,
+  `UPDATED_ON` datetime DEFAULT NULL,
+  PRIMARY KEY (`SHA256`,`EXT`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE `tbl_tag` (
+  `TAG_ID` int NOT NULL AUTO_INCREMENT,
+  `NAME` varchar(100) NOT NULL,
+  PRIMARY KEY (`TAG_ID`),
+  UNIQUE KEY `NAME` (`NAME`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE `tbl_users` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `full_name` varchar(100) DEFAULT NULL,
+  `email` varchar(100) DEFAULT NULL,
+  `mobile` varchar(15) DEFAULT NULL,
+  `password` varchar(255) DEFAULT NULL,
+  `role` varchar(20) DEFAULT NULL,
+  `is_active` tinyint(1) DEFAULT '1',
+  `is_approved` tinyint(1) DEFAULT '0',
+  `created_on` datetime DEFAULT NULL,
+  `updated_on` datetime DEFAULT NULL,
+  `failed_logins` int DEFAULT NULL,
+  `locked_until` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `unique_email_role` (`email`,`role`),
+  KEY `ix_users_role_active_approved` (`role`,`is_active`,`is_approved`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+LOCK TABLES `tbl_users` WRITE;
+INSERT INTO `tbl_users` (`id`,`full_name`,`email`,`mobile`,`password`,`role`) VALUES (1,'John Doe','john@example.com','1234567890','scrypt:32768:8:1$NUI155ELanqxL424$a728ffa9696925814f6705df70038c32cd53410fc000501be839f66cd82ff13d81670c04152ec0224d566f1d92447d5e29cf44e6d8647910d3f5d5a59925837a','Writer');
+UNLOCK TABLES;
+
+CREATE TABLE `tbl_audio_story` (
+  `AUDIO_ID` int NOT NULL AUTO_INCREMENT,
+  `CREATED_BY` int DEFAULT NULL,
+  `NAME` varchar(255) DEFAULT NULL,
+  `LANGUAGE` varchar(50) DEFAULT NULL,
+  `LINK_TYPE` varchar(32) DEFAULT NULL,
+  `LINKED_STORY_ID` int DEFAULT NULL,
+  `LINKED_POEM_ID` int DEFAULT NULL,
+  `AUDIO_URL` varchar(255) DEFAULT NULL,
+  `TAGS` text,
+  `STATUS` varchar(20) DEFAULT NULL,
+  `CREATED_ON` datetime DEFAULT NULL,
+  `UPDATED_ON` datetime DEFAULT NULL,
+  `DURATION_SEC` float DEFAULT NULL,
+  `BITRATE` int DEFAULT NULL,
+  `SAMPLE_RATE` int DEFAULT NULL,
+  `CHANNELS` smallint DEFAULT NULL,
+  `BYTE_SIZE` bigint DEFAULT NULL,
+  PRIMARY KEY (`AUDIO_ID`),
+  KEY `ix_audio_created_by` (`CREATED_BY`),
+  KEY `ix_audio_status_created` (`STATUS`,`CREATED_ON`),
+  KEY `ix_audio_status_updated` (`STATUS`,`UPDATED_ON`),
+  KEY `ix_audio_updated` (`UPDATED_ON`),
+  CONSTRAINT `tbl_audio_story_ibfk_1` FOREIGN KEY (`CREATED_BY`) REFERENCES `tbl_users` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE `tbl_content_tag` (
+  `TAG_ID` int NOT NULL,
+  `CONTENT_TYPE` varchar(10) NOT NULL,
+  `CONTENT_ID` int NOT NULL,
+  PRIMARY KEY (`TAG_ID`,`CONTENT_TYPE`,`CONTENT_ID`),
+  KEY `ix_content_tag_content` (`CONTENT_TYPE`,`CONTENT_ID`),
+  CONSTRAINT `tbl_content_tag_ibfk_1` FOREIGN KEY (`TAG_ID`) REFERENCES `tbl_tag` (`TAG_ID`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE `tbl_help_support` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `support_type` varchar(100) NOT NULL,
+  `user_id` int NOT NULL,
+  `created_on` datetime NOT NULL,
+  `status` varchar(20) DEFAULT NULL,
+  `updated_on` datetime NOT NULL,
+  `admin_note` text,
+  PRIMARY KEY (`id`),
+  KEY `ix_help_support_created` (`created_on`),
+  KEY `ix_help_support_status_created` (`status`,`created_on`),
+  KEY `tbl_help_support_ibfk_1` (`user_id`),
+  CONSTRAINT `tbl_help_support_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `tbl_users` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE `tbl_poem` (
+  `STORY_ID` int NOT NULL AUTO_INCREMENT,
+  `WRITTEN_BY` int DEFAULT NULL,
+  `NAME` varchar(255) DEFAULT NULL,
+  `LANGUAGE` varchar(50) DEFAULT NULL,
+  `FONT` varchar(50) DEFAULT NULL,
+  `PDF_URL` varchar(255) DEFAULT NULL,
+  `STORY` text,
+  `STATUS` varchar(20) DEFAULT NULL,
+  `CREATED_ON` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  `UPDATED_ON` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  `PRICE` decimal(10,2) DEFAULT NULL,
+  `TAGS` text,
+  PRIMARY KEY (`STORY_ID`),
+  KEY `ix_poem_status_updated` (`STATUS`,`UPDATED_ON`),
+  KEY `ix_poem_writer_status_updated` (`WRITTEN_BY`,`STATUS`,`UPDATED_ON`),
+  KEY `ix_poem_writer_updated` (`WRITTEN_BY`,`UPDATED_ON`),
+  CONSTRAINT `tbl_poem_ibfk_1` FOREIGN KEY (`WRITTEN_BY`) REFERENCES `tbl_users` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+LOCK TABLES `tbl_poem` WRITE;
+INSERT INTO `tbl_poem` (`STORY_ID`,`WRITTEN_BY`,`NAME`,`LANGUAGE`,`FONT`,`PDF_URL`,`STORY`,`STATUS`,`CREATED_ON`,`UPDATED_ON`,`PRICE`) VALUES (1,1,'Sunset Melodies','English','Times New Roman','http://example.com/poem.pdf','Golden hues dance in the sky...','published','2025-05-13 15:14:09','2025-05-13 15:14:09',4.99);
+UNLOCK TABLES;
+
+CREATE TABLE `tbl_story` (
+  `STORY_ID` int NOT NULL AUTO_INCREMENT,
+  `WRITTEN_BY` int DEFAULT NULL,
+  `NAME` varchar(255) DEFAULT NULL,
+  `LANGUAGE` varchar(50) DEFAULT NULL,
+  `FONT` varchar(50) DEFAULT NULL,
+  `PDF_URL` varchar(255) DEFAULT NULL,
+  `STORY` text,
+  `STATUS` varchar(20) DEFAULT NULL,
+  `CREATED_ON` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  `UPDATED_ON` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  `PRICE` decimal(10,2) DEFAULT NULL,
+  `TAGS` text,
+  PRIMARY KEY (`STORY_ID`),
+  KEY `ix_story_status_updated` (`STATUS`,`UPDATED_ON`),
+  KEY `ix_story_writer_status_updated` (`WRITTEN_BY`,`STATUS`,`UPDATED_ON`),
+  KEY `ix_story_writer_updated` (`WRITTEN_BY`,`UPDATED_ON`),
+  CONSTRAINT `tbl_story_ibfk_1` FOREIGN KEY (`WRITTEN_BY`) REFERENCES `tbl_users` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+LOCK TABLES `tbl_story` WRITE;
+INSERT INTO `tbl_story` (`STORY_ID`,`WRITTEN_BY`,`NAME`,`LANGUAGE`,`FONT`,`PDF_URL`,`STORY`,`STATUS`,`CREATED_ON`,`UPDATED_ON`,`PRICE`) VALUES (1,1,'The Brave Fox','English','Arial','http://example.com/story.pdf','Once upon a time...','published','2025-05-13 15:12:05','2025-05-13 15:12:05',9.99);
+UNLOCK TABLES;
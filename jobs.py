@@ -0,0 +1,176 @@
+import json
+import os
+import random
+import socket
+import threading
+import traceback
+from datetime import datetime, timedelta
+from sqlalchemy import func, or_, and_
+from sqlalchemy.exc import IntegrityError
+from models import db, Job
+
+# task name -> callable(**payload), filled in by @task
+TASKS = {}
+
+POLL_INTERVAL = 1.0                          # seconds between empty polls
+CLAIM_BATCH = 10                             # candidates looked at per claim attempt
+LEASE = timedelta(minutes=15)                # a running job older than this is presumed dead
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 3600
+
+
+def task(name):
+    """Register a function as a job handler under `name`.
+
+    Handlers get the job payload as keyword arguments and run inside an app
+    context. Their session changes are committed together with the job
+    being marked done, and rolled back if they raise.
+    """
+    def decorator(fn):
+        TASKS[name] = fn
+        return fn
+    return decorator
+
+
+def enqueue(name, payload=None, key=None, delay=0, max_attempts=5):
+    """Add a job to the caller's transaction and return it.
+
+    With an idempotency `key`, a job already enqueued under that key is
+    returned instead of adding another, so retried requests and repeated
+    clicks don't duplicate work. A queued, running or done job is returned
+    as it is; a failed one is queued again with fresh attempts and this
+    payload, so enqueueing after its retries ran out isn't a silent no-op.
+    The job is only visible to workers once the caller commits.
+    """
+    if name not in TASKS:
+        raise ValueError(f'Unknown job task: {name}')
+    if key:
+        existing = Job.query.filter_by(IDEMPOTENCY_KEY=key).first()
+        if existing:
+            return _requeue_failed(existing, payload, delay, max_attempts)
+
+    job = Job(TASK=name, PAYLOAD=json.dumps(payload or {}), IDEMPOTENCY_KEY=key, MAX_ATTEMPTS=max_attempts,
+              RUN_AT=datetime.utcnow() + timedelta(seconds=delay))
+    try:
+        with db.session.begin_nested():
+            db.session.add(job)
+    except IntegrityError:
+        # Lost a race with another request using the same key; a locking read
+        # sees its committed row even under MySQL's REPEATABLE READ snapshot
+        existing = Job.query.filter_by(IDEMPOTENCY_KEY=key).with_for_update().one()
+        return _requeue_failed(existing, payload, delay, max_attempts)
+    return job
+
+
+def _requeue_failed(job, payload, delay, max_attempts):
+    if job.STATUS != 'failed':
+        return job
+    # Conditional, so a job another request has already revived (and a worker claimed) is left alone
+    Job.query.filter(Job.JOB_ID == job.JOB_ID, Job.STATUS == 'failed') \
+             .update({Job.STATUS: 'queued', Job.PAYLOAD: json.dumps(payload or {}), Job.ATTEMPTS: 0,
+                      Job.MAX_ATTEMPTS: max_attempts, Job.RUN_AT: datetime.utcnow() + timedelta(seconds=delay),
+                      Job.LOCKED_BY: None, Job.LOCKED_AT: None}, synchronize_session=False)
+    db.session.refresh(job)
+    return job
+
+
+def _claimable(now):
+    return or_(and_(Job.STATUS == 'queued', Job.RUN_AT <= now),
+               and_(Job.STATUS == 'running', Job.LOCKED_AT < now - LEASE))
+
+
+def claim_next(worker_id):
+    """Atomically take the next due job for `worker_id`, or return None.
+
+    Claims are a conditional UPDATE on the row, so any number of worker
+    threads and processes can poll the same table without a broker or
+    SELECT ... FOR UPDATE SKIP LOCKED (which older MySQL and SQLite lack).
+    """
+    now = datetime.utcnow()
+    candidates = [job_id for (job_id,) in db.session.query(Job.JOB_ID).filter(_claimable(now))
+                                                  .order_by(Job.RUN_AT, Job.JOB_ID).limit(CLAIM_BATCH)]
+    db.session.rollback()  # end the read so the UPDATE below sees fresh rows
+    for job_id in candidates:
+        claimed = Job.query.filter(Job.JOB_ID == job_id, _claimable(now)) \
+                           .update({Job.STATUS: 'running', Job.LOCKED_BY: worker_id, Job.LOCKED_AT: now,
+                                    Job.ATTEMPTS: Job.ATTEMPTS + 1}, synchronize_session=False)
+        db.session.commit()
+        if not claimed:
+            continue  # another worker got there first
+        job = db.session.get(Job, job_id)
+        if job.ATTEMPTS > job.MAX_ATTEMPTS:
+            # Its last attempt never finished (the worker died mid-job)
+            job.STATUS = 'failed'
+            job.LOCKED_BY = None
+            job.LAST_ERROR = job.LAST_ERROR or 'Lease expired on the final attempt'
+            db.session.commit()
+            continue
+        return job
+    return None
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter, so failing jobs don't retry in lockstep."""
+    delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.9, 1.1)
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome. Returns True on success."""
+    job_id = job.JOB_ID
+    try:
+        handler = TASKS[job.TASK]
+        handler(**json.loads(job.PAYLOAD or '{}'))
+        job.STATUS = 'done'
+        job.LOCKED_BY = None
+        job.LAST_ERROR = None
+        db.session.commit()
+        return True
+    except Exception:
+        error = traceback.format_exc()
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        if job.ATTEMPTS < job.MAX_ATTEMPTS:
+            job.STATUS = 'queued'
+            job.RUN_AT = datetime.utcnow() + timedelta(seconds=retry_delay(job.ATTEMPTS))
+        else:
+            job.STATUS = 'failed'
+        job.LOCKED_BY = None
+        job.LAST_ERROR = error[-4000:]
+        db.session.commit()
+        return False
+
+
+def work(app, worker_id, stop, once=False):
+    """Claim and run jobs until `stop` is set (or, with `once`, until the queue is empty)."""
+    with app.app_context():
+        while not stop.is_set():
+            job = claim_next(worker_id)
+            if job is not None:
+                run_job(job)
+                continue
+            if once:
+                break
+            stop.wait(POLL_INTERVAL)
+            db.session.remove()
+
+
+def run_worker(app, threads=1, once=False, stop=None):
+    """Run `threads` workers in this process; returns when they have all stopped."""
+    stop = stop or threading.Event()
+    prefix = f'{socket.gethostname()}:{os.getpid()}'
+    workers = [threading.Thread(target=work, args=(app, f'{prefix}:{n}', stop, once), daemon=True)
+               for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        while worker.is_alive():
+            worker.join(0.5)  # short joins keep the main thread responsive to signals
+    return stop
+
+
+def job_stats():
+    """Job counts by status, plus how many queued jobs are already due."""
+    counts = dict(db.session.query(Job.STATUS, func.count(Job.JOB_ID)).group_by(Job.STATUS).all())
+    due = Job.query.filter(Job.STATUS == 'queued', Job.RUN_AT <= datetime.utcnow()).count()
+    return {'counts': counts, 'due': due}
@@ -0,0 +1,235 @@
+import atexit
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from flask import g, request
+from models import db
+from response_cache import response_cache
+
+# Latency buckets (seconds) and response size buckets (bytes)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name -> (type, help)
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP requests by route template, method and status.'),
+    'http_request_exceptions_total': ('counter', 'Requests that raised an unhandled exception.'),
+    'http_request_duration_seconds': ('histogram', 'Request latency by route template and method.'),
+    'http_response_size_bytes': ('histogram', 'Response body size by route template and method.'),
+    'db_pool_size': ('gauge', 'Configured connection pool size.'),
+    'db_pool_checked_out': ('gauge', 'Connections currently checked out of the pool.'),
+    'db_pool_overflow': ('gauge', 'Connections open beyond the pool size.'),
+    'db_pool_checkout_waits_total': ('counter', 'Checkouts that waited for a free connection.'),
+    'db_pool_checkout_wait_seconds_total': ('counter', 'Time spent waiting for a free connection.'),
+    'response_cache_hits_total': ('counter', 'Response cache hits.'),
+    'response_cache_misses_total': ('counter', 'Response cache misses.'),
+    'response_cache_evictions_total': ('counter', 'Response cache LRU evictions.'),
+    'response_cache_entries': ('gauge', 'Responses currently cached.'),
+    'response_cache_hit_ratio': ('gauge', 'Hits / lookups since start, across all processes.'),
+}
+
+
+class Metrics:
+    """Request, connection pool and cache metrics in Prometheus text format.
+
+    Updates are a dict increment under a lock. With METRICS_MULTIPROC_DIR set
+    (gunicorn), each worker writes a snapshot there at most every
+    METRICS_FLUSH_INTERVAL seconds and /metrics adds them all up: counters
+    and histograms from every worker that ever wrote one, gauges only from
+    live workers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}      # (name, labels) -> value
+        self.histograms = {}    # (name, labels) -> [bucket counts..., sum, count]
+        self.app = None
+        self.multiproc_dir = None
+        self.flush_interval = 1.0
+        self.last_flush = 0.0
+
+    def init_app(self, app):
+        self.app = app
+        self.multiproc_dir = app.config.get('METRICS_MULTIPROC_DIR')
+        self.flush_interval = app.config.get('METRICS_FLUSH_INTERVAL', self.flush_interval)
+        if self.multiproc_dir:
+            os.makedirs(self.multiproc_dir, exist_ok=True)
+            atexit.register(self.flush)
+        app.before_request(self._start)
+        app.after_request(self._record)
+        app.teardown_request(self._record_exception)
+
+    # ----- recording -----
+
+    def inc(self, name, labels, value=1):
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value, buckets):
+        key = (name, labels)
+        with self.lock:
+            series = self.histograms.get(key)
+            if series is None:
+                series = self.histograms[key] = [0] * (len(buckets) + 2)
+            series[bisect.bisect_left(buckets, value)] += 1   # per-bucket; made cumulative on render
+            series[-2] += value
+            series[-1] += 1
+
+    def _start(self):
+        g._metrics_started = time.perf_counter()
+
+    def _route_labels(self):
+        # The rule template ('/api/story/<int:id>'), never the raw path, keeps label cardinality bounded
+        rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        return (('route', rule), ('method', request.method))
+
+    def _record(self, response):
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return response
+        labels = self._route_labels()
+        self.inc('http_requests_total', labels + (('status', str(response.status_code)),))
+        self.observe('http_request_duration_seconds', labels, time.perf_counter() - started, DURATION_BUCKETS)
+        size = response.content_length
+        if size is None and not response.direct_passthrough and not response.is_streamed:
+            size = len(response.get_data())
+        if size is not None:
+            self.observe('http_response_size_bytes', labels, size, SIZE_BUCKETS)
+        if self.multiproc_dir and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+        return response
+
+    def _record_exception(self, exc):
+        if exc is not None:
+            self.inc('http_request_exceptions_total', self._route_labels())
+
+    # ----- snapshots -----
+
+    def _gauges_and_process_counters(self):
+        """Pool and cache values read from live objects, as (counters, gauges) lists."""
+        counters, gauges = [], []
+        with self.app.app_context():
+            engines = dict(db.engines)
+        for bind, engine in engines.items():
+            labels = (('bind', bind or 'primary'),)
+            pool = engine.pool
+            for name, method in (('db_pool_size', 'size'), ('db_pool_checked_out', 'checkedout'),
+                                 ('db_pool_overflow', 'overflow')):
+                if hasattr(pool, method):
+                    gauges.append((name, labels, max(getattr(pool, method)(), 0)))
+            if hasattr(pool, 'waits'):
+                counters.append(('db_pool_checkout_waits_total', labels, pool.waits))
+                counters.append(('db_pool_checkout_wait_seconds_total', labels, pool.wait_seconds))
+        cache = response_cache.snapshot()
+        for stat in ('hits', 'misses', 'evictions'):
+            counters.append((f'response_cache_{stat}_total', (), cache[stat]))
+        gauges.append(('response_cache_entries', (), cache['entries']))
+        return counters, gauges
+
+    def snapshot(self):
+        with self.lock:
+            counters = [(name, labels, value) for (name, labels), value in self.counters.items()]
+            histograms = [(name, labels, list(series)) for (name, labels), series in self.histograms.items()]
+        live_counters, gauges = self._gauges_and_process_counters()
+        return {'pid': os.getpid(), 'counters': counters + live_counters, 'histograms': histograms,
+                'gauges': gauges}
+
+    def flush(self):
+        """Write this process's snapshot for the other workers' /metrics to read."""
+        self.last_flush = time.monotonic()
+        path = os.path.join(self.multiproc_dir, f'metrics_{os.getpid()}.json')
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def _snapshots(self):
+        if not self.multiproc_dir:
+            return [self.snapshot()]
+        self.flush()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.multiproc_dir, 'metrics_*.json')):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # being replaced right now; picked up next scrape
+        return snapshots
+
+    # ----- exposition -----
+
+    def render(self):
+        """All processes' metrics in the Prometheus text exposition format."""
+        counters, histograms, gauges = {}, {}, {}
+        for snap in self._snapshots():
+            alive = _pid_alive(snap['pid'])
+            for name, labels, value in snap['counters']:
+                key = (name, _labels_key(labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, series in snap['histograms']:
+                key = (name, _labels_key(labels))
+                total = histograms.setdefault(key, [0] * len(series))
+                for i, value in enumerate(series):
+                    total[i] += value
+            if alive:
+                for name, labels, value in snap['gauges']:
+                    key = (name, _labels_key(labels))
+                    gauges[key] = gauges.get(key, 0) + value
+
+        hits = counters.get(('response_cache_hits_total', ()), 0)
+        lookups = hits + counters.get(('response_cache_misses_total', ()), 0)
+        if lookups:
+            gauges[('response_cache_hit_ratio', ())] = round(hits / lookups, 4)
+
+        series_by_name = {}
+        for (name, labels), value in sorted(list(counters.items()) + list(gauges.items())):
+            series_by_name.setdefault(name, []).extend(_sample(name, labels, value))
+        for (name, labels), series in sorted(histograms.items()):
+            buckets = DURATION_BUCKETS if name == 'http_request_duration_seconds' else SIZE_BUCKETS
+            lines = series_by_name.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(buckets + (float('inf'),), series[:-2]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.extend(_sample(f'{name}_bucket', labels + (('le', le),), cumulative))
+            lines.extend(_sample(f'{name}_sum', labels, series[-2]))
+            lines.extend(_sample(f'{name}_count', labels, series[-1]))
+
+        output = []
+        for name in METRICS:
+            if name in series_by_name:
+                metric_type, help_text = METRICS[name]
+                output.append(f'# HELP {name} {help_text}')
+                output.append(f'# TYPE {name} {metric_type}')
+                output.extend(series_by_name[name])
+        return '\n'.join(output) + '\n'
+
+
+def _labels_key(labels):
+    return tuple(tuple(pair) for pair in labels)
+
+
+def _sample(name, labels, value):
+    if labels:
+        rendered = ','.join('{}="{}"'.format(k, str(v).replace('\\', r'\\').replace('"', r'\"')) for k, v in labels)
+        return [f'{name}{{{rendered}}} {value}']
+    return [f'{name} {value}']
+
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+metrics = Metrics()
@@ -0,0 +1,159 @@
+import sys
+from sqlalchemy import inspect, text
+from app import app
+from models import db, User, Story, Poem, AudioStory, HelpSupport
+from counters import reconcile_counters
+from search import reindex_search
+from tags import backfill_tags
+
+# Usage:
+#   python migrate_schema.py          create the tables, nullable columns and indexes declared in models.py
+#                                     that the DB is missing, and fill the derived tables it had to create
+#   python migrate_schema.py --check  EXPLAIN the hot queries and exit 1 if one scans or filesorts
+
+# Tables derived from the content tables -> (description, function rebuilding them)
+BACKFILLS = {
+    'tbl_content_counter': ('Counter rows', reconcile_counters),
+    'tbl_search_document': ('Search documents', reindex_search),
+    'tbl_content_tag': ('Tag links', backfill_tags),
+}
+
+
+def hot_queries():
+    """The filter/sort paths the indexes exist for, as (label, query) pairs."""
+    return [
+        ('public stories', Story.query.filter_by(STATUS='published')
+                                      .order_by(Story.UPDATED_ON.desc(), Story.STORY_ID.desc()).limit(21)),
+        ('public poems', Poem.query.filter_by(STATUS='published')
+                                   .order_by(Poem.UPDATED_ON.desc(), Poem.STORY_ID.desc()).limit(21)),
+        ('writer stories', Story.query.filter_by(WRITTEN_BY=1).order_by(Story.UPDATED_ON.desc())),
+        ('writer poems', Poem.query.filter_by(WRITTEN_BY=1).order_by(Poem.UPDATED_ON.desc())),
+        ('story drafts', Story.query.filter_by(WRITTEN_BY=1, STATUS='draft')),
+        ('poem drafts', Poem.query.filter_by(WRITTEN_BY=1, STATUS='draft')),
+        ('all audio', AudioStory.query.order_by(AudioStory.UPDATED_ON.desc()).limit(20)),
+        ('feed audio', AudioStory.query.filter_by(STATUS='published')
+                                      .order_by(AudioStory.UPDATED_ON.desc(), AudioStory.AUDIO_ID.desc()).limit(20)),
+        ('drafted audio', AudioStory.query.filter_by(STATUS='draft').order_by(AudioStory.CREATED_ON.desc())),
+        ('help tickets', HelpSupport.query.order_by(HelpSupport.created_on.desc(), HelpSupport.id.desc()).limit(10)),
+        ('help tickets by status', HelpSupport.query.filter_by(status='Pending')
+                                              .order_by(HelpSupport.created_on.desc()).limit(10)),
+        ('active writers', User.query.filter_by(role='Writer', is_active=True, is_approved=True)),
+    ]
+
+
+def create_missing_tables():
+    """Create the tables declared in models.py that the DB doesn't have yet, with their indexes."""
+    inspector = inspect(db.engine)
+    missing = [table.name for table in db.metadata.sorted_tables if not inspector.has_table(table.name)]
+    if missing:
+        db.create_all()
+    return missing
+
+
+def add_missing_columns():
+    """ALTER existing tables to add columns declared since they were created.
+
+    Only nullable columns are handled; anything else needs a hand-written migration.
+    """
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    added = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {col['name'] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {preparer.format_table(table)} '
+                                  f'ADD COLUMN {preparer.format_column(column)} {col_type} NULL'))
+            added.append(f'{table.name}.{column.name}')
+    return added
+
+
+def create_missing_indexes():
+    inspector = inspect(db.engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue  # create_missing_tables() builds new tables with their indexes
+        existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            ddl_if = getattr(index, '_ddl_if', None)
+            if ddl_if is not None and ddl_if.dialect not in (None, db.engine.dialect.name):
+                continue  # e.g. the MySQL-only FULLTEXT index
+            if index.name not in existing:
+                index.create(bind=db.engine)
+                created.append(index.name)
+    return created
+
+
+def normalize_sqlite_timestamps():
+    """SQLite only: pad UPDATED_ON values written by SQL now() ('YYYY-MM-DD HH:MM:SS') to the
+    'YYYY-MM-DD HH:MM:SS.ffffff' text SQLAlchemy stores and binds.
+
+    SQLite compares them as strings, so a short value sorts before its own
+    padded cursor and keyset pages would keep returning the boundary row.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return 0
+    fixed = 0
+    with db.engine.begin() as conn:
+        for model in (Story, Poem, AudioStory):
+            column = model.UPDATED_ON.name
+            fixed += conn.execute(text(f"UPDATE {model.__tablename__} SET {column} = {column} || '.000000' "
+                                       f"WHERE length({column}) = 19")).rowcount
+    return fixed
+
+
+def explain_problems(label, query):
+    """Return a list of plan problems for one query on the current dialect."""
+    sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    problems = []
+    with db.engine.connect() as conn:
+        if db.engine.dialect.name == 'sqlite':
+            for row in conn.execute(text('EXPLAIN QUERY PLAN ' + sql)):
+                detail = row[-1]
+                if detail.startswith('SCAN') and 'USING' not in detail:
+                    problems.append(f'{label}: full scan ({detail})')
+                if 'TEMP B-TREE' in detail:
+                    problems.append(f'{label}: sort not served by an index ({detail})')
+        else:
+            for row in conn.execute(text('EXPLAIN ' + sql)).mappings():
+                if row.get('type') == 'ALL':
+                    problems.append(f"{label}: full scan of {row.get('table')}")
+                if 'filesort' in (row.get('Extra') or ''):
+                    problems.append(f"{label}: filesort on {row.get('table')}")
+    return problems
+
+
+def main():
+    with app.app_context():
+        if '--check' in sys.argv:
+            problems = []
+            for label, query in hot_queries():
+                problems.extend(explain_problems(label, query))
+            for problem in problems:
+                print(problem)
+            print('Hot query plans OK' if not problems else f'{len(problems)} plan problem(s)')
+            sys.exit(1 if problems else 0)
+
+        tables = create_missing_tables()
+        print('Created tables:', ', '.join(tables) if tables else 'none (already up to date)')
+        added = add_missing_columns()
+        print('Added columns:', ', '.join(added) if added else 'none (already up to date)')
+        created = create_missing_indexes()
+        print('Created indexes:', ', '.join(created) if created else 'none (already up to date)')
+        fixed = normalize_sqlite_timestamps()
+        if fixed:
+            print('Normalized UPDATED_ON values:', fixed)
+        # After the columns, since the backfills read e.g. TAGS
+        for table, (label, backfill) in BACKFILLS.items():
+            if table in tables:
+                print(f'{label} backfilled:', backfill())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,70 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from datetime import datetime, timedelta
+from flask import current_app, has_app_context
+from db_routing import RoutingSession
+from passwords import password_hasher
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
-class User(db.Model):
+
+class PasswordMixin:
+    """Password hashing and the failed-login throttle shared by User and Admin.
+
+    After LOGIN_MAX_FAILURES wrong passwords in a row the account is locked
+    for LOGIN_LOCKOUT_SECONDS, during which logins are refused without
+    hashing anything. The throttle columns are written with UPDATE
+    statements that leave updated_on alone.
+    """
+
+    failed_logins = db.Column(db.Integer)
+    locked_until = db.Column(db.DateTime)
+
+    def set_password(self, password):
+        self.password = password_hasher.hash(password)
+
+    def check_password(self, password):
+        return password_hasher.verify(self.password, password)
+
+    def login_locked_for(self):
+        """Seconds until a locked account accepts logins again (0 when it isn't locked)."""
+        if self.locked_until is None:
+            return 0
+        remaining = (self.locked_until - datetime.utcnow()).total_seconds()
+        return int(remaining) + 1 if remaining > 0 else 0
+
+    def record_login_failure(self):
+        cls = type(self)
+        now = datetime.utcnow()
+        if self.locked_until is not None and self.locked_until <= now:
+            # The lockout is over: start counting again rather than re-locking on the next miss.
+            # Guarded on locked_until in SQL so a concurrent failure's count isn't wiped twice.
+            cls.query.filter(cls.id == self.id, cls.locked_until <= now).update(
+                {cls.failed_logins: 0, cls.locked_until: None, cls.updated_on: cls.updated_on},
+                synchronize_session=False)
+        config = current_app.config if has_app_context() else {}
+        max_failures = config.get('LOGIN_MAX_FAILURES', 5)
+        locked_until = now + timedelta(seconds=config.get('LOGIN_LOCKOUT_SECONDS', 300))
+        failures = db.func.coalesce(cls.failed_logins, 0) + 1
+        # Counted in SQL so concurrent failures all register; locked_until is set first so both
+        # MySQL (left-to-right SET) and SQLite see the old failed_logins in the CASE
+        cls.query.filter_by(id=self.id).update([
+            (cls.locked_until, db.case((failures >= max_failures, locked_until), else_=cls.locked_until)),
+            (cls.failed_logins, failures),
+            (cls.updated_on, cls.updated_on),
+        ], synchronize_session=False, update_args={'preserve_parameter_order': True})
+
+    def record_login_success(self, password):
+        """Clear the failure count and upgrade a hash made with an older method or cost."""
+        cls = type(self)
+        values = {cls.updated_on: cls.updated_on}
+        if self.failed_logins or self.locked_until is not None:
+            values.update({cls.failed_logins: 0, cls.locked_until: None})
+        if password_hasher.needs_rehash(self.password):
+            values[cls.password] = password_hasher.hash(password)
+        if len(values) > 1:
+            cls.query.filter_by(id=self.id).update(values, synchronize_session=False)
+
+class User(PasswordMixin, db.Model):
     __tablename__ = 'tbl_users'
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -20,14 +80,9 @@ class User(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('email', 'role', name='unique_email_role'),  # ✅ Composite unique constraint
+        db.Index('ix_users_role_active_approved', 'role', 'is_active', 'is_approved'),
     )
 
-    def set_password(self, password):
-        self.password = generate_password_hash(password)
-
-    def check_password(self, password):
-        return check_password_hash(self.password, password)
-
 
 class Story(db.Model):
     __tablename__ = 'tbl_story'
@@ -44,6 +99,12 @@ class Story(db.Model):
     PRICE = db.Column(db.Numeric(10, 2))
     TAGS = db.Column(db.Text)  # Newly added column
 
+    __table_args__ = (
+        db.Index('ix_story_status_updated', 'STATUS', 'UPDATED_ON'),              # public listing
+        db.Index('ix_story_writer_status_updated', 'WRITTEN_BY', 'STATUS', 'UPDATED_ON'),  # writer drafts
+        db.Index('ix_story_writer_updated', 'WRITTEN_BY', 'UPDATED_ON'),          # writer's own list
+    )
+
 class AudioStory(db.Model):
     __tablename__ = 'tbl_audio_story'
 
@@ -59,6 +120,19 @@ class AudioStory(db.Model):
     STATUS = db.Column(db.String(20))
     CREATED_ON = db.Column(db.DateTime, default=datetime.utcnow)
     UPDATED_ON = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Read from the file headers at upload (see audio_meta.py); NULL until probed
+    DURATION_SEC = db.Column(db.Float, nullable=True)
+    BITRATE = db.Column(db.Integer, nullable=True)        # bits per second
+    SAMPLE_RATE = db.Column(db.Integer, nullable=True)    # Hz
+    CHANNELS = db.Column(db.SmallInteger, nullable=True)
+    BYTE_SIZE = db.Column(db.BigInteger, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_audio_updated', 'UPDATED_ON'),                    # all/public audio listing
+        db.Index('ix_audio_status_updated', 'STATUS', 'UPDATED_ON'),   # published audio in the feed
+        db.Index('ix_audio_status_created', 'STATUS', 'CREATED_ON'),   # drafted audio listing
+        db.Index('ix_audio_created_by', 'CREATED_BY'),
+    )
 
     def __repr__(self):
         return f'<AudioStory {self.NAME}>'
@@ -78,7 +152,13 @@ class Poem(db.Model):
     PRICE = db.Column(db.Numeric(10, 2))
     TAGS = db.Column(db.Text)  # Newly added column
 
-class Admin(db.Model):
+    __table_args__ = (
+        db.Index('ix_poem_status_updated', 'STATUS', 'UPDATED_ON'),
+        db.Index('ix_poem_writer_status_updated', 'WRITTEN_BY', 'STATUS', 'UPDATED_ON'),
+        db.Index('ix_poem_writer_updated', 'WRITTEN_BY', 'UPDATED_ON'),
+    )
+
+class Admin(PasswordMixin, db.Model):
     __tablename__ = 'tbl_admin'
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -92,13 +172,6 @@ class Admin(db.Model):
     created_on = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_on = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
-    # Password hashing
-    def set_password(self, password):
-        self.password = generate_password_hash(password)
-
-    def check_password(self, password):
-        return check_password_hash(self.password, password)
-
     # def to_dict(self):
     #     return {
     #         "id": self.id,
@@ -124,6 +197,11 @@ class HelpSupport(db.Model):
     # Relationship to fetch user data
     user = db.relationship('User', backref=db.backref('help_support_requests', lazy=True))
 
+    __table_args__ = (
+        db.Index('ix_help_support_created', 'created_on'),                   # default DataTables order
+        db.Index('ix_help_support_status_created', 'status', 'created_on'),  # status filter
+    )
+
 
     # def to_dict(self):
     #     """Convert DB record to dictionary for API response"""
@@ -137,3 +215,99 @@ class HelpSupport(db.Model):
     #         "updated_on": self.updated_on.strftime("%Y-%m-%d") if self.updated_on else None,
     #         "admin_note": self.admin_note
     #     }
+
+
+class ContentCounter(db.Model):
+    """Running row counts per content type and status, kept in step with the write paths.
+
+    USER_ID 0 holds the site-wide totals; any other value is the writer's own
+    totals. Rebuilt from the content tables by reconcile_counters.py.
+    VERSION only ever grows, so the sum over a content type's global rows
+    changes whenever its listings may have.
+    """
+    __tablename__ = 'tbl_content_counter'
+
+    USER_ID = db.Column(db.Integer, primary_key=True, autoincrement=False)  # 0 = global
+    CONTENT_TYPE = db.Column(db.String(20), primary_key=True)  # 'story', 'poem', 'audio', 'author'
+    STATUS = db.Column(db.String(20), primary_key=True)
+    COUNT = db.Column(db.Integer, nullable=False, default=0)
+    UPDATED_ON = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    VERSION = db.Column(db.Integer, default=0)  # bumped on every change; the global rows feed the listing ETags
+
+
+class SearchDocument(db.Model):
+    """One row per published story/poem/audio, flattened for full-text search.
+
+    Maintained by search.py; on MySQL the FULLTEXT index below serves
+    /api/search, elsewhere an in-process inverted index is built from it.
+    """
+    __tablename__ = 'tbl_search_document'
+
+    DOC_TYPE = db.Column(db.String(10), primary_key=True)   # 'story', 'poem', 'audio'
+    DOC_ID = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    LANGUAGE = db.Column(db.String(50))
+    NAME = db.Column(db.String(255))
+    TAGS = db.Column(db.Text)
+    BODY = db.Column(db.Text)
+    UPDATED_ON = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_search_language', 'LANGUAGE'),
+        db.Index('ix_search_fulltext', 'NAME', 'TAGS', 'BODY', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
+
+
+class Tag(db.Model):
+    """Normalised tag name (lower-case, single-spaced)."""
+    __tablename__ = 'tbl_tag'
+
+    TAG_ID = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    NAME = db.Column(db.String(100), nullable=False, unique=True)
+
+
+class ContentTag(db.Model):
+    """Links a tag to a published story, poem or audio row. Maintained by tags.py."""
+    __tablename__ = 'tbl_content_tag'
+
+    TAG_ID = db.Column(db.Integer, db.ForeignKey('tbl_tag.TAG_ID'), primary_key=True)
+    CONTENT_TYPE = db.Column(db.String(10), primary_key=True)  # 'story', 'poem', 'audio'
+    CONTENT_ID = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    __table_args__ = (
+        db.Index('ix_content_tag_content', 'CONTENT_TYPE', 'CONTENT_ID'),
+    )
+
+
+class StoredFile(db.Model):
+    """An uploaded file stored once per SHA-256 and extension, shared by every row that uses it."""
+    __tablename__ = 'tbl_stored_file'
+
+    SHA256 = db.Column(db.String(64), primary_key=True)
+    EXT = db.Column(db.String(10), primary_key=True, default='')  # kept so the URL carries the file type
+    SIZE = db.Column(db.BigInteger, nullable=False)
+    REF_COUNT = db.Column(db.Integer, nullable=False, default=0)  # Story/Poem/AudioStory rows using it
+    CREATED_ON = db.Column(db.DateTime, default=datetime.utcnow)
+    UPDATED_ON = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class Job(db.Model):
+    """A unit of background work, claimed and run by run_worker.py (see jobs.py)."""
+    __tablename__ = 'tbl_job'
+
+    JOB_ID = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    TASK = db.Column(db.String(64), nullable=False)                 # name registered with jobs.task()
+    PAYLOAD = db.Column(db.Text)                                    # JSON keyword arguments
+    IDEMPOTENCY_KEY = db.Column(db.String(191), unique=True, nullable=True)
+    STATUS = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    ATTEMPTS = db.Column(db.Integer, nullable=False, default=0)
+    MAX_ATTEMPTS = db.Column(db.Integer, nullable=False, default=5)
+    RUN_AT = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # not before; pushed back on retry
+    LOCKED_BY = db.Column(db.String(64))
+    LOCKED_AT = db.Column(db.DateTime)
+    LAST_ERROR = db.Column(db.Text)
+    CREATED_ON = db.Column(db.DateTime, default=datetime.utcnow)
+    UPDATED_ON = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_job_status_run_at', 'STATUS', 'RUN_AT'),   # worker polling
+    )
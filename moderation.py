@@ -0,0 +1,133 @@
+from datetime import datetime
+from models import User, Story, Poem, AudioStory
+from counters import move_counters, counts_as_author, bump_counter
+from search import sync_search_many
+from tags import sync_tags_many
+from jobs import enqueue
+from principals import invalidate_on_commit
+
+MAX_BULK_IDS = 500
+
+# content type -> (model, id column, owner column)
+CONTENT_MODELS = {
+    'story': (Story, Story.STORY_ID, Story.WRITTEN_BY),
+    'poem': (Poem, Poem.STORY_ID, Poem.WRITTEN_BY),
+    'audio': (AudioStory, AudioStory.AUDIO_ID, AudioStory.CREATED_BY),
+}
+
+# content type -> action -> (statuses it may start from, status it sets); None means "any
+# other status", as the single-item audio routes allow
+TRANSITIONS = {
+    'story': {'approve': (('pending',), 'published'), 'reject': (('published',), 'pending')},
+    'poem': {'approve': (('pending',), 'published'), 'reject': (('published',), 'pending')},
+    'audio': {'approve': (None, 'published'), 'reject': (None, 'rejected')},
+}
+
+# user action -> (column, value)
+USER_ACTIONS = {
+    'approve': ('is_approved', True),
+    'reject': ('is_approved', False),
+    'activate': ('is_active', True),
+    'deactivate': ('is_active', False),
+}
+
+
+class ModerationError(ValueError):
+    """The request itself is invalid (unknown type or action, bad ids); nothing was changed."""
+
+
+def parse_ids(ids):
+    """Unique positive int ids in request order."""
+    if not isinstance(ids, list) or not ids:
+        raise ModerationError("'ids' must be a non-empty list")
+    if len(ids) > MAX_BULK_IDS:
+        raise ModerationError(f"At most {MAX_BULK_IDS} ids per request")
+    try:
+        parsed = [int(i) for i in ids]
+    except (TypeError, ValueError):
+        raise ModerationError("'ids' must be integers")
+    return list(dict.fromkeys(i for i in parsed if i > 0))
+
+
+def moderate_content(content_type, action, ids, price=None):
+    """Apply `action` to every eligible id with one UPDATE; returns per-id results.
+
+    The rows are read (and locked) in one query to validate the transition,
+    then updated together; counters, the search and tag indexes and the
+    caches follow in the same transaction. The caller commits.
+    """
+    if content_type not in TRANSITIONS:
+        raise ModerationError(f"Invalid type: {content_type}")
+    if action not in TRANSITIONS[content_type]:
+        raise ModerationError(f"Invalid action for {content_type}: {action}")
+    model, id_col, owner_col = CONTENT_MODELS[content_type]
+    from_statuses, to_status = TRANSITIONS[content_type][action]
+    ids = parse_ids(ids)
+
+    rows = {getattr(row, id_col.key): row
+            for row in model.query.filter(id_col.in_(ids)).with_for_update().all()}
+    results, eligible = [], []
+    for item_id in ids:
+        row = rows.get(item_id)
+        if row is None:
+            results.append({'id': item_id, 'result': 'not_found'})
+        elif row.STATUS == to_status or (from_statuses is not None and row.STATUS not in from_statuses):
+            results.append({'id': item_id, 'result': 'skipped', 'status': row.STATUS,
+                            'message': f"Can't {action} a {row.STATUS} {content_type}"})
+        else:
+            results.append({'id': item_id, 'result': 'updated', 'from': row.STATUS, 'status': to_status})
+            eligible.append(row)
+    if not eligible:
+        return results
+
+    transitions = [(getattr(row, owner_col.key), row.STATUS, to_status) for row in eligible]
+    # UPDATED_ON is set the same way the single-item approve/reject routes set it, and explicitly
+    # so the index sync below sees the new value
+    values = {model.STATUS: to_status, model.UPDATED_ON: datetime.utcnow()}
+    if price is not None and action == 'approve' and content_type != 'audio':
+        values[model.PRICE] = price
+    # Re-checking the old status keeps the UPDATE honest even without row locks (SQLite);
+    # 'evaluate' applies the new values to the loaded rows for the index sync below
+    model.query.filter(id_col.in_([getattr(row, id_col.key) for row in eligible]),
+                       model.STATUS.in_({status for _, status, _ in transitions})) \
+               .update(values, synchronize_session='evaluate')
+
+    move_counters(content_type, transitions)
+    sync_search_many(content_type, eligible)
+    sync_tags_many(content_type, eligible)
+    if content_type == 'audio' and to_status == 'published':
+        for row in eligible:
+            if row.AUDIO_URL and row.BYTE_SIZE is None:
+                enqueue('audio.probe_meta', {'audio_id': row.AUDIO_ID}, key=f'audio-meta:{row.AUDIO_ID}')
+    return results
+
+
+def moderate_users(action, ids):
+    """Approve/reject or activate/deactivate users with one UPDATE; returns per-id results."""
+    if action not in USER_ACTIONS:
+        raise ModerationError(f"Invalid action for user: {action}")
+    column, value = USER_ACTIONS[action]
+    ids = parse_ids(ids)
+
+    users = {user.id: user for user in User.query.filter(User.id.in_(ids)).with_for_update().all()}
+    results, changed = [], []
+    for user_id in ids:
+        user = users.get(user_id)
+        if user is None:
+            results.append({'id': user_id, 'result': 'not_found'})
+        elif getattr(user, column) == value:
+            results.append({'id': user_id, 'result': 'skipped', column: value})
+        else:
+            results.append({'id': user_id, 'result': 'updated', column: value})
+            changed.append(user)
+    if not changed:
+        return results
+
+    was_author = {user.id: counts_as_author(user) for user in changed}
+    User.query.filter(User.id.in_([user.id for user in changed])) \
+              .update({getattr(User, column): value}, synchronize_session='evaluate')
+    authors_delta = sum(counts_as_author(user) - was_author[user.id] for user in changed)
+    if authors_delta:
+        bump_counter('author', 'active', None, authors_delta)
+    invalidate_on_commit(User, [user.id for user in changed])
+    return results
@@ -0,0 +1,104 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when every hashing slot stays taken for PASSWORD_HASH_TIMEOUT seconds."""
+
+
+def hash_method_prefix(hashed):
+    """The parameters part of a werkzeug hash ('scrypt:32768:8:1', 'pbkdf2:sha256:1000000')."""
+    return hashed.split('$', 1)[0] if hashed else ''
+
+
+def pool_context():
+    """multiprocessing context for the app's process pools (password hashing, the audio backfill)."""
+    # Never fork: the hashing pool starts lazily inside a request, and forking a threaded server while
+    # another thread holds a lock (logging, the DB pool, malloc) can deadlock the child.
+    # forkserver/spawn children re-import the launching script, so scripts keep a __main__ guard.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class PasswordHasher:
+    """Password hashing with a configurable scheme, run in a small process pool.
+
+    PASSWORD_HASH_METHOD is any werkzeug method string ('scrypt',
+    'pbkdf2:sha256:600000', ...). With PASSWORD_HASH_WORKERS > 0 hashing and
+    verification run in that many worker processes, so a burst of logins
+    doesn't hold the GIL in the request threads; at most PASSWORD_HASH_QUEUE
+    of them wait or run at once and further callers get PasswordHasherBusy
+    after PASSWORD_HASH_TIMEOUT seconds. With 0 workers (the default when
+    no app is configured, e.g. in scripts) everything runs inline.
+    """
+
+    def __init__(self):
+        self.method = 'scrypt'
+        self.workers = 0
+        self.timeout = 10.0
+        self.slots = None
+        self.pool = None
+        self.pool_pid = None
+        self.lock = threading.Lock()
+        self.target_prefix = None
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', self.method)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        queue = app.config.get('PASSWORD_HASH_QUEUE', 4 * max(self.workers, 1))
+        self.slots = threading.BoundedSemaphore(queue) if self.workers else None
+        # Hash once to learn the full parameter string the method expands to, and fail fast on a typo
+        self.target_prefix = hash_method_prefix(generate_password_hash('', self.method))
+
+    def _pool(self):
+        # Pools don't survive fork, so each (gunicorn) worker process starts its own on first use
+        with self.lock:
+            if self.pool is None or self.pool_pid != os.getpid():
+                self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context())
+                self.pool_pid = os.getpid()
+            return self.pool
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PasswordHasherBusy('All password hashing slots are busy')
+        try:
+            pool = self._pool()
+            try:
+                return pool.submit(fn, *args).result(timeout=self.timeout)
+            except FutureTimeout:
+                raise PasswordHasherBusy('Password hashing timed out')
+            except BrokenProcessPool:
+                logger.exception('Password hashing pool broke; restarting it')
+                with self.lock:
+                    if self.pool is pool:
+                        self.pool = None
+                return fn(*args)
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, hashed, password):
+        if not hashed:
+            return False
+        return self._run(check_password_hash, hashed, password)
+
+    def needs_rehash(self, hashed):
+        """True when `hashed` was made with a different method or cost than configured."""
+        if self.target_prefix is None:
+            self.target_prefix = hash_method_prefix(generate_password_hash('', self.method))
+        return hash_method_prefix(hashed) != self.target_prefix
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, User, Admin
+
+# What authorization checks read; attribute names match the models so either can be passed around
+UserPrincipal = namedtuple('UserPrincipal', 'id role is_active is_approved')
+AdminPrincipal = namedtuple('AdminPrincipal', 'id role status')
+
+PRINCIPAL_MODELS = {
+    User: (UserPrincipal, (User.id, User.role, User.is_active, User.is_approved)),
+    Admin: (AdminPrincipal, (Admin.id, Admin.role, Admin.status)),
+}
+
+
+class PrincipalCache:
+    """Short-TTL cache of the user/admin fields authorization checks need.
+
+    Keyed by (model, id); unknown ids are cached too, so a polling client
+    with a stale id doesn't hit the DB either. Entries are dropped as soon
+    as a transaction that flushed a change to that User or Admin commits
+    (status, approval, role and password changes all go through the ORM),
+    and the TTL bounds how stale other worker processes can get.
+    """
+
+    def __init__(self, max_entries=10000, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # (model, id) -> (expires_at, principal or None)
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self.generation = 0  # bumped by every invalidation
+
+    def init_app(self, app):
+        self.max_entries = app.config.get('PRINCIPAL_CACHE_MAX_ENTRIES', self.max_entries)
+        self.ttl = app.config.get('PRINCIPAL_CACHE_TTL', self.ttl)
+
+    def _get(self, model, principal_id):
+        try:
+            principal_id = int(principal_id)  # ids from JSON bodies may be strings
+        except (TypeError, ValueError):
+            return None
+        if not principal_id:
+            return None
+        key = (model, principal_id)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[1]
+            self.stats['misses'] += 1
+            generation = self.generation
+
+        principal_class, columns = PRINCIPAL_MODELS[model]
+        row = db.session.query(*columns).filter(columns[0] == principal_id).first()
+        principal = principal_class(*row) if row else None
+        with self.lock:
+            # Don't store a row read before an invalidation that landed while the query ran
+            if self.ttl > 0 and generation == self.generation:
+                self.entries[key] = (time.monotonic() + self.ttl, principal)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return principal
+
+    def user(self, user_id):
+        """UserPrincipal for `user_id`, or None when there's no such user."""
+        return self._get(User, user_id)
+
+    def admin(self, admin_id):
+        """AdminPrincipal for `admin_id`, or None when there's no such admin."""
+        return self._get(Admin, admin_id)
+
+    def invalidate(self, keys):
+        with self.lock:
+            self.generation += 1
+            for key in keys:
+                if self.entries.pop(key, None) is not None:
+                    self.stats['invalidations'] += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats, entries=len(self.entries), ttl=self.ttl)
+
+
+principal_cache = PrincipalCache()
+
+
+def _keys_for(session):
+    return session.info.setdefault('principal_keys', set())
+
+
+def invalidate_on_commit(model, ids):
+    """For bulk UPDATEs of User/Admin, which the flush hook can't see: drop `ids` when the session commits."""
+    _keys_for(db.session).update((model, int(i)) for i in ids)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        model = type(obj)
+        if model in PRINCIPAL_MODELS and obj.id is not None:
+            _keys_for(session).add((model, obj.id))
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    keys = session.info.pop('principal_keys', None)
+    if keys:
+        principal_cache.invalidate(keys)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_uncommitted(session, previous_transaction):
+    # Savepoint rollbacks (begin_nested) keep the outer transaction's changes
+    if previous_transaction.parent is None:
+        session.info.pop('principal_keys', None)
@@ -0,0 +1,135 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, request, has_request_context, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('profiler')
+
+SQL_LOG_CHARS = 300
+
+
+class NPlusOneError(RuntimeError):
+    """Raised in strict mode when a request repeats one statement past the threshold."""
+
+
+def _profile():
+    return g.get('_query_profile') if has_request_context() else None
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _profile() is not None:
+        conn.info.setdefault('profile_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'handle_error')
+def _discard_failed_start(context):
+    # A statement that raised never reaches after_cursor_execute; don't leave its start time behind
+    if context.connection is not None:
+        context.connection.info.pop('profile_started', None)
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile()
+    started = conn.info.get('profile_started')
+    if profile is None or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    profile['queries'] += 1
+    profile['db'] += elapsed
+    if elapsed > profile['slowest'][0]:
+        profile['slowest'] = (elapsed, statement)
+
+    # Statements are parameterized, so a loop issuing one query per row repeats the same text
+    profile['statements'][statement] += 1
+    count = profile['statements'][statement]
+    if count == profile['threshold'] + 1:
+        profile['repeated'].append(statement)
+        if profile['strict']:
+            raise NPlusOneError(f'Statement ran more than {profile["threshold"]} times in one request '
+                                f'(likely N+1): {statement[:SQL_LOG_CHARS]}')
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to this request's `phase` total (e.g. 'serialize')."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile = _profile()
+        if profile is not None:
+            profile['phases'][phase] = profile['phases'].get(phase, 0.0) + time.perf_counter() - started
+
+
+class QueryProfiler:
+    """Per-request query count, DB time, serialization time and slowest statement.
+
+    Reported in a Server-Timing header and one JSON log line per request on
+    the 'profiler' logger, when PROFILER_ENABLED is set. Requests repeating a statement more than
+    N_PLUS_ONE_THRESHOLD times are logged as warnings, or fail with
+    NPlusOneError when PROFILER_STRICT is set (meant for tests).
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('PROFILER_ENABLED', False):
+            return
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def _start(self):
+        g._query_profile = {
+            'started': time.perf_counter(),
+            'queries': 0,
+            'db': 0.0,
+            'slowest': (0.0, None),
+            'statements': Counter(),
+            'repeated': [],
+            'phases': {},
+            'threshold': current_app.config.get('N_PLUS_ONE_THRESHOLD', 10),
+            'strict': current_app.config.get('PROFILER_STRICT', False),
+        }
+
+    def _finish(self, response):
+        profile = g.pop('_query_profile', None)
+        if profile is None:
+            return response
+        total = time.perf_counter() - profile['started']
+        serialize = profile['phases'].get('serialize', 0.0)
+
+        timings = [f'db;dur={profile["db"] * 1000:.2f};desc="{profile["queries"]} queries"',
+                   f'serialize;dur={serialize * 1000:.2f}',
+                   f'total;dur={total * 1000:.2f}']
+        response.headers.add('Server-Timing', ', '.join(timings))
+
+        slowest_time, slowest_sql = profile['slowest']
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(total * 1000, 2),
+            'queries': profile['queries'],
+            'db_ms': round(profile['db'] * 1000, 2),
+            'serialize_ms': round(serialize * 1000, 2),
+            'slowest_ms': round(slowest_time * 1000, 2),
+            'slowest_sql': slowest_sql[:SQL_LOG_CHARS] if slowest_sql else None,
+        }
+        if profile['repeated']:
+            record['n_plus_one'] = [{'sql': sql[:SQL_LOG_CHARS], 'count': profile['statements'][sql]}
+                                    for sql in profile['repeated']]
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+        return response
+
+
+query_profiler = QueryProfiler()
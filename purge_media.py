@@ -0,0 +1,8 @@
+from app import app
+from storage import purge_unreferenced_files
+
+# Remove stored uploads that no story, poem or audio row references any more.
+if __name__ == '__main__':
+    with app.app_context():
+        removed = purge_unreferenced_files()
+        print("Unreferenced media files removed:", removed)
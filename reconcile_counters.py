@@ -0,0 +1,17 @@
+import sys
+import time
+from app import app
+from counters import reconcile_counters
+
+# Usage: python reconcile_counters.py [interval_seconds]
+# Without an interval it reconciles once (suitable for cron); with one it loops.
+if __name__ == '__main__':
+    INTERVAL = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+
+    with app.app_context():
+        while True:
+            rows = reconcile_counters()
+            print("Counters reconciled:", rows, "rows")
+            if not INTERVAL:
+                break
+            time.sleep(INTERVAL)
@@ -0,0 +1,8 @@
+from app import app
+from search import reindex_search
+
+# Rebuild the search index from all published stories, poems and audio.
+if __name__ == '__main__':
+    with app.app_context():
+        total = reindex_search()
+        print("Search index rebuilt:", total, "documents")
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import g, request, make_response, current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import User, Story, Poem, AudioStory, ContentCounter
+
+# Which cached groups a committed change to each model can affect
+MODEL_TAGS = {
+    Story: ('story', 'audio', 'author'),      # audio shows linked story names
+    Poem: ('poem', 'audio', 'author'),
+    AudioStory: ('audio', 'author'),
+    User: ('author',),
+    ContentCounter: ('author',),              # author counts and /api/author-stats
+}
+
+
+class ResponseCache:
+    """Thread-safe in-process LRU of rendered responses with a TTL.
+
+    Entries are grouped by tag and dropped as soon as a transaction that
+    touched one of their models commits; the TTL only bounds how stale other
+    worker processes can get. Every invalidation bumps `generation`, so a
+    response rendered from data read before one isn't stored after it.
+    """
+
+    def __init__(self, max_entries=512, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (expires_at, tags, body, status, mimetype)
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+        self.generation = 0  # bumped by every invalidation
+
+    def init_app(self, app):
+        self.max_entries = app.config.get('RESPONSE_CACHE_MAX_ENTRIES', self.max_entries)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', self.ttl)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry
+
+    def set(self, key, tags, body, status, mimetype, generation=None):
+        """Store a response; skipped when `generation` (read before rendering) is no longer current."""
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries[key] = (time.monotonic() + self.ttl, frozenset(tags), body, status, mimetype)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, tags):
+        tags = set(tags)
+        with self.lock:
+            self.generation += 1
+            stale = [key for key, entry in self.entries.items() if entry[1] & tags]
+            for key in stale:
+                del self.entries[key]
+            self.stats['invalidations'] += len(stale)
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+    def snapshot(self):
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(self.stats, entries=len(self.entries), max_entries=self.max_entries, ttl=self.ttl,
+                        hit_ratio=round(self.stats['hits'] / lookups, 4) if lookups else None)
+
+
+response_cache = ResponseCache()
+
+
+def cached(*tags):
+    """Serve a GET view from response_cache, keyed by endpoint, query args and validator.
+
+    Only 200 responses are stored. Stack it under @conditional so 304s are
+    still answered first; the ETag it computed from the DB is part of the
+    key, so a body is only ever served under the ETag of the data it was
+    rendered from, even in a process that missed an invalidation.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if current_app.config.get('RESPONSE_CACHE_DISABLED'):
+                return view(*args, **kwargs)
+
+            key = (request.endpoint, tuple(sorted(kwargs.items())),
+                   tuple(sorted(request.args.items(multi=True))), g.get('validator_etag'))
+            entry = response_cache.get(key)
+            if entry is not None:
+                return current_app.response_class(entry[2], status=entry[3], mimetype=entry[4])
+
+            generation = response_cache.generation
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                response_cache.set(key, tags, response.get_data(), response.status_code, response.mimetype,
+                                   generation=generation)
+            return response
+        return wrapped
+    return decorator
+
+
+def _tags_for(session):
+    return session.info.setdefault('cache_tags', set())
+
+
+def _note_model(session, model):
+    for cls in getattr(model, '__mro__', ()):
+        if cls in MODEL_TAGS:
+            _tags_for(session).update(MODEL_TAGS[cls])
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        _note_model(session, type(obj))
+
+
+@event.listens_for(Session, 'after_bulk_update')
+def _collect_bulk_update(update_context):
+    _note_model(update_context.session, update_context.mapper.class_)
+
+
+@event.listens_for(Session, 'after_bulk_delete')
+def _collect_bulk_delete(delete_context):
+    _note_model(delete_context.session, delete_context.mapper.class_)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    tags = session.info.pop('cache_tags', None)
+    if tags:
+        response_cache.invalidate(tags)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_uncommitted(session, previous_transaction):
+    # Savepoint rollbacks (begin_nested) keep the outer transaction's changes
+    if previous_transaction.parent is None:
+        session.info.pop('cache_tags', None)
@@ -0,0 +1,21 @@
+import signal
+import sys
+import threading
+from app import app
+from jobs import run_worker
+
+# Usage: python run_worker.py [threads] [--once]
+# Runs queued background jobs (tbl_job). Start as many copies as needed;
+# claims are atomic so workers never run the same job twice. --once drains
+# the due jobs and exits, e.g. from cron.
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if a != '--once']
+    THREADS = int(args[0]) if args else 2
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    print("Job worker started with", THREADS, "thread(s)")
+    run_worker(app, threads=THREADS, once='--once' in sys.argv, stop=stop)
+    print("Job worker stopped")
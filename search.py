@@ -0,0 +1,237 @@
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+from models import db, SearchDocument, Story, Poem, AudioStory
+
+SEARCH_TYPES = ('story', 'poem', 'audio')
+
+# Word characters plus the Devanagari and Bengali blocks, so vowel signs
+# don't split Hindi/Bengali words apart
+TOKEN_RE = re.compile(r"[\w\u0900-\u097F\u0980-\u09FF]+")
+
+# Title matches count more than tag matches, which count more than body text
+FIELD_WEIGHTS = {'NAME': 3.0, 'TAGS': 2.0, 'BODY': 1.0}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def document_fields(doc_type, item):
+    """Flatten a Story/Poem/AudioStory into SearchDocument columns."""
+    return {
+        'LANGUAGE': item.LANGUAGE,
+        'NAME': item.NAME,
+        'TAGS': item.TAGS,
+        'BODY': getattr(item, 'STORY', None) if doc_type != 'audio' else None,
+        # New rows get their default on flush, so they haven't got a value yet
+        'UPDATED_ON': item.UPDATED_ON if isinstance(item.UPDATED_ON, datetime) else datetime.utcnow(),
+    }
+
+
+class InvertedIndex:
+    """In-process BM25 index over SearchDocument rows, used where MySQL FULLTEXT isn't available."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.loaded = False
+        self.postings = defaultdict(dict)   # token -> {(type, id): weighted term frequency}
+        self.docs = {}                      # (type, id) -> (language key, length, tokens, result fields)
+        self.total_length = 0.0
+
+    def _add(self, key, fields):
+        self._remove(key)
+        weights = defaultdict(float)
+        for column, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(fields.get(column)):
+                weights[token] += weight
+        length = sum(weights.values())
+        for token, tf in weights.items():
+            self.postings[token][key] = tf
+        result = {'type': key[0], 'id': key[1], 'language': fields.get('LANGUAGE'),
+                  'name': fields.get('NAME'), 'tags': fields.get('TAGS'),
+                  'updated_on': fields.get('UPDATED_ON')}
+        self.docs[key] = ((fields.get('LANGUAGE') or '').lower(), length, tuple(weights), result)
+        self.total_length += length
+
+    def _remove(self, key):
+        doc = self.docs.pop(key, None)
+        if doc is None:
+            return
+        self.total_length -= doc[1]
+        for token in doc[2]:
+            postings = self.postings[token]
+            postings.pop(key, None)
+            if not postings:
+                del self.postings[token]
+
+    def load(self):
+        """Build the index from tbl_search_document on first use."""
+        with self.lock:
+            if self.loaded:
+                return
+            for row in SearchDocument.query.yield_per(1000):
+                self._add((row.DOC_TYPE, row.DOC_ID), {
+                    'LANGUAGE': row.LANGUAGE, 'NAME': row.NAME, 'TAGS': row.TAGS,
+                    'BODY': row.BODY, 'UPDATED_ON': row.UPDATED_ON,
+                })
+            self.loaded = True
+
+    def apply(self, changes):
+        with self.lock:
+            if not self.loaded:
+                return  # picked up from the table when first loaded
+            for action, key, fields in changes:
+                if action == 'add':
+                    self._add(key, fields)
+                else:
+                    self._remove(key)
+
+    def search(self, query, types, language, limit):
+        self.load()
+        tokens = set(tokenize(query))
+        with self.lock:
+            n_docs = len(self.docs)
+            if not n_docs or not tokens:
+                return []
+            avg_length = self.total_length / n_docs or 1.0
+            scores = defaultdict(float)
+            for token in tokens:
+                postings = self.postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, tf in postings.items():
+                    doc = self.docs[key]
+                    if key[0] not in types or (language and doc[0] != language):
+                        continue
+                    scores[key] += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * doc[1] / avg_length))
+
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+            return [dict(self.docs[key][3], score=round(score, 4)) for key, score in ranked]
+
+
+memory_index = InvertedIndex()
+
+
+def _stage(change):
+    db.session.info.setdefault('search_changes', []).append(change)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_staged_changes(session):
+    changes = session.info.pop('search_changes', None)
+    if changes:
+        memory_index.apply(changes)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_staged_changes(session, previous_transaction):
+    # Savepoint rollbacks (begin_nested) keep the outer transaction's changes
+    if previous_transaction.parent is None:
+        session.info.pop('search_changes', None)
+
+
+def sync_search(doc_type, item):
+    """Index `item` if it's published, otherwise drop it from the index.
+
+    Call from the write handlers before commit; the row change is part of the
+    caller's transaction and the in-process index follows after commit.
+    """
+    if item.STATUS != 'published':
+        remove_from_search(doc_type, _item_id(item))
+        return
+
+    db.session.flush()  # make sure new rows have their id
+    key = (doc_type, _item_id(item))
+    fields = document_fields(doc_type, item)
+    db.session.merge(SearchDocument(DOC_TYPE=doc_type, DOC_ID=key[1], **fields))
+    _stage(('add', key, fields))
+
+
+def remove_from_search(doc_type, doc_id):
+    if doc_id is None:
+        return
+    SearchDocument.query.filter_by(DOC_TYPE=doc_type, DOC_ID=doc_id).delete(synchronize_session=False)
+    _stage(('remove', (doc_type, doc_id), None))
+
+
+def sync_search_many(doc_type, items):
+    """sync_search() for a batch: one DELETE for the lot, then one INSERT of the published ones."""
+    items = list(items)
+    if not items:
+        return
+    db.session.flush()
+    remove_many_from_search(doc_type, [_item_id(item) for item in items])
+    documents = []
+    for item in items:
+        if item.STATUS == 'published':
+            key = (doc_type, _item_id(item))
+            fields = document_fields(doc_type, item)
+            documents.append(SearchDocument(DOC_TYPE=doc_type, DOC_ID=key[1], **fields))
+            _stage(('add', key, fields))
+    db.session.add_all(documents)
+
+
+def remove_many_from_search(doc_type, doc_ids):
+    doc_ids = [doc_id for doc_id in doc_ids if doc_id is not None]
+    if not doc_ids:
+        return
+    SearchDocument.query.filter(SearchDocument.DOC_TYPE == doc_type, SearchDocument.DOC_ID.in_(doc_ids)) \
+                        .delete(synchronize_session=False)
+    for doc_id in doc_ids:
+        _stage(('remove', (doc_type, doc_id), None))
+
+
+def _item_id(item):
+    return item.AUDIO_ID if isinstance(item, AudioStory) else item.STORY_ID
+
+
+def search_documents(query, types=SEARCH_TYPES, language=None, limit=20):
+    """Ranked matches for `query`, as a list of result dicts."""
+    language = (language or '').lower() or None
+    if db.engine.dialect.name != 'mysql':
+        return memory_index.search(query, set(types), language, limit)
+
+    score = match(SearchDocument.NAME, SearchDocument.TAGS, SearchDocument.BODY,
+                  against=query).in_natural_language_mode()
+    rows = db.session.query(SearchDocument.DOC_TYPE, SearchDocument.DOC_ID, SearchDocument.LANGUAGE,
+                            SearchDocument.NAME, SearchDocument.TAGS, SearchDocument.UPDATED_ON,
+                            score.label('score')) \
+                     .filter(score > 0, SearchDocument.DOC_TYPE.in_(types))
+    if language:
+        rows = rows.filter(SearchDocument.LANGUAGE == language)
+    rows = rows.order_by(score.desc()).limit(limit).all()
+    return [dict(type=r.DOC_TYPE, id=r.DOC_ID, language=r.LANGUAGE, name=r.NAME, tags=r.TAGS,
+                 updated_on=r.UPDATED_ON, score=round(float(r.score), 4)) for r in rows]
+
+
+def reindex_search():
+    """Rebuild tbl_search_document from every published story, poem and audio."""
+    SearchDocument.query.delete(synchronize_session=False)
+    total = 0
+    with db.session.no_autoflush:
+        for doc_type, model, id_col in (('story', Story, Story.STORY_ID),
+                                        ('poem', Poem, Poem.STORY_ID),
+                                        ('audio', AudioStory, AudioStory.AUDIO_ID)):
+            for item in model.query.filter_by(STATUS='published').order_by(id_col).yield_per(1000):
+                db.session.add(SearchDocument(DOC_TYPE=doc_type, DOC_ID=_item_id(item),
+                                              **document_fields(doc_type, item)))
+                total += 1
+    db.session.commit()
+    with memory_index.lock:
+        memory_index.reset()
+    return total
@@ -0,0 +1,214 @@
+import hashlib
+import os
+import re
+import mimetypes
+import tempfile
+import time
+from flask import current_app, send_from_directory
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from werkzeug.exceptions import RequestEntityTooLarge, NotFound
+from werkzeug.security import safe_join
+from werkzeug.utils import secure_filename
+from models import db, StoredFile
+from jobs import task
+
+CHUNK_SIZE = 64 * 1024
+MEDIA_URL_PREFIX = '/media/'
+# Links written before the /media route existed; still served by /static
+LEGACY_MEDIA_URL_PREFIX = '/static/media/'
+MEDIA_NAME_RE = re.compile(r'^([0-9a-f]{64})(\.[a-z0-9]{1,9})?$')
+UPLOAD_TEMP_PREFIX = '.upload-'
+STALE_UPLOAD_SECONDS = 24 * 3600  # temp files older than this belong to a crashed process
+
+
+def media_root():
+    return current_app.config['MEDIA_FOLDER']
+
+
+def media_path(sha256, ext):
+    # Two-level fan-out keeps directories small
+    return os.path.join(media_root(), sha256[:2], sha256 + ext)
+
+
+def media_url(stored):
+    return f'{MEDIA_URL_PREFIX}{stored.SHA256[:2]}/{stored.SHA256}{stored.EXT}'
+
+
+def parse_media_url(url):
+    """Return the (SHA-256, extension) key behind a media_url(), or None for any other link."""
+    if not url or not url.startswith((MEDIA_URL_PREFIX, LEGACY_MEDIA_URL_PREFIX)):
+        return None
+    match = MEDIA_NAME_RE.match(url.rsplit('/', 1)[-1])
+    return (match.group(1), match.group(2) or '') if match else None
+
+
+def resolve_media_path(url):
+    """Local path of a file linked as /media/..., /static/media/... or /static/... (e.g. legacy
+    /static/audio uploads), or None for links that don't point at local files."""
+    key = parse_media_url(url)
+    if key:
+        return media_path(*key)
+    if url and url.startswith('/static/'):
+        return safe_join(current_app.static_folder, url[len('/static/'):])
+    return None
+
+
+def _file_ext(filename):
+    name = secure_filename(filename or '')
+    return os.path.splitext(name)[1].lower()[:10]
+
+
+def store_upload(file_storage):
+    """Stream an uploaded file to disk in chunks, hashing as it goes, and take a reference.
+
+    Identical content (with the same extension) is kept once: a second
+    upload only bumps REF_COUNT. Raises RequestEntityTooLarge past
+    MAX_UPLOAD_BYTES. The reference is part of the caller's transaction, so
+    commit alongside the row that uses the returned StoredFile: the file is
+    only moved into place once that transaction commits, and is deleted if
+    it rolls back.
+    """
+    max_bytes = current_app.config['MAX_UPLOAD_BYTES']
+    os.makedirs(media_root(), exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+
+    fd, tmp_path = tempfile.mkstemp(dir=media_root(), prefix=UPLOAD_TEMP_PREFIX)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = file_storage.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise RequestEntityTooLarge(f'Upload exceeds {max_bytes} bytes.')
+                digest.update(chunk)
+                out.write(chunk)
+
+        sha256 = digest.hexdigest()
+        # Taking the reference first waits out a concurrent purge of the same file
+        stored = acquire(sha256, _file_ext(file_storage.filename), size)
+        db.session.info.setdefault('media_moves', []).append((tmp_path, media_path(sha256, stored.EXT)))
+        return stored
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+@event.listens_for(Session, 'after_commit')
+def _move_staged_uploads(session):
+    for tmp_path, final_path in session.info.pop('media_moves', ()):
+        if os.path.exists(final_path):
+            _remove(tmp_path)  # duplicate content
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(tmp_path, final_path)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _discard_staged_uploads(session, transaction):
+    # Anything still staged when the outermost transaction ends was rolled back
+    # (or the session closed without committing): its StoredFile row is gone too
+    if transaction.parent is None:
+        for tmp_path, _ in session.info.pop('media_moves', ()):
+            _remove(tmp_path)
+
+
+def acquire(sha256, ext='', size=0):
+    """Add one reference to a stored file, creating its row on first use."""
+    key = dict(SHA256=sha256, EXT=ext)
+    updated = StoredFile.query.filter_by(**key) \
+                        .update({StoredFile.REF_COUNT: StoredFile.REF_COUNT + 1}, synchronize_session=False)
+    if not updated:
+        try:
+            with db.session.begin_nested():
+                db.session.add(StoredFile(SIZE=size, REF_COUNT=1, **key))
+        except IntegrityError:
+            StoredFile.query.filter_by(**key) \
+                      .update({StoredFile.REF_COUNT: StoredFile.REF_COUNT + 1}, synchronize_session=False)
+    return db.session.get(StoredFile, (sha256, ext), populate_existing=True)
+
+
+def release_media_url(url):
+    """Drop one reference held by a PDF_URL/AUDIO_URL; files at zero are removed by purge."""
+    key = parse_media_url(url)
+    if key:
+        StoredFile.query.filter(StoredFile.SHA256 == key[0], StoredFile.EXT == key[1],
+                                StoredFile.REF_COUNT > 0) \
+                  .update({StoredFile.REF_COUNT: StoredFile.REF_COUNT - 1}, synchronize_session=False)
+
+
+def swap_media_url(old_url, new_url):
+    """Move a row's reference when an edit changes its file link."""
+    if old_url == new_url:
+        return
+    release_media_url(old_url)
+    key = parse_media_url(new_url)
+    if key and db.session.get(StoredFile, key):
+        acquire(*key)
+
+
+@task('media.purge')
+def purge_unreferenced_files():
+    """Delete stored files no row references any more. Returns the number removed.
+
+    The rows stay locked until the files are gone, so an upload of the same
+    content waits and then recreates both. Upload temp files left behind by
+    a crashed process are swept as well.
+    """
+    orphans = StoredFile.query.filter(StoredFile.REF_COUNT <= 0).with_for_update().all()
+    for stored in orphans:
+        path = media_path(stored.SHA256, stored.EXT)
+        if os.path.exists(path):
+            os.remove(path)
+        db.session.delete(stored)
+    db.session.commit()
+
+    if os.path.isdir(media_root()):
+        cutoff = time.time() - STALE_UPLOAD_SECONDS
+        with os.scandir(media_root()) as entries:
+            for entry in entries:
+                if entry.name.startswith(UPLOAD_TEMP_PREFIX) and entry.stat().st_mtime < cutoff:
+                    _remove(entry.path)
+    return len(orphans)
+
+
+def send_media(folder, filename, immutable, accel_prefix=None):
+    """Serve a media file with Range/206, ETag and cache headers.
+
+    With an `accel_prefix` (the nginx internal location mapped to `folder`)
+    nginx is told to send the file itself (X-Accel-Redirect); otherwise werkzeug's send_file answers Range
+    requests and hands the file to wsgi.file_wrapper, which gunicorn serves
+    with sendfile(). USE_X_SENDFILE is honoured by send_file as well.
+    `immutable` marks content-addressed files, whose name is their hash.
+    """
+    path = safe_join(folder, filename)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+
+    max_age = current_app.config['MEDIA_MAX_AGE'] if immutable else 3600
+    if accel_prefix:
+        response = current_app.response_class(mimetype=mimetypes.guess_type(filename)[0]
+                                              or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{filename}"
+    else:
+        etag = os.path.splitext(os.path.basename(filename))[0] if immutable else True
+        response = send_from_directory(folder, filename, conditional=True, etag=etag, max_age=max_age)
+
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if immutable:
+        response.cache_control.immutable = True
+    return response
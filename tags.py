@@ -0,0 +1,132 @@
+import re
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from models import db, Tag, ContentTag, Story, Poem, AudioStory
+
+TAG_TYPES = ('story', 'poem', 'audio')
+MAX_TAG_LENGTH = 100
+
+
+def parse_tags(tags):
+    """Split a comma-separated TAGS string into unique normalised names, keeping order."""
+    names = []
+    for raw in (tags or '').split(','):
+        name = re.sub(r'\s+', ' ', raw).strip().lower()[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def get_or_create_tags(names):
+    """Return {name: Tag} for `names`, inserting any that don't exist yet."""
+    if not names:
+        return {}
+    found = {t.NAME: t for t in Tag.query.filter(Tag.NAME.in_(names)).all()}
+    for name in names:
+        if name in found:
+            continue
+        try:
+            with db.session.begin_nested():
+                tag = Tag(NAME=name)
+                db.session.add(tag)
+            found[name] = tag
+        except IntegrityError:
+            # Created concurrently by another request
+            found[name] = Tag.query.filter_by(NAME=name).one()
+    return found
+
+
+def _item_id(item):
+    return item.AUDIO_ID if isinstance(item, AudioStory) else item.STORY_ID
+
+
+def sync_tags(content_type, item):
+    """Link `item` to its tags while it's published; unlink it otherwise.
+
+    Runs in the caller's session so the links commit with the row change.
+    """
+    if item.STATUS != 'published':
+        remove_tags(content_type, _item_id(item))
+        return
+
+    db.session.flush()  # make sure new rows have their id
+    content_id = _item_id(item)
+    remove_tags(content_type, content_id)
+    tags = get_or_create_tags(parse_tags(item.TAGS))
+    db.session.add_all([ContentTag(TAG_ID=tag.TAG_ID, CONTENT_TYPE=content_type, CONTENT_ID=content_id)
+                        for tag in tags.values()])
+
+
+def remove_tags(content_type, content_id):
+    if content_id is None:
+        return
+    ContentTag.query.filter_by(CONTENT_TYPE=content_type, CONTENT_ID=content_id) \
+                    .delete(synchronize_session=False)
+
+
+def sync_tags_many(content_type, items):
+    """sync_tags() for a batch: one unlink for the lot, one tag lookup, one insert of links."""
+    items = list(items)
+    if not items:
+        return
+    db.session.flush()
+    remove_tags_many(content_type, [_item_id(item) for item in items])
+    published = [(item, parse_tags(item.TAGS)) for item in items if item.STATUS == 'published']
+    tags = get_or_create_tags(list(dict.fromkeys(name for _, names in published for name in names)))
+    db.session.add_all([ContentTag(TAG_ID=tags[name].TAG_ID, CONTENT_TYPE=content_type, CONTENT_ID=_item_id(item))
+                        for item, names in published for name in names])
+
+
+def remove_tags_many(content_type, content_ids):
+    content_ids = [content_id for content_id in content_ids if content_id is not None]
+    if content_ids:
+        ContentTag.query.filter(ContentTag.CONTENT_TYPE == content_type, ContentTag.CONTENT_ID.in_(content_ids)) \
+                        .delete(synchronize_session=False)
+
+
+def tag_facets(content_type=None, limit=50):
+    """[(tag name, published item count)], most used first, from the link table alone."""
+    query = db.session.query(Tag.NAME, func.count().label('n')) \
+                      .join(ContentTag, ContentTag.TAG_ID == Tag.TAG_ID)
+    if content_type:
+        query = query.filter(ContentTag.CONTENT_TYPE == content_type)
+    return query.group_by(Tag.TAG_ID, Tag.NAME).order_by(func.count().desc(), Tag.NAME) \
+                .limit(limit).all()
+
+
+def tagged_query(content_type, tag_name):
+    """Query of published rows of `content_type` linked to `tag_name` (None if the tag is unknown).
+
+    Returns (query, model, id column) so callers can page it.
+    """
+    tag = Tag.query.filter_by(NAME=tag_name).first()
+    if not tag:
+        return None, None, None
+    model, id_col = {
+        'story': (Story, Story.STORY_ID),
+        'poem': (Poem, Poem.STORY_ID),
+        'audio': (AudioStory, AudioStory.AUDIO_ID),
+    }[content_type]
+    query = model.query.join(ContentTag, db.and_(ContentTag.CONTENT_ID == id_col,
+                                                 ContentTag.CONTENT_TYPE == content_type,
+                                                 ContentTag.TAG_ID == tag.TAG_ID)) \
+                       .filter(model.STATUS == 'published')
+    return query, model, id_col
+
+
+def backfill_tags():
+    """Rebuild every tag link from the TAGS column of published content."""
+    ContentTag.query.delete(synchronize_session=False)
+    total = 0
+    for content_type, model, id_col in (('story', Story, Story.STORY_ID),
+                                        ('poem', Poem, Poem.STORY_ID),
+                                        ('audio', AudioStory, AudioStory.AUDIO_ID)):
+        rows = db.session.query(id_col, model.TAGS).filter(model.STATUS == 'published').all()
+        tags = get_or_create_tags(sorted({n for _, t in rows for n in parse_tags(t)}))
+        links = [dict(TAG_ID=tags[name].TAG_ID, CONTENT_TYPE=content_type, CONTENT_ID=content_id)
+                 for content_id, t in rows for name in parse_tags(t)]
+        if links:
+            db.session.bulk_insert_mappings(ContentTag, links)
+        total += len(links)
+    db.session.commit()
+    return total
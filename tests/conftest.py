@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+# Config reads the environment at import time: point the app at a throwaway database before importing it.
+# TEST_DATABASE_URL can name a scratch MySQL database to run the suite (and the EXPLAIN checks) there;
+# every table is dropped after each test.
+os.environ['DATABASE_URL'] = os.environ.get('TEST_DATABASE_URL', 'sqlite://')
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+os.environ['PROFILER_ENABLED'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as flask_app  # noqa: E402
+from models import db, User  # noqa: E402
+from principals import principal_cache  # noqa: E402
+from response_cache import response_cache  # noqa: E402
+from search import memory_index  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    flask_app.config['TESTING'] = True
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+    response_cache.clear()
+    principal_cache.clear()
+    with memory_index.lock:
+        memory_index.reset()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def writer(app):
+    user = User(full_name='Test Writer', email='writer@example.com', role='Writer',
+                is_active=True, is_approved=True)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
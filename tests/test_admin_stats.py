@@ -0,0 +1,40 @@
+from models import db, Admin
+
+
+def add_admin(status='Active'):
+    admin = Admin(full_name='Stats Admin', email=f'{status.lower()}@example.com', mobile=status,
+                  password='x', role='Admin', status=status)
+    db.session.add(admin)
+    db.session.commit()
+    return admin.id
+
+
+def test_cache_stats_requires_active_admin(client):
+    assert client.get('/api/admin/cache-stats').status_code == 401
+    inactive = add_admin('Inactive')
+    assert client.get('/api/admin/cache-stats', headers={'X-Admin-Id': str(inactive)}).status_code == 403
+    active = add_admin()
+    response = client.get('/api/admin/cache-stats', headers={'X-Admin-Id': str(active)})
+    assert response.status_code == 200
+
+
+def test_job_stats_requires_active_admin(client):
+    assert client.get('/api/admin/job-stats').status_code == 401
+    inactive = add_admin('Inactive')
+    assert client.get('/api/admin/job-stats', headers={'X-Admin-Id': str(inactive)}).status_code == 403
+    active = add_admin()
+    assert client.get('/api/admin/job-stats', headers={'X-Admin-Id': str(active)}).status_code == 200
+
+
+def test_metrics_allows_admins_token_and_listed_addresses(app, client, monkeypatch):
+    assert client.get('/metrics').status_code == 401
+    active = add_admin()
+    assert client.get('/metrics', headers={'X-Admin-Id': str(active)}).status_code == 200
+
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 'scrape-secret')
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
+
+    monkeypatch.setitem(app.config, 'METRICS_ALLOWED_IPS', ['10.0.0.5'])
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '10.0.0.5'}).status_code == 200
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '10.0.0.6'}).status_code == 401
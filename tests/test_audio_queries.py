@@ -0,0 +1,39 @@
+import re
+
+import pytest
+
+from models import db, Story, Poem, AudioStory
+
+AUDIO_LISTINGS = ['/api/admin/drafted_audio', '/api/admin/all_audio', '/api/public/audio']
+
+
+def query_count(response):
+    """Statements the request ran, from the query profiler's Server-Timing header."""
+    return int(re.search(r'desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+
+
+def add_audio(writer, n):
+    """`n` audio rows, each linked to its own story or poem, half drafted and half published."""
+    for i in range(n):
+        model, link_type = (Story, 'storyAvailable') if i % 2 else (Poem, 'poemAvailable')
+        linked = model(WRITTEN_BY=writer.id, NAME=f'linked {i}', STORY='text', STATUS='published')
+        db.session.add(linked)
+        db.session.flush()
+        db.session.add(AudioStory(CREATED_BY=writer.id, NAME=f'audio {i}', LINK_TYPE=link_type,
+                                  LINKED_STORY_ID=linked.STORY_ID if model is Story else None,
+                                  LINKED_POEM_ID=linked.STORY_ID if model is Poem else None,
+                                  STATUS='draft' if i % 4 < 2 else 'published'))
+    db.session.commit()
+
+
+@pytest.mark.parametrize('url', AUDIO_LISTINGS)
+def test_audio_listing_query_count_does_not_grow_with_rows(client, writer, url):
+    add_audio(writer, 8)
+    small = client.get(url)
+    add_audio(writer, 72)
+    large = client.get(url)
+
+    assert small.status_code == large.status_code == 200
+    assert len(large.get_json()) > len(small.get_json())
+    assert all(row['linked_name'] for row in large.get_json())
+    assert query_count(large) == query_count(small)
@@ -0,0 +1,55 @@
+import hashlib
+import io
+import os
+import wave
+
+from audio_meta import probe_audio_job
+from counters import move_counter
+from models import db, AudioStory, Story
+from storage import media_path
+from test_pagination import ADMIN_HEADERS, publish
+
+
+def revalidate(client, url, etag):
+    return client.get(url, headers={'If-None-Match': etag})
+
+
+def test_listing_etag_changes_when_a_published_story_is_deleted(client, writer):
+    first, second = publish(client, writer, Story, 'story', 2)
+    etag = client.get('/api/public/stories').headers['ETag'].strip('"')
+    assert revalidate(client, '/api/public/stories', etag).status_code == 304
+
+    # The older row goes, so max(UPDATED_ON) stays put: only the counters see the delete
+    assert client.delete(f'/api/story/{first}/published', headers=ADMIN_HEADERS).status_code == 200
+    response = revalidate(client, '/api/public/stories', etag)
+    assert response.status_code == 200
+    assert [item['id'] for item in response.get_json()['items']] == [second]
+
+
+def test_audio_etag_changes_when_metadata_is_probed(app, client, writer, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'MEDIA_FOLDER', str(tmp_path))
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(8000)
+        out.writeframes(b'\0\0' * 8000)
+    content = buffer.getvalue()
+    sha256 = hashlib.sha256(content).hexdigest()
+    path = media_path(sha256, '.wav')
+    os.makedirs(os.path.dirname(path))
+    with open(path, 'wb') as f:
+        f.write(content)
+
+    audio = AudioStory(CREATED_BY=writer.id, NAME='probed', STATUS='published',
+                       AUDIO_URL=f'/media/{sha256[:2]}/{sha256}.wav')
+    db.session.add(audio)
+    move_counter('audio', writer.id, None, 'published')
+    db.session.commit()
+    etag = client.get('/api/public/audio').headers['ETag'].strip('"')
+
+    probe_audio_job(audio.AUDIO_ID)
+    db.session.commit()
+    response = revalidate(client, '/api/public/audio', etag)
+    assert response.status_code == 200
+    assert response.get_json()[0]['duration'] == 1.0
@@ -0,0 +1,77 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from exports import stream_export
+from models import db, Story, User
+from test_admin_stats import add_admin
+
+
+@pytest.fixture
+def admin_headers(app):
+    return {'X-Admin-Id': str(add_admin())}
+
+
+def add_stories(writer, n, status='published'):
+    db.session.add_all([Story(WRITTEN_BY=writer.id, NAME=f'story {i}', STORY='text', STATUS=status, PRICE=1.5)
+                        for i in range(n)])
+    db.session.commit()
+
+
+def ndjson(data):
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+def test_user_export_never_includes_the_password(client, writer, admin_headers):
+    writer.password = 'hash'
+    db.session.add(User(full_name='Reader', email='reader@example.com', role='Reader'))
+    db.session.commit()
+
+    response = client.get('/api/admin/export/users', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    rows = ndjson(response.data)
+    assert [row['email'] for row in rows] == ['writer@example.com', 'reader@example.com']
+    assert all('password' not in row for row in rows)
+
+    rows = ndjson(client.get('/api/admin/export/users?role=Writer&columns=id,email', headers=admin_headers).data)
+    assert rows == [{'id': writer.id, 'email': 'writer@example.com'}]
+
+
+@pytest.mark.parametrize('query', ['users?columns=id,password', 'secrets', 'stories?format=xml',
+                                   'stories?updated_since=yesterday'])
+def test_invalid_exports_are_rejected(client, admin_headers, query):
+    response = client.get(f'/api/admin/export/{query}', headers=admin_headers)
+    assert response.status_code == 400
+    assert response.get_json()['message']
+
+
+def test_csv_export_filters_and_picks_columns(client, writer, admin_headers):
+    add_stories(writer, 3)
+    add_stories(writer, 2, status='draft')
+    response = client.get('/api/admin/export/stories?format=csv&status=published&columns=id,name,price',
+                          headers=admin_headers)
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename="stories.csv"'
+    rows = list(csv.reader(io.StringIO(response.data.decode())))
+    assert rows[0] == ['id', 'name', 'price']
+    assert [row[1:] for row in rows[1:]] == [[f'story {i}', '1.5'] for i in range(3)]
+
+
+def test_export_is_gzipped_when_accepted(client, writer, admin_headers):
+    add_stories(writer, 3)
+    plain = client.get('/api/admin/export/stories', headers=admin_headers)
+    zipped = client.get('/api/admin/export/stories', headers=dict(admin_headers, **{'Accept-Encoding': 'gzip'}))
+    assert 'Content-Encoding' not in plain.headers
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in zipped.vary
+    assert gzip.decompress(zipped.data) == plain.data
+
+
+def test_export_streams_one_chunk_per_batch(app, writer):
+    add_stories(writer, 5)
+    chunks = list(stream_export('stories', batch_size=2))
+    assert [len(chunk.splitlines()) for chunk in chunks] == [2, 2, 1]
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import jobs
+from jobs import enqueue, run_worker, task
+from models import db
+
+calls = []
+
+
+class FixedRandom:
+    """No jitter, so backoff delays can be compared exactly."""
+    @staticmethod
+    def uniform(low, high):
+        return 1.0
+
+
+@task('tests.record')
+def record(value, fail=False):
+    calls.append(value)
+    if fail:
+        raise RuntimeError(f'failed on {value}')
+
+
+def setup_function():
+    calls.clear()
+
+
+def test_failed_job_is_queued_again_under_its_key(app):
+    job = enqueue('tests.record', {'value': 1, 'fail': True}, key='record:1', max_attempts=1)
+    db.session.commit()
+    run_worker(app, once=True)
+    db.session.expire_all()
+    assert job.STATUS == 'failed'
+
+    again = enqueue('tests.record', {'value': 2}, key='record:1')
+    db.session.commit()
+    assert again.JOB_ID == job.JOB_ID
+    assert (again.STATUS, again.ATTEMPTS) == ('queued', 0)
+    run_worker(app, once=True)
+    db.session.expire_all()
+    assert again.STATUS == 'done'
+    assert calls == [1, 2]
+
+
+def test_done_job_is_not_run_again_under_its_key(app):
+    job = enqueue('tests.record', {'value': 1}, key='record:1')
+    db.session.commit()
+    run_worker(app, once=True)
+    assert enqueue('tests.record', {'value': 2}, key='record:1').JOB_ID == job.JOB_ID
+    db.session.commit()
+    run_worker(app, once=True)
+    assert calls == [1]
+
+
+def test_enqueued_job_runs_once_and_is_done(app):
+    job = enqueue('tests.record', {'value': 7})
+    db.session.commit()
+    run_worker(app, once=True)
+    db.session.expire_all()
+    assert (job.STATUS, job.ATTEMPTS, job.LOCKED_BY) == ('done', 1, None)
+    assert calls == [7]
+
+
+def test_failure_is_retried_with_backoff(app, monkeypatch):
+    monkeypatch.setattr(jobs, 'random', FixedRandom())
+    job = enqueue('tests.record', {'value': 1, 'fail': True}, max_attempts=2)
+    db.session.commit()
+    before = datetime.utcnow()
+    run_worker(app, once=True)
+    db.session.expire_all()
+    assert (job.STATUS, job.ATTEMPTS) == ('queued', 1)
+    assert 'failed on 1' in job.LAST_ERROR
+    assert job.RUN_AT >= before + timedelta(seconds=jobs.RETRY_BASE_SECONDS)
+
+    run_worker(app, once=True)  # not due yet
+    assert calls == [1]
+
+    job.RUN_AT = datetime.utcnow()
+    db.session.commit()
+    run_worker(app, once=True)
+    db.session.expire_all()
+    assert (job.STATUS, job.ATTEMPTS) == ('failed', 2)
+    assert calls == [1, 1]
+
+
+def test_backoff_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(jobs, 'random', FixedRandom())
+    assert [jobs.retry_delay(n) for n in (1, 2, 3)] == [jobs.RETRY_BASE_SECONDS * 2 ** i for i in range(3)]
+    assert jobs.retry_delay(30) == jobs.RETRY_MAX_SECONDS
+
+
+def test_claims_are_exclusive_and_expired_leases_are_reclaimed(app):
+    job = enqueue('tests.record', {'value': 1})
+    db.session.commit()
+    assert jobs.claim_next('worker-a').JOB_ID == job.JOB_ID
+    assert jobs.claim_next('worker-b') is None
+
+    # worker-a died mid-job: once its lease runs out another worker takes the job over
+    job.LOCKED_AT = datetime.utcnow() - jobs.LEASE - timedelta(seconds=1)
+    db.session.commit()
+    reclaimed = jobs.claim_next('worker-b')
+    assert (reclaimed.JOB_ID, reclaimed.LOCKED_BY, reclaimed.ATTEMPTS) == (job.JOB_ID, 'worker-b', 2)
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from models import db, User
+from passwords import password_hasher, hash_method_prefix
+
+PASSWORD = 'correct horse'
+
+
+@pytest.fixture
+def account(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'LOGIN_MAX_FAILURES', 3)
+    monkeypatch.setitem(app.config, 'LOGIN_LOCKOUT_SECONDS', 60)
+    user = User(full_name='Reader', email='reader@example.com', role='Reader', is_active=True, is_approved=True)
+    user.set_password(PASSWORD)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def login(client, password):
+    return client.post('/login', json={'email': 'reader@example.com', 'roles': 'Reader', 'password': password})
+
+
+def reload(user):
+    return db.session.get(User, user.id, populate_existing=True)
+
+
+def test_failures_lock_the_account_with_retry_after(client, account, monkeypatch):
+    for _ in range(3):
+        assert login(client, 'wrong').status_code == 401
+
+    # Refused before any hashing, even with the right password
+    monkeypatch.setattr(password_hasher, 'verify', lambda *args: pytest.fail('hashed while locked'))
+    response = login(client, PASSWORD)
+    assert response.status_code == 429
+    assert 1 <= int(response.headers['Retry-After']) <= 61
+
+
+def test_lockout_expiry_restarts_the_count_and_success_clears_it(client, account):
+    for _ in range(3):
+        login(client, 'wrong')
+    reload(account).locked_until = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+    assert login(client, 'wrong').status_code == 401
+    assert (reload(account).failed_logins, reload(account).locked_until) == (1, None)
+
+    assert login(client, PASSWORD).status_code == 200
+    assert reload(account).failed_logins == 0
+
+
+def test_login_upgrades_an_outdated_hash(client, account):
+    account.password = generate_password_hash(PASSWORD, 'pbkdf2:sha256:1000')
+    db.session.commit()
+
+    assert login(client, PASSWORD).status_code == 200
+    upgraded = reload(account).password
+    assert hash_method_prefix(upgraded) == password_hasher.target_prefix != 'pbkdf2:sha256:1000'
+    assert login(client, PASSWORD).status_code == 200
+    assert reload(account).password == upgraded  # already current: not rehashed again
@@ -0,0 +1,55 @@
+import hashlib
+import os
+
+import pytest
+
+CONTENT = bytes(range(256)) * 4
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+URL = f'/media/{SHA256[:2]}/{SHA256}.pdf'
+
+
+@pytest.fixture
+def media(app, tmp_path, monkeypatch):
+    folder = tmp_path / 'media'
+    os.makedirs(folder / SHA256[:2])
+    (folder / SHA256[:2] / f'{SHA256}.pdf').write_bytes(CONTENT)
+    (tmp_path / 'outside.txt').write_bytes(b'not media')
+    monkeypatch.setitem(app.config, 'MEDIA_FOLDER', str(folder))
+    return folder
+
+
+def test_media_is_served_with_immutable_cache_headers(app, client, media):
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.data == CONTENT
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.headers['ETag'] == f'"{SHA256}"'
+    assert response.cache_control.public and response.cache_control.immutable
+    assert response.cache_control.max_age == app.config['MEDIA_MAX_AGE']
+
+    assert client.get(URL, headers={'If-None-Match': f'"{SHA256}"'}).status_code == 304
+
+
+def test_range_request_gets_206_with_content_range(client, media):
+    response = client.get(URL, headers={'Range': 'bytes=100-199'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 100-199/{len(CONTENT)}'
+    assert response.data == CONTENT[100:200]
+
+    response = client.get(URL, headers={'Range': f'bytes={len(CONTENT)}-'})
+    assert response.status_code == 416
+
+
+def test_accel_redirect_hands_the_file_to_the_proxy(app, client, media, monkeypatch):
+    monkeypatch.setitem(app.config, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/_protected_media/')
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.headers['X-Accel-Redirect'] == f'/_protected_media/{SHA256[:2]}/{SHA256}.pdf'
+    assert response.mimetype == 'application/pdf'
+    assert response.data == b''
+    assert response.cache_control.immutable
+
+
+@pytest.mark.parametrize('url', [f'/media/{SHA256[:2]}/missing.pdf', '/media/..%2Foutside.txt'])
+def test_missing_or_escaping_paths_are_404(client, media, url):
+    assert client.get(url).status_code == 404
@@ -0,0 +1,69 @@
+from counters import GLOBAL_SCOPE, get_counts, reconcile_counters
+from models import db, AudioStory, Job, Story, User
+from test_admin_stats import add_admin
+
+
+def create_story(client, writer, name, status):
+    response = client.post('/api/story', json={'name': name, 'storyInput': 'text', 'story': 'text',
+                                               'status': status}, headers={'X-User-Id': str(writer.id)})
+    assert response.status_code == 200
+    return Story.query.filter_by(NAME=name).one().STORY_ID
+
+
+def moderate(client, admin_id, content_type, **body):
+    return client.post(f'/api/admin/moderation/{content_type}', json=body,
+                       headers={'X-Admin-Id': str(admin_id)})
+
+
+def test_bulk_approve_reports_each_id_and_moves_counters(client, writer):
+    admin = add_admin()
+    first, second = create_story(client, writer, 'first', 'pending'), create_story(client, writer, 'second', 'pending')
+    published = create_story(client, writer, 'published', 'published')
+
+    response = moderate(client, admin, 'story', action='approve', ids=[first, second, published, 9999, first])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['updated'] == 2
+    assert [(r['id'], r['result']) for r in body['results']] == [
+        (first, 'updated'), (second, 'updated'), (published, 'skipped'), (9999, 'not_found')]
+    assert body['results'][2]['status'] == 'published'
+
+    for scope in (GLOBAL_SCOPE, writer.id):
+        assert get_counts(scope)['story'] == {'pending': 0, 'published': 3}
+    listed = client.get('/api/public/stories').get_json()['items']
+    assert sorted(item['id'] for item in listed) == sorted([first, second, published])
+
+
+def test_bulk_audio_approve_queues_metadata_probes(client, writer):
+    admin = add_admin()
+    audio = AudioStory(CREATED_BY=writer.id, NAME='clip', STATUS='draft', AUDIO_URL='/media/ab/clip.mp3')
+    db.session.add(audio)
+    db.session.commit()
+
+    assert moderate(client, admin, 'audio', action='approve', ids=[audio.AUDIO_ID]).status_code == 200
+    assert Job.query.filter_by(IDEMPOTENCY_KEY=f'audio-meta:{audio.AUDIO_ID}').one().STATUS == 'queued'
+
+
+def test_bulk_user_deactivation_updates_the_author_counter(client, writer):
+    admin = add_admin()
+    reader = User(full_name='Reader', email='reader@example.com', role='Reader', is_active=True, is_approved=True)
+    db.session.add(reader)
+    db.session.commit()
+    reconcile_counters()  # the fixtures add users directly
+    assert get_counts()['author']['active'] == 1
+
+    body = moderate(client, admin, 'user', action='deactivate', ids=[writer.id, reader.id]).get_json()
+    assert [r['result'] for r in body['results']] == ['updated', 'updated']
+    assert get_counts()['author']['active'] == 0  # only the writer counted as an author
+
+    body = moderate(client, admin, 'user', action='deactivate', ids=[writer.id]).get_json()
+    assert body['results'] == [{'id': writer.id, 'result': 'skipped', 'is_active': False}]
+
+
+def test_invalid_requests_change_nothing(client, writer):
+    admin = add_admin()
+    pending = create_story(client, writer, 'pending', 'pending')
+    assert moderate(client, admin, 'story', action='publish', ids=[pending]).status_code == 400
+    assert moderate(client, admin, 'story', action='approve', ids='all').status_code == 400
+    assert moderate(client, add_admin('Inactive'), 'story', action='approve', ids=[pending]).status_code == 403
+    assert db.session.get(Story, pending, populate_existing=True).STATUS == 'pending'
@@ -0,0 +1,45 @@
+from models import db, Story, Poem
+
+ADMIN_HEADERS = {'X-User-Id': '1', 'X-Role': 'Admin'}
+
+
+def publish(client, writer, model, kind, n):
+    """Create `n` pending items and approve them through the API, as moderators do."""
+    items = [model(WRITTEN_BY=writer.id, NAME=f'{kind} {i}', STORY='text', STATUS='pending', TAGS='walk')
+             for i in range(n)]
+    db.session.add_all(items)
+    db.session.commit()
+    for item in items:
+        response = client.post(f'/api/{kind}/{item.STORY_ID}/approve', json={}, headers=ADMIN_HEADERS)
+        assert response.status_code == 200
+    return [item.STORY_ID for item in items]
+
+
+def walk(client, url, key=lambda item: item['id']):
+    """Follow next_cursor to the end and return the keys of every item seen."""
+    seen, cursor = [], None
+    for _ in range(20):
+        body = client.get(url + (f'&cursor={cursor}' if cursor else '')).get_json()
+        seen += [key(item) for item in body['items']]
+        cursor = body['next_cursor']
+        if not cursor:
+            return seen
+    raise AssertionError(f'{url} still had a next_cursor after 20 pages: {seen}')
+
+
+def test_public_stories_walk_reaches_the_end(client, writer):
+    ids = publish(client, writer, Story, 'story', 24)
+    assert walk(client, '/api/public/stories?limit=7') == sorted(ids, reverse=True)
+
+
+def test_tagged_items_walk_reaches_the_end(client, writer):
+    ids = publish(client, writer, Story, 'story', 24)
+    assert walk(client, '/api/tags/walk/items?type=story&limit=7') == sorted(ids, reverse=True)
+
+
+def test_feed_walk_reaches_the_end(client, writer):
+    story_ids = publish(client, writer, Story, 'story', 12)
+    poem_ids = publish(client, writer, Poem, 'poem', 12)
+    seen = walk(client, '/api/public/feed?limit=7', key=lambda item: (item['type'], item['id']))
+    assert len(seen) == len(set(seen))
+    assert sorted(seen) == sorted([('story', i) for i in story_ids] + [('poem', i) for i in poem_ids])
@@ -0,0 +1,7 @@
+from migrate_schema import hot_queries, explain_problems
+
+
+def test_hot_queries_use_indexes(app):
+    # Same check as `python migrate_schema.py --check`: no full scans or filesorts on the hot paths
+    problems = [problem for label, query in hot_queries() for problem in explain_problems(label, query)]
+    assert problems == []
@@ -0,0 +1,86 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from models import db, Story, StoredFile
+from storage import purge_unreferenced_files
+
+
+@pytest.fixture
+def media(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'MEDIA_FOLDER', str(tmp_path))
+    return tmp_path
+
+
+def upload_story(client, writer, content, **fields):
+    data = dict(storyInput='pdf', name='Uploaded', status='draft', pdf=(io.BytesIO(content), 'story.pdf'))
+    data.update(fields)
+    return client.post('/api/story', data=data, content_type='multipart/form-data',
+                       headers={'X-User-Id': str(writer.id)})
+
+
+def media_files(media):
+    return sorted(os.path.relpath(os.path.join(root, name), media)
+                  for root, _, names in os.walk(media) for name in names)
+
+
+def refs(content, ext='.pdf'):
+    stored = db.session.get(StoredFile, (hashlib.sha256(content).hexdigest(), ext), populate_existing=True)
+    return stored.REF_COUNT if stored else None
+
+
+def test_upload_is_moved_into_place_on_commit(client, writer, media):
+    content = b'%PDF-1.4 committed'
+    assert upload_story(client, writer, content).status_code == 200
+    sha256 = hashlib.sha256(content).hexdigest()
+    assert media_files(media) == [os.path.join(sha256[:2], sha256 + '.pdf')]
+    assert Story.query.one().PDF_URL == f'/media/{sha256[:2]}/{sha256}.pdf'
+
+
+def test_rolled_back_upload_leaves_no_file(client, writer, media):
+    with pytest.raises(ValueError):
+        upload_story(client, writer, b'%PDF-1.4 rolled back', price='not a number')
+    db.session.remove()
+    assert media_files(media) == []
+    assert StoredFile.query.count() == 0
+
+
+def test_identical_uploads_share_one_file(client, writer, media):
+    content = b'%PDF-1.4 shared'
+    assert upload_story(client, writer, content, name='first').status_code == 200
+    assert upload_story(client, writer, content, name='second').status_code == 200
+    assert len(media_files(media)) == 1
+    assert refs(content) == 2
+    first, second = Story.query.order_by(Story.STORY_ID).all()
+    assert first.PDF_URL == second.PDF_URL
+
+
+def test_edit_and_delete_move_references_and_purge_removes_the_file(client, writer, media):
+    old, new = b'%PDF-1.4 old', b'%PDF-1.4 new'
+    upload_story(client, writer, old, name='story')
+    upload_story(client, writer, new, name='holder')
+    story, holder = Story.query.order_by(Story.STORY_ID).all()
+    headers = {'X-User-Id': str(writer.id)}
+
+    response = client.put(f'/api/story/{story.STORY_ID}', json={'pdf_url': holder.PDF_URL}, headers=headers)
+    assert response.status_code == 200
+    assert (refs(old), refs(new)) == (0, 2)
+
+    assert client.delete(f'/api/story/{holder.STORY_ID}', headers=headers).status_code == 200
+    assert refs(new) == 1
+
+    assert purge_unreferenced_files() == 1
+    new_sha = hashlib.sha256(new).hexdigest()
+    assert media_files(media) == [os.path.join(new_sha[:2], new_sha + '.pdf')]
+    assert refs(old) is None
+
+
+def test_upload_over_the_limit_is_rejected_and_leaves_nothing(app, client, writer, media, monkeypatch):
+    monkeypatch.setitem(app.config, 'MAX_UPLOAD_BYTES', 1024)
+    response = upload_story(client, writer, b'x' * 4096)
+    assert response.status_code == 413
+    assert media_files(media) == []
+    assert StoredFile.query.count() == 0
+    assert Story.query.count() == 0
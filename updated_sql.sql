@@ -17,6 +17,151 @@ USE `goddo_poddo_db`;
 /*!40101 SET @OLD_SQL_MODE=@@SQL_MODE, SQL_MODE='NO_AUTO_VALUE_ON_ZERO' */;
 /*!40111 SET @OLD_SQL_NOTES=@@SQL_NOTES, SQL_NOTES=0 */;
 
+--
+-- Table structure for table `tbl_admin`
+--
+
+DROP TABLE IF EXISTS `tbl_admin`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tbl_admin` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `full_name` varchar(100) NOT NULL,
+  `email` varchar(120) NOT NULL,
+  `mobile` varchar(15) NOT NULL,
+  `password` varchar(255) NOT NULL,
+  `role` varchar(50) NOT NULL,
+  `language` varchar(50) DEFAULT NULL,
+  `status` varchar(20) NOT NULL,
+  `created_on` datetime NOT NULL,
+  `updated_on` datetime NOT NULL,
+  `failed_logins` int DEFAULT NULL,
+  `locked_until` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `email` (`email`),
+  UNIQUE KEY `mobile` (`mobile`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `tbl_audio_story`
+--
+
+DROP TABLE IF EXISTS `tbl_audio_story`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tbl_audio_story` (
+  `AUDIO_ID` int NOT NULL AUTO_INCREMENT,
+  `CREATED_BY` int DEFAULT NULL,
+  `NAME` varchar(255) DEFAULT NULL,
+  `LANGUAGE` varchar(50) DEFAULT NULL,
+  `LINK_TYPE` varchar(32) DEFAULT NULL,
+  `LINKED_STORY_ID` int DEFAULT NULL,
+  `LINKED_POEM_ID` int DEFAULT NULL,
+  `AUDIO_URL` varchar(255) DEFAULT NULL,
+  `TAGS` text,
+  `STATUS` varchar(20) DEFAULT NULL,
+  `CREATED_ON` datetime DEFAULT NULL,
+  `UPDATED_ON` datetime DEFAULT NULL,
+  `DURATION_SEC` float DEFAULT NULL,
+  `BITRATE` int DEFAULT NULL,
+  `SAMPLE_RATE` int DEFAULT NULL,
+  `CHANNELS` smallint DEFAULT NULL,
+  `BYTE_SIZE` bigint DEFAULT NULL,
+  PRIMARY KEY (`AUDIO_ID`),
+  KEY `ix_audio_created_by` (`CREATED_BY`),
+  KEY `ix_audio_status_created` (`STATUS`,`CREATED_ON`),
+  KEY `ix_audio_status_updated` (`STATUS`,`UPDATED_ON`),
+  KEY `ix_audio_updated` (`UPDATED_ON`),
+  CONSTRAINT `tbl_audio_story_ibfk_1` FOREIGN KEY (`CREATED_BY`) REFERENCES `tbl_users` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `tbl_content_counter`
+--
+
+DROP TABLE IF EXISTS `tbl_content_counter`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tbl_content_counter` (
+  `USER_ID` int NOT NULL,
+  `CONTENT_TYPE` varchar(20) NOT NULL,
+  `STATUS` varchar(20) NOT NULL,
+  `COUNT` int NOT NULL,
+  `UPDATED_ON` datetime DEFAULT NULL,
+  `VERSION` int DEFAULT NULL,
+  PRIMARY KEY (`USER_ID`,`CONTENT_TYPE`,`STATUS`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `tbl_content_tag`
+--
+
+DROP TABLE IF EXISTS `tbl_content_tag`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tbl_content_tag` (
+  `TAG_ID` int NOT NULL,
+  `CONTENT_TYPE` varchar(10) NOT NULL,
+  `CONTENT_ID` int NOT NULL,
+  PRIMARY KEY (`TAG_ID`,`CONTENT_TYPE`,`CONTENT_ID`),
+  KEY `ix_content_tag_content` (`CONTENT_TYPE`,`CONTENT_ID`),
+  CONSTRAINT `tbl_content_tag_ibfk_1` FOREIGN KEY (`TAG_ID`) REFERENCES `tbl_tag` (`TAG_ID`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `tbl_help_support`
+--
+
+DROP TABLE IF EXISTS `tbl_help_support`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tbl_help_support` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `support_type` varchar(100) NOT NULL,
+  `user_id` int NOT NULL,
+  `created_on` datetime NOT NULL,
+  `status` varchar(20) DEFAULT NULL,
+  `updated_on` datetime NOT NULL,
+  `admin_note` text,
+  PRIMARY KEY (`id`),
+  KEY `ix_help_support_created` (`created_on`),
+  KEY `ix_help_support_status_created` (`status`,`created_on`),
+  KEY `tbl_help_support_ibfk_1` (`user_id`),
+  CONSTRAINT `tbl_help_support_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `tbl_users` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `tbl_job`
+--
+
+DROP TABLE IF EXISTS `tbl_job`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tbl_job` (
+  `JOB_ID` int NOT NULL AUTO_INCREMENT,
+  `TASK` varchar(64) NOT NULL,
+  `PAYLOAD` text,
+  `IDEMPOTENCY_KEY` varchar(191) DEFAULT NULL,
+  `STATUS` varchar(20) NOT NULL,
+  `ATTEMPTS` int NOT NULL,
+  `MAX_ATTEMPTS` int NOT NULL,
+  `RUN_AT` datetime NOT NULL,
+  `LOCKED_BY` varchar(64) DEFAULT NULL,
+  `LOCKED_AT` datetime DEFAULT NULL,
+  `LAST_ERROR` text,
+  `CREATED_ON` datetime DEFAULT NULL,
+  `UPDATED_ON` datetime DEFAULT NULL,
+  PRIMARY KEY (`JOB_ID`),
+  UNIQUE KEY `IDEMPOTENCY_KEY` (`IDEMPOTENCY_KEY`),
+  KEY `ix_job_status_run_at` (`STATUS`,`RUN_AT`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `tbl_poem`
 --
@@ -39,10 +184,13 @@ CREATE TABLE `tbl_poem` (
   `LIKED_BY` text,
   `SHARED_BY` text,
   `COMMENTED_BY` text,
+  `TAGS` text,
   PRIMARY KEY (`STORY_ID`),
-  KEY `tbl_poem_ibfk_1` (`WRITTEN_BY`),
+  KEY `ix_poem_status_updated` (`STATUS`,`UPDATED_ON`),
+  KEY `ix_poem_writer_status_updated` (`WRITTEN_BY`,`STATUS`,`UPDATED_ON`),
+  KEY `ix_poem_writer_updated` (`WRITTEN_BY`,`UPDATED_ON`),
   CONSTRAINT `tbl_poem_ibfk_1` FOREIGN KEY (`WRITTEN_BY`) REFERENCES `tbl_users` (`id`)
-) ENGINE=InnoDB AUTO_INCREMENT=2 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
 --
@@ -51,10 +199,49 @@ CREATE TABLE `tbl_poem` (
 
 LOCK TABLES `tbl_poem` WRITE;
 /*!40000 ALTER TABLE `tbl_poem` DISABLE KEYS */;
-INSERT INTO `tbl_poem` VALUES (1,1,'Sunset Melodies','English','Times New Roman','http://example.com/poem.pdf','Golden hues dance in the sky...','published','2025-05-13 15:14:09','2025-05-13 15:14:09',4.99,NULL,NULL,NULL);
+INSERT INTO `tbl_poem` VALUES (1,1,'Sunset Melodies','English','Times New Roman','http://example.com/poem.pdf','Golden hues dance in the sky...','published','2025-05-13 15:14:09','2025-05-13 15:14:09',4.99,NULL,NULL,NULL,NULL);
 /*!40000 ALTER TABLE `tbl_poem` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `tbl_search_document`
+--
+
+DROP TABLE IF EXISTS `tbl_search_document`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tbl_search_document` (
+  `DOC_TYPE` varchar(10) NOT NULL,
+  `DOC_ID` int NOT NULL,
+  `LANGUAGE` varchar(50) DEFAULT NULL,
+  `NAME` varchar(255) DEFAULT NULL,
+  `TAGS` text,
+  `BODY` text,
+  `UPDATED_ON` datetime DEFAULT NULL,
+  PRIMARY KEY (`DOC_TYPE`,`DOC_ID`),
+  FULLTEXT KEY `ix_search_fulltext` (`NAME`,`TAGS`,`BODY`),
+  KEY `ix_search_language` (`LANGUAGE`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `tbl_stored_file`
+--
+
+DROP TABLE IF EXISTS `tbl_stored_file`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tbl_stored_file` (
+  `SHA256` varchar(64) NOT NULL,
+  `EXT` varchar(10) NOT NULL,
+  `SIZE` bigint NOT NULL,
+  `REF_COUNT` int NOT NULL,
+  `CREATED_ON` datetime DEFAULT NULL,
+  `UPDATED_ON` datetime DEFAULT NULL,
+  PRIMARY KEY (`SHA256`,`EXT`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `tbl_story`
 --
@@ -77,10 +264,13 @@ CREATE TABLE `tbl_story` (
   `LIKED_BY` text,
   `SHARED_BY` text,
   `COMMENTED_BY` text,
+  `TAGS` text,
   PRIMARY KEY (`STORY_ID`),
-  KEY `tbl_story_ibfk_1` (`WRITTEN_BY`),
+  KEY `ix_story_status_updated` (`STATUS`,`UPDATED_ON`),
+  KEY `ix_story_writer_status_updated` (`WRITTEN_BY`,`STATUS`,`UPDATED_ON`),
+  KEY `ix_story_writer_updated` (`WRITTEN_BY`,`UPDATED_ON`),
   CONSTRAINT `tbl_story_ibfk_1` FOREIGN KEY (`WRITTEN_BY`) REFERENCES `tbl_users` (`id`)
-) ENGINE=InnoDB AUTO_INCREMENT=2 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
 --
@@ -89,10 +279,25 @@ CREATE TABLE `tbl_story` (
 
 LOCK TABLES `tbl_story` WRITE;
 /*!40000 ALTER TABLE `tbl_story` DISABLE KEYS */;
-INSERT INTO `tbl_story` VALUES (1,1,'The Brave Fox','English','Arial','http://example.com/story.pdf','Once upon a time...','published','2025-05-13 15:12:05','2025-05-13 15:12:05',9.99,NULL,NULL,NULL);
+INSERT INTO `tbl_story` VALUES (1,1,'The Brave Fox','English','Arial','http://example.com/story.pdf','Once upon a time...','published','2025-05-13 15:12:05','2025-05-13 15:12:05',9.99,NULL,NULL,NULL,NULL);
 /*!40000 ALTER TABLE `tbl_story` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `tbl_tag`
+--
+
+DROP TABLE IF EXISTS `tbl_tag`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tbl_tag` (
+  `TAG_ID` int NOT NULL AUTO_INCREMENT,
+  `NAME` varchar(100) NOT NULL,
+  PRIMARY KEY (`TAG_ID`),
+  UNIQUE KEY `NAME` (`NAME`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `tbl_users`
 --
@@ -109,8 +314,14 @@ CREATE TABLE `tbl_users` (
   `role` varchar(20) DEFAULT NULL,
   `is_active` tinyint(1) DEFAULT '1',
   `is_approved` tinyint(1) DEFAULT '0',
-  PRIMARY KEY (`id`)
-) ENGINE=InnoDB AUTO_INCREMENT=3 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+  `created_on` datetime DEFAULT NULL,
+  `updated_on` datetime DEFAULT NULL,
+  `failed_logins` int DEFAULT NULL,
+  `locked_until` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `unique_email_role` (`email`,`role`),
+  KEY `ix_users_role_active_approved` (`role`,`is_active`,`is_approved`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
 --
@@ -119,7 +330,7 @@ CREATE TABLE `tbl_users` (
 
 LOCK TABLES `tbl_users` WRITE;
 /*!40000 ALTER TABLE `tbl_users` DISABLE KEYS */;
-INSERT INTO `tbl_users` VALUES (1,'John Doe','john@example.com','1234567890','scrypt:32768:8:1$NUI155ELanqxL424$a728ffa9696925814f6705df70038c32cd53410fc000501be839f66cd82ff13d81670c04152ec0224d566f1d92447d5e29cf44e6d8647910d3f5d5a59925837a','Writer',1,0),(2,'Alice Johnson','alice@example.com','1234567890','scrypt:32768:8:1$P2Y9A8rBIqwra7T1$286ce972977112641151c90280942c9d4acccf08988a7d125b5b9bb2206d5f7570d808e62f3ff1863a3c6303c53688ff574945a5423c1d653f281055c51d02b3','writer',1,0);
+INSERT INTO `tbl_users` VALUES (1,'John Doe','john@example.com','1234567890','scrypt:32768:8:1$NUI155ELanqxL424$a728ffa9696925814f6705df70038c32cd53410fc000501be839f66cd82ff13d81670c04152ec0224d566f1d92447d5e29cf44e6d8647910d3f5d5a59925837a','Writer',1,0,NULL,NULL,NULL,NULL),(2,'Alice Johnson','alice@example.com','1234567890','scrypt:32768:8:1$P2Y9A8rBIqwra7T1$286ce972977112641151c90280942c9d4acccf08988a7d125b5b9bb2206d5f7570d808e62f3ff1863a3c6303c53688ff574945a5423c1d653f281055c51d02b3','writer',1,0,NULL,NULL,NULL,NULL);
 /*!40000 ALTER TABLE `tbl_users` ENABLE KEYS */;
 UNLOCK TABLES;
 